@@ -8,7 +8,7 @@ if TYPE_CHECKING:
     from Project import Project
 
 
-@dataclass
+@dataclass(slots=True)
 class BasePile:
     """
     A standard pile within a tracker.
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional
 
 from BasePile import BasePile
 from TrackerABC import TrackerABC
@@ -28,10 +28,15 @@ class BaseTracker(TrackerABC):
 
     tracker_id: int
     piles: List[BasePile] = field(default_factory=list)
+    _pile_index: Optional[Dict[int, BasePile]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def add_pile(self, pile: BasePile) -> None:
         """Add a pile to the tracker."""
         self.piles.append(pile)
+        if self._pile_index is not None:
+            self._pile_index.setdefault(pile.pile_in_tracker, pile)
 
     @property
     def distance_first_to_last_pile(self) -> float:
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from BasePile import BasePile
+from TerrainFollowingPile import TerrainFollowingPile
+from TrackerABC import TrackerABC
+
+# per-pile float columns, in the order they appear on BasePile/TerrainFollowingPile
+FLOAT_COLUMNS = (
+    "northing",
+    "easting",
+    "initial_elevation",
+    "flooding_allowance",
+    "height",
+    "current_elevation",
+    "final_elevation",
+    "pile_revealed",
+    "total_height",
+    "final_degree_break",
+)
+
+
+@dataclass
+class PileArray:
+    """
+    Columnar, array-backed storage for every pile in a project.
+
+    Each pile attribute is held in one contiguous array (float64 for coordinates, elevations
+    and heights, int64 for tracker ids and pile positions), with each tracker's piles stored
+    as a contiguous slice. Piles on the trackers are replaced by lightweight views
+    (`PileView`/`TerrainFollowingPileView`) that read and write these arrays, so existing
+    code keeps working while grading code can operate on the arrays directly.
+
+    Attributes
+    ----------
+    northing, easting : np.ndarray
+        Pile coordinates.
+    initial_elevation, current_elevation, final_elevation : np.ndarray
+        Ground elevations as imported, during grading and after grading.
+    flooding_allowance : np.ndarray
+        Flooding allowance for each pile.
+    height, total_height, pile_revealed : np.ndarray
+        Pile top elevation during grading, final top elevation and revealed height.
+    final_degree_break : np.ndarray
+        Final degree break for terrain-following piles (0 for standard piles).
+    tracker_id, pile_in_tracker : np.ndarray
+        Owning tracker id and position within the tracker.
+    pile_id : list
+        Pile ids as given (str, float or int).
+    tracker_slices : dict[int, slice]
+        tracker_id -> slice of this tracker's piles in the arrays.
+    """
+
+    northing: np.ndarray
+    easting: np.ndarray
+    initial_elevation: np.ndarray
+    flooding_allowance: np.ndarray
+    height: np.ndarray
+    current_elevation: np.ndarray
+    final_elevation: np.ndarray
+    pile_revealed: np.ndarray
+    total_height: np.ndarray
+    final_degree_break: np.ndarray
+    tracker_id: np.ndarray
+    pile_in_tracker: np.ndarray
+    pile_id: List[Any]
+    tracker_slices: Dict[int, slice] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.pile_id)
+
+    @classmethod
+    def from_trackers(cls, trackers: Sequence[TrackerABC]) -> PileArray:
+        """
+        Copy the current state of every pile into a new store, in `tracker.piles` order.
+
+        Raises
+        ------
+        ValueError
+            If two trackers share a tracker_id.
+        """
+        piles = [p for t in trackers for p in t.piles]
+        columns = {
+            name: np.array([getattr(p, name, 0.0) for p in piles], dtype=np.float64)
+            for name in FLOAT_COLUMNS
+        }
+
+        tracker_slices: Dict[int, slice] = {}
+        tracker_ids: List[int] = []
+        start = 0
+        for t in trackers:
+            if t.tracker_id in tracker_slices:
+                raise ValueError(f"Duplicate tracker_id {t.tracker_id} in pile array")
+            tracker_slices[t.tracker_id] = slice(start, start + len(t.piles))
+            tracker_ids.extend([t.tracker_id] * len(t.piles))
+            start += len(t.piles)
+
+        return cls(
+            **columns,
+            tracker_id=np.array(tracker_ids, dtype=np.int64),
+            pile_in_tracker=np.array([p.pile_in_tracker for p in piles], dtype=np.int64),
+            pile_id=[p.pile_id for p in piles],
+            tracker_slices=tracker_slices,
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        *,
+        tracker_id: np.ndarray,
+        pile_in_tracker: np.ndarray,
+        pile_id: Sequence[Any],
+        northing: np.ndarray,
+        easting: np.ndarray,
+        initial_elevation: np.ndarray,
+        flooding_allowance: np.ndarray,
+    ) -> PileArray:
+        """
+        Build a store straight from per-pile input columns, without creating pile objects.
+
+        Rows must already be grouped by tracker (each tracker's piles contiguous, in the
+        order they should appear on the tracker). Derived columns start as a freshly
+        constructed pile would: current and final elevation equal the initial elevation
+        and the heights are zero.
+
+        Raises
+        ------
+        ValueError
+            If the columns differ in length or a tracker's rows are not contiguous.
+        """
+        tracker_id = np.asarray(tracker_id, dtype=np.int64)
+        n = len(tracker_id)
+        columns = {
+            "northing": northing,
+            "easting": easting,
+            "initial_elevation": initial_elevation,
+            "flooding_allowance": flooding_allowance,
+        }
+        columns = {k: np.array(v, dtype=np.float64) for k, v in columns.items()}
+        lengths = {len(v) for v in columns.values()} | {len(pile_in_tracker), len(pile_id)}
+        if lengths - {n}:
+            raise ValueError("Pile columns must all have the same length")
+
+        tracker_slices: Dict[int, slice] = {}
+        if n:
+            # first row of each run of equal tracker ids
+            starts = np.flatnonzero(np.r_[True, tracker_id[1:] != tracker_id[:-1]]).tolist()
+            for start, stop in zip(starts, starts[1:] + [n]):
+                tid = int(tracker_id[start])
+                if tid in tracker_slices:
+                    raise ValueError(f"Rows for tracker {tid} are not contiguous")
+                tracker_slices[tid] = slice(start, stop)
+
+        zeros = np.zeros(n, dtype=np.float64)
+        return cls(
+            **columns,
+            height=zeros.copy(),
+            current_elevation=columns["initial_elevation"].copy(),
+            final_elevation=columns["initial_elevation"].copy(),
+            pile_revealed=zeros.copy(),
+            total_height=zeros.copy(),
+            final_degree_break=zeros,
+            tracker_id=tracker_id,
+            pile_in_tracker=np.array(pile_in_tracker, dtype=np.int64),
+            pile_id=list(pile_id),
+            tracker_slices=tracker_slices,
+        )
+
+    def tracker_slice(self, tracker_id: int) -> slice:
+        """Return the slice of a tracker's piles within the arrays."""
+        try:
+            return self.tracker_slices[tracker_id]
+        except KeyError:
+            raise ValueError(f"Tracker {tracker_id} not found in pile array.") from None
+
+    def view(self, index: int, terrain_following: bool = False) -> BasePile:
+        """Return a pile view onto row `index` of the store."""
+        if terrain_following:
+            return TerrainFollowingPileView(self, index)
+        return PileView(self, index)
+
+    def bind(self, trackers: Sequence[TrackerABC]) -> None:
+        """
+        Replace each tracker's piles with views onto this store.
+
+        The trackers must be the ones the store was built from, with their piles still in
+        the same order. Terrain-following piles become `TerrainFollowingPileView`s, and
+        existing segments are rebuilt on the views.
+        """
+        for t in trackers:
+            s = self.tracker_slice(t.tracker_id)
+            if s.stop - s.start != len(t.piles):
+                raise ValueError(f"Tracker {t.tracker_id} does not match its pile array slice")
+            t.piles = [
+                self.view(i, isinstance(p, TerrainFollowingPile))
+                for i, p in zip(range(s.start, s.stop), t.piles)
+            ]
+            t.invalidate_pile_index()
+            if getattr(t, "segments", None):
+                t.create_segments()  # type: ignore[attr-defined]
+
+
+def _float_column(name: str) -> property:
+    def fget(self: _ColumnView) -> float:
+        return float(getattr(self._store, name)[self._index])
+
+    def fset(self: _ColumnView, value: float) -> None:
+        getattr(self._store, name)[self._index] = value
+
+    return property(fget, fset)
+
+
+def _int_column(name: str) -> property:
+    def fget(self: _ColumnView) -> int:
+        return int(getattr(self._store, name)[self._index])
+
+    def fset(self: _ColumnView, value: int) -> None:
+        getattr(self._store, name)[self._index] = value
+
+    return property(fget, fset)
+
+
+def _pile_id_get(self: _ColumnView) -> Any:
+    return self._store.pile_id[self._index]
+
+
+def _pile_id_set(self: _ColumnView, value: Any) -> None:
+    self._store.pile_id[self._index] = value
+
+
+class _ColumnView:
+    """Properties that redirect pile attributes to a `PileArray` row."""
+
+    __slots__ = ()
+
+    _store: PileArray
+    _index: int
+
+    northing = _float_column("northing")
+    easting = _float_column("easting")
+    initial_elevation = _float_column("initial_elevation")
+    flooding_allowance = _float_column("flooding_allowance")
+    height = _float_column("height")
+    current_elevation = _float_column("current_elevation")
+    final_elevation = _float_column("final_elevation")
+    pile_revealed = _float_column("pile_revealed")
+    total_height = _float_column("total_height")
+    pile_in_tracker = _int_column("pile_in_tracker")
+    pile_id = property(_pile_id_get, _pile_id_set)
+
+
+class PileView(_ColumnView, BasePile):
+    """`BasePile` whose attributes live in a `PileArray` row."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: PileArray, index: int) -> None:
+        self._store = store
+        self._index = index
+
+
+class TerrainFollowingPileView(_ColumnView, TerrainFollowingPile):
+    """`TerrainFollowingPile` whose attributes live in a `PileArray` row."""
+
+    __slots__ = ("_store", "_index")
+
+    final_degree_break = _float_column("final_degree_break")
+
+    def __init__(self, store: PileArray, index: int) -> None:
+        self._store = store
+        self._index = index
@@ -5,16 +5,41 @@ from bisect import bisect_left
 from collections import defaultdict
 import math
 from dataclasses import dataclass, field
-from decimal import Decimal
-from typing import List, Literal, Optional, Type, Dict
+from decimal import Decimal, InvalidOperation
+from typing import List, Literal, Optional, Tuple, Type, Dict
 
 from BasePile import BasePile
 from BaseTracker import BaseTracker
+from PileArray import PileArray
 from ProjectConstraints import ProjectConstraints, ShadingConstraints
 from TerrainFollowingTracker import TerrainFollowingTracker
 from TrackerABC import TrackerABC
 
 ProjectType = Literal["standard", "terrain_following"]
+PileKey = Tuple[int, int]
+
+# trackers whose first-pile eastings differ by less than this share a north-south column
+EASTING_TOLERANCE = 0.005  # rounds to 2 decimal places when comparing easting coordinate
+
+
+def _pile_key(pile_id: float | str) -> Optional[PileKey]:
+    """Split a "tracker.pile" id into (tracker_id, pile_in_tracker), or None if not numeric."""
+    try:
+        pile_id_dec = Decimal(str(pile_id))
+    except InvalidOperation:
+        return None
+    if not pile_id_dec.is_finite():
+        return None
+    return math.floor(pile_id_dec), int((pile_id_dec % 1) * 100)
+
+
+def _owns_pile(tracker: TrackerABC, pile: BasePile) -> bool:
+    """Identity check that `pile` is on `tracker`, positional slot first."""
+    piles = tracker.piles
+    pos = pile.pile_in_tracker - 1
+    if 0 <= pos < len(piles) and piles[pos] is pile:
+        return True
+    return any(p is pile for p in piles)
 
 
 @dataclass
@@ -30,6 +55,23 @@ class Project:
 
     _tracker_cls: Type[TrackerABC] = field(init=False, repr=False)
 
+    # lookup indexes, rebuilt lazily when `trackers` is edited without add_tracker
+    _tracker_index: Dict[int, TrackerABC] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _pile_index: Dict[PileKey, BasePile] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _pile_owner: Dict[int, TrackerABC] = field(  # id(pile) -> tracker
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _indexed_trackers: Optional[Tuple[int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    # columnar pile store, set by to_pile_array() or load_pile_array()
+    pile_array: Optional[PileArray] = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         # choose tracker class
         if self.project_type == "standard":
@@ -61,7 +103,77 @@ class Project:
         return self._tracker_cls(tracker_id)  # type: ignore[call-arg]
 
     def add_tracker(self, tracker: TrackerABC) -> None:
+        in_sync = self._indexes_in_sync()
         self.trackers.append(tracker)
+        if in_sync:
+            self._index_tracker(tracker)
+            self._indexed_trackers = (id(self.trackers), len(self.trackers))
+
+    def _indexes_in_sync(self) -> bool:
+        return self._indexed_trackers == (id(self.trackers), len(self.trackers))
+
+    def _index_tracker(self, tracker: TrackerABC) -> None:
+        self._tracker_index.setdefault(tracker.tracker_id, tracker)
+        for pile in tracker.piles:
+            self._pile_owner.setdefault(id(pile), tracker)
+            key = _pile_key(pile.pile_id)
+            if key is not None:
+                self._pile_index.setdefault(key, pile)
+
+    def rebuild_indexes(self) -> None:
+        """
+        Rebuild the tracker_id, pile_id and pile -> tracker lookup indexes.
+
+        Lookups rebuild automatically when they miss, so this only needs calling after
+        removing trackers or piles in bulk.
+        """
+        self._tracker_index = {}
+        self._pile_index = {}
+        self._pile_owner = {}
+        for tracker in self.trackers:
+            self._index_tracker(tracker)
+        self._indexed_trackers = (id(self.trackers), len(self.trackers))
+
+    def to_pile_array(self) -> PileArray:
+        """
+        Move every pile into a columnar `PileArray` and swap the piles for views onto it.
+
+        Trackers keep their pile order and each becomes a contiguous slice of the store.
+        Call after `renumber_piles_by_northing` so slices run north to south.
+
+        Returns
+        -------
+        PileArray
+            The new store, also kept on `project.pile_array`.
+        """
+        store = PileArray.from_trackers(self.trackers)
+        store.bind(self.trackers)
+        self.pile_array = store
+        self.rebuild_indexes()
+        return store
+
+    def load_pile_array(self, store: PileArray, tracker_cls: Type[TrackerABC]) -> None:
+        """
+        Add one tracker per slice of `store`, with views onto the store as its piles.
+
+        The columnar counterpart of building piles one by one: trackers are added in slice
+        order and take their piles in row order. Terrain-following projects get
+        `TerrainFollowingPileView`s.
+
+        Parameters
+        ----------
+        store : PileArray
+            Store built with `PileArray.from_columns` (or `from_trackers`).
+        tracker_cls : type[TrackerABC]
+            Tracker class to create, e.g. `BaseTracker` or `TerrainFollowingTracker`.
+        """
+        terrain_following = self.project_type == "terrain_following"
+        for tracker_id, rows in store.tracker_slices.items():
+            tracker = tracker_cls(tracker_id=tracker_id)  # type: ignore[call-arg]
+            for i in range(rows.start, rows.stop):
+                tracker.add_pile(store.view(i, terrain_following))
+            self.add_tracker(tracker)
+        self.pile_array = store
 
     @property
     def total_piles(self) -> int:
@@ -100,20 +212,38 @@ class Project:
         return math.floor(x * 1000) / 1000
 
     def get_tracker_by_id(self, tracker_id: int) -> TrackerABC:
-        for tracker in self.trackers:
-            if tracker.tracker_id == tracker_id:
-                return tracker
+        if not self._indexes_in_sync():
+            self.rebuild_indexes()
+
+        tracker = self._tracker_index.get(tracker_id)
+        if tracker is None or tracker.tracker_id != tracker_id:
+            self.rebuild_indexes()
+            tracker = self._tracker_index.get(tracker_id)
+        if tracker is not None:
+            return tracker
         raise ValueError(f"Tracker with tracker_id {tracker_id} not found in project.")
 
     def get_pile_by_id(self, pile_id: float) -> BasePile:
-        tracker_id = math.floor(pile_id)
-        pile_id_dec = Decimal(str(pile_id))
-        pile_in_tracker = int((pile_id_dec % 1) * 100)
+        key = _pile_key(pile_id)
+        if key is None:
+            raise ValueError(f"Pile id {pile_id!r} is not in tracker.pile format.")
+        if not self._indexes_in_sync():
+            self.rebuild_indexes()
+
+        pile = self._pile_index.get(key)
+        if pile is None or _pile_key(pile.pile_id) != key:
+            self.rebuild_indexes()
+            pile = self._pile_index.get(key)
+        if pile is not None:
+            return pile
+
+        # no pile carries this id; fall back to its position within the tracker
+        tracker_id, pile_in_tracker = key
         return self.get_tracker_by_id(tracker_id).get_pile_in_tracker(pile_in_tracker)
 
     def get_trackers_on_easting(self, easting: float, ignore_ids: list[int]) -> list[TrackerABC]:
         target = float(easting)
-        tol = 0.005  # rounds to 2 decimal places when comparing easting coordinate
+        tol = EASTING_TOLERANCE
 
         same_easting: list[TrackerABC] = []
         for tracker in self.trackers:
@@ -126,6 +256,57 @@ class Project:
 
         return same_easting
 
+    def get_easting_columns(self) -> list[list[TrackerABC]]:
+        """
+        Group trackers into north-south columns that share the same easting.
+
+        Gives the same columns as calling `get_trackers_on_easting` for each tracker not
+        already in a column, in project order: a column holds every remaining tracker whose
+        first-pile easting is within `EASTING_TOLERANCE` of the first tracker in it. Trackers
+        are bucketed by quantised easting so each column only searches neighbouring buckets,
+        making this O(trackers) rather than O(trackers²).
+
+        Returns
+        -------
+        list[list[TrackerABC]]
+            Columns in order of their first tracker, each sorted north to south by the
+            tracker's northmost pile.
+        """
+        tol = EASTING_TOLERANCE
+        eastings = [float(t.get_first().easting) for t in self.trackers]
+
+        buckets: defaultdict[int, list[int]] = defaultdict(list)
+        for i, x in enumerate(eastings):
+            if math.isfinite(x):
+                buckets[math.floor(x / tol)].append(i)
+
+        grouped = [False] * len(self.trackers)
+        columns: list[list[TrackerABC]] = []
+        for i, x in enumerate(eastings):
+            if grouped[i]:
+                continue
+            if not math.isfinite(x):
+                grouped[i] = True
+                columns.append([self.trackers[i]])
+                continue
+
+            # anything within tol lies in this bucket or one of its neighbours
+            k = math.floor(x / tol)
+            members = sorted(
+                j
+                for b in (k - 1, k, k + 1)
+                for j in buckets.get(b, ())
+                if not grouped[j] and abs(eastings[j] - x) < tol
+            )
+            for j in members:
+                grouped[j] = True
+
+            column = [self.trackers[j] for j in members]
+            column.sort(key=lambda t: t.get_northmost_pile().northing, reverse=True)
+            columns.append(column)
+
+        return columns
+
     def get_tracker_length(self, tracker_id: int) -> float:
         tracker = self.get_tracker_by_id(tracker_id)
         return tracker.distance_first_to_last_pile + (self.constraints.edge_overhang * 2)
@@ -149,10 +330,16 @@ class Project:
         ValueError
             If the pile is not found in any tracker.
         """
-        for tracker in self.trackers:
-            # Fast identity check first
-            if pile in tracker.piles:
-                return tracker
+        if not self._indexes_in_sync():
+            self.rebuild_indexes()
+
+        tracker = self._pile_owner.get(id(pile))
+        if tracker is None or not _owns_pile(tracker, pile):
+            # piles added or moved after indexing
+            self.rebuild_indexes()
+            tracker = self._pile_owner.get(id(pile))
+        if tracker is not None:
+            return tracker
 
         raise ValueError(f"Pile {pile.pile_id} not found in any tracker.")
 
@@ -174,3 +361,4 @@ class Project:
             # 2. Renumber pile_in_tracker to match new order
             for i, pile in enumerate(tracker.piles, start=1):
                 pile.pile_in_tracker = i
+            tracker.invalidate_pile_index()
@@ -2,33 +2,54 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
 from TerrainFollowingPile import TerrainFollowingPile
 
 
 @dataclass
 class Segment:
-    """Segment between two piles."""
+    """
+    Segment between two piles.
+
+    Pile positions do not change while grading, so the length is computed once. Slope and
+    angle are cached together with the end heights they were computed from and are only
+    recomputed once either end pile's height has changed. Call
+    `TerrainFollowingTracker.create_segments` again after moving piles in plan.
+    """
 
     segment_id: int
     start_pile: TerrainFollowingPile
     end_pile: TerrainFollowingPile
 
+    _length: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _slope_heights: Optional[Tuple[float, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _slope: float = field(default=0.0, init=False, repr=False, compare=False)
+    _angle_heights: Optional[Tuple[float, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _angle: float = field(default=0.0, init=False, repr=False, compare=False)
+
     def length(self) -> float:
         """Returns the length of the segment ie. distance between piles"""
-        return math.hypot(
-            self.start_pile.easting - self.end_pile.easting,
-            self.start_pile.northing - self.end_pile.northing,
-        )
+        if self._length is None:
+            self._length = math.hypot(
+                self.start_pile.easting - self.end_pile.easting,
+                self.start_pile.northing - self.end_pile.northing,
+            )
+        return self._length
 
     def slope(self) -> float:
         """Return the slope (rise/run) of the segment."""
-        run = self.length()
-        if run == 0:
-            return float("inf")
-        rise = self.end_pile.height - self.start_pile.height
-        return rise / run
+        heights = (self.start_pile.height, self.end_pile.height)
+        if heights != self._slope_heights:
+            run = self.length()
+            self._slope = (heights[1] - heights[0]) / run if run != 0 else float("inf")
+            self._slope_heights = heights
+        return self._slope
 
     def height_difference(self) -> float:
         """Return the height difference between the start and end piles, -ve if the start pile is
@@ -37,8 +58,13 @@ class Segment:
 
     def segment_angle(self) -> float:
         """Absolute tube angle relative to horizontal (deg)."""
-        run = self.length()
-        if run == 0:
-            return float("inf")
-        rise = self.end_pile.height - self.start_pile.height
-        return math.degrees(math.atan2(rise, run))  # atan2 is a bit safer
+        heights = (self.start_pile.height, self.end_pile.height)
+        if heights != self._angle_heights:
+            run = self.length()
+            if run == 0:
+                self._angle = float("inf")
+            else:
+                rise = heights[1] - heights[0]
+                self._angle = math.degrees(math.atan2(rise, run))  # atan2 is a bit safer
+            self._angle_heights = heights
+        return self._angle
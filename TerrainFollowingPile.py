@@ -10,7 +10,7 @@ if TYPE_CHECKING:
     from TerrainFollowingTracker import TerrainFollowingTracker
 
 
-@dataclass
+@dataclass(slots=True)
 class TerrainFollowingPile(BasePile):
     """
     Terrain-following pile that stores incoming and outgoing segment angles.
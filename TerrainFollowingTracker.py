@@ -2,7 +2,9 @@
 
 import math
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from BaseTracker import BaseTracker
 from Segment import Segment
@@ -13,6 +15,13 @@ from TerrainFollowingPile import TerrainFollowingPile
 class TerrainFollowingTracker(BaseTracker):
     piles: List[TerrainFollowingPile] = field(default_factory=list)
     segments: List[Segment] = field(default_factory=list)
+    _segment_index: Optional[Dict[int, Segment]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # length of each segment in `segments` order, filled by create_segments
+    segment_lengths: np.ndarray = field(
+        default_factory=lambda: np.empty(0), init=False, repr=False, compare=False
+    )
 
     # Summary of Final Metrics after grading
     north_wing_deflection: float = field(init=False, default=0.0)
@@ -21,23 +30,40 @@ class TerrainFollowingTracker(BaseTracker):
 
     def add_pile(self, pile: TerrainFollowingPile) -> None:
         """Add a pile to the tracker."""
-        self.piles.append(pile)
+        super().add_pile(pile)
 
     def create_segments(self) -> None:
         """Create segments between consecutive piles."""
         self.segments = []
-        self.piles.sort(key=lambda p: p.pile_in_tracker)
+        self.sort_by_pole_position()
         for i in range(len(self.piles) - 1):
             segment = Segment(
                 start_pile=self.piles[i], end_pile=self.piles[i + 1], segment_id=i + 1
             )
             self.segments.append(segment)
+        self._segment_index = {s.segment_id: s for s in self.segments}
+        self.segment_lengths = np.array([s.length() for s in self.segments], dtype=float)
 
     def get_segment_by_id(self, segment_id: int) -> Segment:
         """Return segment with specified segment_id"""
-        for segment in self.segments:
+        # create_segments numbers segments 1..n-1 in list order
+        segments = self.segments
+        if 0 < segment_id <= len(segments):
+            segment = segments[segment_id - 1]
             if segment.segment_id == segment_id:
                 return segment
+
+        index = self._segment_index
+        segment = index.get(segment_id) if index is not None else None
+        if segment is None or segment.segment_id != segment_id:
+            # segments assigned directly rather than via create_segments
+            index = {}
+            for s in segments:
+                index.setdefault(s.segment_id, s)
+            self._segment_index = index
+            segment = index.get(segment_id)
+        if segment is not None:
+            return segment
         raise ValueError(f"Segment with ID {segment_id} not found.")
 
     def validate_tracker_deflections(
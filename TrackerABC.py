@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from BasePile import BasePile
 
@@ -11,6 +11,9 @@ class TrackerABC(ABC):
     tracker_id: int
     piles: List[BasePile]
 
+    # pile_in_tracker -> pile, used when piles are not in dense 1..n position order
+    _pile_index: Optional[Dict[int, BasePile]] = None
+
     @abstractmethod
     def add_pile(self, pile: BasePile) -> None:
         """Add a pile to the tracker."""
@@ -18,6 +21,19 @@ class TrackerABC(ABC):
     def sort_by_pole_position(self) -> None:
         """Sort piles by pole position within the tracker."""
         self.piles.sort(key=lambda p: p.pile_in_tracker)
+        self._build_pile_index()
+
+    def _build_pile_index(self) -> Dict[int, BasePile]:
+        """(Re)build the pile_in_tracker -> pile index; the first pile wins on duplicates."""
+        index: Dict[int, BasePile] = {}
+        for p in self.piles:
+            index.setdefault(p.pile_in_tracker, p)
+        self._pile_index = index
+        return index
+
+    def invalidate_pile_index(self) -> None:
+        """Drop the pile index; call after renumbering pile_in_tracker values."""
+        self._pile_index = None
 
     @property
     def pole_count(self) -> int:
@@ -41,10 +57,21 @@ class TrackerABC(ABC):
 
     def get_pile_in_tracker(self, pile_in_tracker: int) -> BasePile:
         """Return pile with specified pole_id"""
-        for p in self.piles:
+        # piles are numbered 1..n in list order after renumbering/sorting
+        piles = self.piles
+        if 0 < pile_in_tracker <= len(piles):
+            p = piles[pile_in_tracker - 1]
             if p.pile_in_tracker == pile_in_tracker:
                 return p
 
+        index = self._pile_index
+        p = index.get(pile_in_tracker) if index is not None else None
+        if p is None or p.pile_in_tracker != pile_in_tracker:
+            # index missing or stale (piles edited directly), rebuild once
+            p = self._build_pile_index().get(pile_in_tracker)
+        if p is not None:
+            return p
+
         raise ValueError(
             f"Pile with pole_id {pile_in_tracker} not found in tracker {self.tracker_id}"
         )
@@ -1,4 +1,4 @@
-from endpoints import grading, templates
+from endpoints import grading, jobs, metrics, templates
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -19,7 +19,9 @@ app.add_middleware(
 
 # Include routers
 app.include_router(grading.router, prefix="/api", tags=["grading"])
+app.include_router(jobs.router, prefix="/api", tags=["grading"])
 app.include_router(templates.router, prefix="/api", tags=["templates"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
 
 
 @app.get("/")
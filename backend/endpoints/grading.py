@@ -1,10 +1,19 @@
 # backend/api/endpoints/grading.py
+import hashlib
+import json
+import os
+import queue
 import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Literal, Optional, Union
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 
 # Add repo root to path so we can import modules from /PCL
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -14,6 +23,8 @@ import flatTrackerGrading
 # Base (flat) classes
 from BasePile import BasePile
 from BaseTracker import BaseTracker
+from grading_utils import ProgressCallback, TrackerCallback, TrackerResultCache
+from PileArray import PileArray
 from Project import Project
 from ProjectConstraints import ProjectConstraints
 
@@ -112,10 +123,109 @@ class GradingResponse(BaseModel):
     max_tracker_degree_break: Optional[float] = None
 
 
+class PileColumns(BaseModel):
+    """
+    Columnar alternative to a list of `PileInput`s: one array per field, all the same
+    length, row i describing pile i. Much smaller to upload and faster to validate than one
+    JSON object per pile.
+    """
+
+    pile_id: List[Union[str, float]]
+    pile_in_tracker: List[int]
+    northing: List[float]
+    easting: List[float]
+    initial_elevation: List[float]
+    flooding_allowance: Optional[List[float]] = None  # defaults to 0.0 for every pile
+
+    # validated arrays, filled in by _validate
+    _arrays: dict = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _validate(self) -> "PileColumns":
+        """
+        Check the columns together, as arrays rather than pile by pile.
+
+        Every column must have one row per pile id; pile ids must be numeric "tracker.pile"
+        ids; coordinates, elevations and allowances must be finite; pile_in_tracker must be
+        >= 1 and flooding_allowance non-negative.
+        """
+        n = len(self.pile_id)
+        for name in ("pile_in_tracker", "northing", "easting", "initial_elevation"):
+            rows = len(getattr(self, name))
+            if rows != n:
+                raise ValueError(f"columns.{name} has {rows} rows, expected {n}")
+        if self.flooding_allowance is not None and len(self.flooding_allowance) != n:
+            rows = len(self.flooding_allowance)
+            raise ValueError(f"columns.flooding_allowance has {rows} rows, expected {n}")
+
+        arrays = {
+            name: np.array(getattr(self, name), dtype=np.float64)
+            for name in ("northing", "easting", "initial_elevation")
+        }
+        arrays["flooding_allowance"] = (
+            np.zeros(n, dtype=np.float64)
+            if self.flooding_allowance is None
+            else np.array(self.flooding_allowance, dtype=np.float64)
+        )
+        arrays["pile_in_tracker"] = np.array(self.pile_in_tracker, dtype=np.int64)
+        try:
+            pile_id = np.array(self.pile_id, dtype=np.float64)
+        except ValueError:
+            raise ValueError("columns.pile_id must all be numeric 'tracker.pile' ids") from None
+
+        for name in ("pile_id", "northing", "easting", "initial_elevation", "flooding_allowance"):
+            bad = np.flatnonzero(~np.isfinite(pile_id if name == "pile_id" else arrays[name]))
+            if bad.size:
+                raise ValueError(f"columns.{name}[{bad[0]}] is not a finite number")
+        if (arrays["pile_in_tracker"] < 1).any():
+            raise ValueError("columns.pile_in_tracker must be >= 1")
+        if (arrays["flooding_allowance"] < 0).any():
+            raise ValueError("columns.flooding_allowance must be non-negative")
+
+        # same as int(float(pile_id)) per pile
+        arrays["tracker_id"] = np.trunc(pile_id).astype(np.int64)
+        self._arrays = arrays
+        return self
+
+    def __len__(self) -> int:
+        return len(self.pile_id)
+
+    def arrays(self) -> dict:
+        """
+        The validated columns as arrays: float64 northing, easting, initial_elevation and
+        flooding_allowance; int64 pile_in_tracker; and int64 tracker_id, the integer part of
+        each pile_id.
+        """
+        return self._arrays
+
+
 class ProjectGradingRequest(BaseModel):
     tracker_type: str  # "flat" or "xtr"
-    piles: List[PileInput]
+    # Piles as one object each, or as parallel arrays in `columns` (exactly one is given)
+    piles: List[PileInput] = Field(default_factory=list)
+    columns: Optional[PileColumns] = None
     constraints: ConstraintsInput
+    # Worker processes for grading independent trackers in parallel (None/1 = serial),
+    # capped server-side at MAX_GRADING_WORKERS
+    workers: Optional[int] = Field(default=None, ge=1)
+    # Reuse cached results for trackers unchanged since an earlier incremental request
+    incremental: bool = False
+    # XTR only: "lp" solves each tracker's heights as a linear programme (needs scipy)
+    engine: Literal["heuristic", "lp"] = "heuristic"
+
+    @model_validator(mode="after")
+    def _check_pile_source(self) -> "ProjectGradingRequest":
+        if self.columns is None and "piles" not in self.model_fields_set:
+            raise ValueError("Either piles or columns is required")
+        if self.columns is not None and self.piles:
+            raise ValueError("Send piles or columns, not both")
+        if self.engine != "heuristic" and self.tracker_type != "xtr":
+            raise ValueError(f"engine '{self.engine}' is only available for xtr trackers")
+        return self
+
+    @property
+    def pile_count(self) -> int:
+        return len(self.columns) if self.columns is not None else len(self.piles)
 
 
 class ProjectGradingResponse(BaseModel):
@@ -153,12 +263,38 @@ def _pick_classes(tracker_type: str):
     raise HTTPException(status_code=400, detail=f"Unknown tracker_type '{tracker_type}'")
 
 
-def _run_grading(project: Project, tracker_type: str) -> None:
+# Per-tracker results shared by incremental requests, keyed on tracker fingerprints
+tracker_cache = TrackerResultCache(
+    max_entries=int(os.environ.get("PCL_TRACKER_CACHE_ENTRIES", "100000"))
+)
+
+# Upper bound on the worker processes a single request may start
+MAX_GRADING_WORKERS = int(os.environ.get("PCL_MAX_GRADING_WORKERS", os.cpu_count() or 1))
+
+
+def _run_grading(
+    project: Project,
+    tracker_type: str,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    on_tracker_done: Optional[TrackerCallback] = None,
+    incremental: bool = False,
+    engine: str = "heuristic",
+) -> None:
     """
-    Dispatch grading to correct algorithm.
+    Dispatch grading to correct algorithm. `workers` is capped at `MAX_GRADING_WORKERS`.
     """
+    if workers is not None:
+        workers = min(workers, MAX_GRADING_WORKERS)
+    cache = tracker_cache if incremental else None
     if tracker_type == "flat":
-        flatTrackerGrading.main(project)
+        flatTrackerGrading.main(
+            project,
+            workers=workers,
+            progress=progress,
+            on_tracker_done=on_tracker_done,
+            cache=cache,
+        )
         return
 
     if tracker_type == "xtr":
@@ -169,11 +305,24 @@ def _run_grading(project: Project, tracker_type: str) -> None:
             )
 
         if hasattr(terrainTrackerGrading, "main"):
-            terrainTrackerGrading.main(project)
+            try:
+                terrainTrackerGrading.main(
+                    project,
+                    workers=workers,
+                    progress=progress,
+                    on_tracker_done=on_tracker_done,
+                    cache=cache,
+                    engine=engine,
+                )
+            except ImportError as e:  # optional solver dependency missing
+                raise HTTPException(status_code=501, detail=str(e))
             return
 
         if hasattr(terrainTrackerGrading, "grade_project"):
             terrainTrackerGrading.grade_project(project)
+            if on_tracker_done is not None:
+                for tracker in project.trackers:
+                    on_tracker_done(tracker)
             return
 
         raise HTTPException(
@@ -353,147 +502,557 @@ async def grade_single_tracker(request: GradingRequest):
         )
 
 
+def _build_project(request: ProjectGradingRequest) -> Project:
+    """
+    Build a Project from the request's piles, grouped into trackers by pile id.
+    """
+    constraints = ProjectConstraints(
+        min_reveal_height=request.constraints.min_reveal_height,
+        max_reveal_height=request.constraints.max_reveal_height,
+        pile_install_tolerance=request.constraints.pile_install_tolerance,
+        max_incline=request.constraints.max_incline / 100.0,
+        edge_overhang=request.constraints.edge_overhang,
+        target_height_percentage=request.constraints.target_height_percentage,
+        max_angle_rotation=request.constraints.max_angle_rotation,
+        max_segment_deflection_deg=request.constraints.max_segment_deflection_deg,
+        max_cumulative_deflection_deg=request.constraints.max_cumulative_deflection_deg,
+    )
+
+    project_type = "terrain_following" if request.tracker_type == "xtr" else "standard"
+    project = Project(
+        name="Full_Project_Analysis",
+        project_type=project_type,
+        constraints=constraints,
+    )
+
+    TrackerCls, PileCls = _pick_classes(request.tracker_type)
+
+    if request.columns is not None:
+        _load_columns(project, request.columns, TrackerCls)
+        return project
+
+    # Group piles by tracker
+    piles_by_tracker = {}
+    for p in request.piles:
+        tracker_id = int(float(p.pile_id))
+        piles_by_tracker.setdefault(tracker_id, []).append(p)
+
+    # Create trackers and add piles
+    for tid, piles in piles_by_tracker.items():
+        tracker = TrackerCls(tracker_id=tid)
+        for pile_data in piles:
+            # Force standard ID format f"{tracker_id}.{pit:02d}"
+            normalized_id = f"{tid}.{pile_data.pile_in_tracker:02d}"
+
+            pile = PileCls(
+                northing=pile_data.northing,
+                easting=pile_data.easting,
+                initial_elevation=pile_data.initial_elevation,
+                pile_id=normalized_id,
+                pile_in_tracker=pile_data.pile_in_tracker,
+                flooding_allowance=pile_data.flooding_allowance,
+            )
+
+            # ✅ XTR init: ensure current ground elevation is set
+            if request.tracker_type == "xtr":
+                _ensure_xtr_ground_init(pile, pile_data.initial_elevation)
+
+            tracker.add_pile(pile)
+
+        tracker.sort_by_pole_position()
+        project.add_tracker(tracker)
+
+    return project
+
+
+def _load_columns(project: Project, columns: PileColumns, tracker_cls) -> None:
+    """
+    Add trackers from a columnar payload, backed by a `PileArray` built straight from it.
+
+    Produces the same project as the per-pile path: trackers in order of first appearance,
+    piles stably sorted by pile_in_tracker, ids normalised to f"{tracker_id}.{pit:02d}".
+    """
+    arrays = columns.arrays()
+    tracker_id = arrays["tracker_id"]
+    pile_in_tracker = arrays["pile_in_tracker"]
+
+    # rank trackers by first appearance, then order rows by (tracker rank, pile_in_tracker)
+    _, first_row, tracker_of_row = np.unique(tracker_id, return_index=True, return_inverse=True)
+    tracker_rank = np.argsort(np.argsort(first_row))
+    order = np.lexsort((pile_in_tracker, tracker_rank[tracker_of_row]))
+
+    tracker_id = tracker_id[order]
+    pile_in_tracker = pile_in_tracker[order]
+    store = PileArray.from_columns(
+        tracker_id=tracker_id,
+        pile_in_tracker=pile_in_tracker,
+        # Force standard ID format f"{tracker_id}.{pit:02d}"
+        pile_id=[
+            f"{tid}.{pit:02d}" for tid, pit in zip(tracker_id.tolist(), pile_in_tracker.tolist())
+        ],
+        northing=arrays["northing"][order],
+        easting=arrays["easting"][order],
+        initial_elevation=arrays["initial_elevation"][order],
+        flooding_allowance=arrays["flooding_allowance"][order],
+    )
+    project.load_pile_array(store, tracker_cls)
+
+
+class _ResultCollector:
+    """
+    Accumulates totals, reveal violations and tracker metrics tracker by tracker, in the
+    order trackers are added, and builds each tracker's per-pile results. Shared by the
+    whole-document and streaming responses so both produce the same numbers.
+    """
+
+    def __init__(self, request: ProjectGradingRequest) -> None:
+        self.request = request
+        self.total_cut = 0.0
+        self.total_fill = 0.0
+        self.violations: List[dict] = []
+        self.tracker_metrics: dict = {}
+        self.tracker_count = 0
+
+    def add_tracker(self, tracker) -> List[dict]:
+        """Fold one graded tracker into the totals and return its pile results."""
+        min_reveal_m = self.request.constraints.min_reveal_height
+        max_reveal_m = self.request.constraints.max_reveal_height
+        tolerance = self.request.constraints.pile_install_tolerance
+        self.tracker_count += 1
+
+        # ✅ Calculate metrics for each tracker if XTR
+        if self.request.tracker_type == "xtr" and hasattr(tracker, "set_final_deflection_metrics"):
+            tracker.set_final_deflection_metrics()
+            self.tracker_metrics[tracker.tracker_id] = {
+                "north_wing_deflection": getattr(tracker, "north_wing_deflection", 0.0),
+                "south_wing_deflection": getattr(tracker, "south_wing_deflection", 0.0),
+                "max_tracker_degree_break": getattr(tracker, "max_tracker_degree_break", 0.0),
+            }
+
+        pile_results = []
+        for pile in tracker.piles:
+            cut_fill = pile.final_elevation - pile.initial_elevation
+            if cut_fill > 0:
+                self.total_cut += cut_fill
+            else:
+                self.total_fill += abs(cut_fill)
+
+            if pile.pile_revealed < (
+                min_reveal_m + pile.flooding_allowance + tolerance / 2 - 0.0001
+            ):
+                self.violations.append(
+                    {
+                        "pile_id": pile.pile_id,
+                        "type": "min_reveal",
+                        "value": pile.pile_revealed,
+                        "limit": min_reveal_m + pile.flooding_allowance + tolerance / 2,
+                    }
+                )
+            elif pile.pile_revealed > (max_reveal_m - tolerance / 2 + 0.0001):
+                self.violations.append(
+                    {
+                        "pile_id": pile.pile_id,
+                        "type": "max_reveal",
+                        "value": pile.pile_revealed,
+                        "limit": max_reveal_m - tolerance / 2,
+                    }
+                )
+
+            pile_results.append(
+                {
+                    "pile_id": str(pile.pile_id),  # Ensure output is str
+                    "pile_in_tracker": pile.pile_in_tracker,
+                    "northing": pile.northing,
+                    "easting": pile.easting,
+                    "initial_elevation": pile.initial_elevation,
+                    "final_elevation": pile.final_elevation,
+                    "pile_revealed": pile.pile_revealed,
+                    "total_height": pile.total_height,
+                    "cut_fill": cut_fill,
+                    "flooding_allowance": pile.flooding_allowance,
+                    # Grab degree break if exists
+                    "final_degree_break": getattr(pile, "final_degree_break", 0.0),
+                }
+            )
+        return pile_results
+
+    def summary(self) -> dict:
+        """Totals, violations and metrics for every tracker added so far."""
+        return {
+            "total_cut": self.total_cut,
+            "total_fill": self.total_fill,
+            "violations": self.violations,
+            "success": True,
+            "message": f"Successfully graded {self.tracker_count} trackers",
+            "constraints": self.request.constraints,
+            "tracker_metrics": self.tracker_metrics,
+        }
+
+
+def _project_response(request: ProjectGradingRequest, project: Project) -> ProjectGradingResponse:
+    """
+    Collect totals, reveal violations and per-pile results from a graded project.
+    """
+    collector = _ResultCollector(request)
+    pile_results = []
+    for tracker in project.trackers:
+        pile_results.extend(collector.add_tracker(tracker))
+    return ProjectGradingResponse(piles=pile_results, **collector.summary())
+
+
+# Bump whenever grading output changes, so results cached (and spilled) by an earlier
+# version are not served as hits.
+RESULT_CACHE_VERSION = 1
+
+
+def project_cache_key(request: ProjectGradingRequest) -> str:
+    """
+    Canonical hash of everything a project's grading result depends on: the result cache
+    version, tracker type, constraints (after coercion, so 15 and 15.0 agree), the pile
+    payload and a non-default engine. `workers` and `incremental` only change how the
+    result is computed, so they are left out.
+    """
+    fields = {"tracker_type", "constraints", "piles", "columns"}
+    if request.engine != "heuristic":
+        fields.add("engine")
+    payload = f"v{RESULT_CACHE_VERSION}:" + request.model_dump_json(include=fields)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ProjectResultCache:
+    """
+    Bounded LRU cache of rendered /grade-project responses, keyed by `project_cache_key`.
+
+    Entries are the response JSON exactly as FastAPI would send it, so a hit is returned
+    without grading or serialising again. The in-memory cache is bounded by entry count and
+    by total bytes; with `spill_dir` set, entries evicted from memory are written there
+    (bounded by `max_disk_bytes`) and promoted back into memory when next requested.
+
+    Parameters
+    ----------
+    max_entries : int
+        Responses kept in memory; 0 disables caching.
+    max_bytes : int
+        Total size of the responses kept in memory.
+    spill_dir : str | Path | None
+        Directory for responses evicted from memory. Responses already spilled there by an
+        earlier process are picked up again.
+    max_disk_bytes : int
+        Total size of the spilled responses; the least recently used are deleted beyond this.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        max_bytes: int = 256 * 2**20,
+        spill_dir: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 2 * 2**30,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            spilled = sorted(self.spill_dir.glob("*.json"), key=lambda f: f.stat().st_mtime)
+            for path in spilled:
+                self._disk[path.stem] = path.stat().st_size
+                self._disk_bytes += self._disk[path.stem]
+            self._trim_disk()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached response body for `key`, or None."""
+        with self._lock:
+            body = self._memory.get(key)
+            if body is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return body
+            if key in self._disk:
+                body = self._unspill(key)
+                if body is not None:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store(key, body)
+                    return body
+            self.misses += 1
+            return None
+
+    def put(self, key: str, body: bytes) -> None:
+        """Cache a response body, evicting (or spilling) least recently used entries."""
+        if self.max_entries < 1:
+            return
+        with self._lock:
+            self._store(key, body)
+
+    def clear(self) -> None:
+        """Drop every entry, including spilled ones, and reset the counters."""
+        with self._lock:
+            for key in self._disk:
+                self._path(key).unlink(missing_ok=True)
+            self._disk.clear()
+            self._disk_bytes = 0
+            self._memory.clear()
+            self._memory_bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _store(self, key: str, body: bytes) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = body
+        self._memory_bytes += len(body)
+        while self._memory and (
+            len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes
+        ):
+            evicted, evicted_body = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted_body)
+            self.evictions += 1
+            if self.spill_dir is not None:
+                self._spill(evicted, evicted_body)
+
+    def _path(self, key: str) -> Path:
+        return self.spill_dir / f"{key}.json"
+
+    def _spill(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        self._disk_bytes += len(body) - self._disk.pop(key, 0)
+        self._disk[key] = len(body)
+        self._trim_disk()
+
+    def _unspill(self, key: str) -> Optional[bytes]:
+        """Remove a spilled entry, returning its body (None if the file has gone)."""
+        self._disk_bytes -= self._disk.pop(key)
+        path = self._path(key)
+        try:
+            body = path.read_bytes()
+            path.unlink()
+        except FileNotFoundError:
+            return None
+        return body
+
+    def _trim_disk(self) -> None:
+        while self._disk_bytes > self.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._path(key).unlink(missing_ok=True)
+
+
+result_cache = ProjectResultCache(
+    max_entries=int(os.environ.get("PCL_RESULT_CACHE_ENTRIES", "32")),
+    max_bytes=int(os.environ.get("PCL_RESULT_CACHE_MB", "256")) * 2**20,
+    spill_dir=os.environ.get("PCL_RESULT_CACHE_DIR") or None,
+)
+
+
+def _render(response: ProjectGradingResponse) -> bytes:
+    """Response body exactly as FastAPI renders a `ProjectGradingResponse`."""
+    return response.model_dump_json(by_alias=True).encode()
+
+
+def _graded_project(
+    request: ProjectGradingRequest, progress: Optional[ProgressCallback] = None
+) -> tuple[bytes, Optional[ProjectGradingResponse]]:
+    """
+    Rendered response for a request, from `result_cache` when possible. The response model
+    is also returned when it had to be graded (None on a cache hit).
+    """
+    key = project_cache_key(request)
+    body = result_cache.get(key)
+    if body is not None:
+        return body, None
+
+    project = _build_project(request)
+    _run_grading(
+        project,
+        request.tracker_type,
+        workers=request.workers,
+        progress=progress,
+        incremental=request.incremental,
+        engine=request.engine,
+    )
+    response = _project_response(request, project)
+    body = _render(response)
+    result_cache.put(key, body)
+    return body, response
+
+
+def run_project_grading(
+    request: ProjectGradingRequest, progress: Optional[ProgressCallback] = None
+) -> ProjectGradingResponse:
+    """
+    Build, grade and summarise a whole project, or return the cached result of an
+    identical earlier request. Blocking; used by the background job runner.
+    """
+    body, response = _graded_project(request, progress)
+    if response is None:
+        response = ProjectGradingResponse.model_validate_json(body)
+    return response
+
+
+class ResultCacheStats(BaseModel):
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    disk_entries: int
+    disk_bytes: int
+
+
 @router.post("/grade-project", response_model=ProjectGradingResponse)
-async def grade_project(request: ProjectGradingRequest):
+def grade_project(request: ProjectGradingRequest):
     """
     Grade an entire project (all trackers).
+
+    Identical requests are answered from `result_cache`; the `X-Result-Cache` header says
+    whether this one was a `hit` or a `miss`.
+
+    Declared sync so FastAPI runs it in its threadpool rather than on the event loop. Large
+    sites should use the /grade-project/jobs endpoints instead of holding this request open.
     """
     try:
-        constraints = ProjectConstraints(
-            min_reveal_height=request.constraints.min_reveal_height,
-            max_reveal_height=request.constraints.max_reveal_height,
-            pile_install_tolerance=request.constraints.pile_install_tolerance,
-            max_incline=request.constraints.max_incline / 100.0,
-            edge_overhang=request.constraints.edge_overhang,
-            target_height_percentage=request.constraints.target_height_percentage,
-            max_angle_rotation=request.constraints.max_angle_rotation,
-            max_segment_deflection_deg=request.constraints.max_segment_deflection_deg,
-            max_cumulative_deflection_deg=request.constraints.max_cumulative_deflection_deg,
-        )
+        body, response = _graded_project(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
 
-        project_type = "terrain_following" if request.tracker_type == "xtr" else "standard"
-        project = Project(
-            name="Full_Project_Analysis",
-            project_type=project_type,
-            constraints=constraints,
+        raise HTTPException(
+            status_code=500,
+            detail=f"Grading failed: {str(e)}\n{traceback.format_exc()}",
         )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Result-Cache": "miss" if response is not None else "hit"},
+    )
 
-        TrackerCls, PileCls = _pick_classes(request.tracker_type)
 
-        # Group piles by tracker
-        piles_by_tracker = {}
-        for p in request.piles:
-            tracker_id = int(float(p.pile_id))
-            piles_by_tracker.setdefault(tracker_id, []).append(p)
-
-        # Create trackers and add piles
-        for tid, piles in piles_by_tracker.items():
-            tracker = TrackerCls(tracker_id=tid)
-            for pile_data in piles:
-                # Force standard ID format f"{tracker_id}.{pit:02d}"
-                normalized_id = f"{tid}.{pile_data.pile_in_tracker:02d}"
-
-                pile = PileCls(
-                    northing=pile_data.northing,
-                    easting=pile_data.easting,
-                    initial_elevation=pile_data.initial_elevation,
-                    pile_id=normalized_id,
-                    pile_in_tracker=pile_data.pile_in_tracker,
-                    flooding_allowance=pile_data.flooding_allowance,
-                )
+@router.get("/grade-project/cache", response_model=ResultCacheStats)
+def get_result_cache_stats():
+    """
+    Hit/miss counters and current size of the /grade-project result cache.
+    """
+    return result_cache.stats()
 
-                # ✅ XTR init: ensure current ground elevation is set
-                if request.tracker_type == "xtr":
-                    _ensure_xtr_ground_init(pile, pile_data.initial_elevation)
 
-                tracker.add_pile(pile)
+# Graded trackers buffered ahead of a slow streaming client before grading waits for it
+STREAM_BUFFER_TRACKERS = 64
 
-            tracker.sort_by_pole_position()
-            project.add_tracker(tracker)
+_STREAM_END = object()
 
-        _run_grading(project, request.tracker_type)
 
-        # Collect results
-        pile_results = []
-        total_cut = 0.0
-        total_fill = 0.0
-        violations = []
-        tracker_metrics = {}
+class _StreamClosed(Exception):
+    """Raised inside the grading thread once the streaming client has gone away."""
 
-        min_reveal_m = request.constraints.min_reveal_height
-        max_reveal_m = request.constraints.max_reveal_height
-        tolerance = request.constraints.pile_install_tolerance
 
-        # ✅ Calculate metrics for each tracker if XTR
-        if request.tracker_type == "xtr":
-            for tracker in project.trackers:
-                if hasattr(tracker, "set_final_deflection_metrics"):
-                    tracker.set_final_deflection_metrics()
-                    tracker_metrics[tracker.tracker_id] = {
-                        "north_wing_deflection": getattr(tracker, "north_wing_deflection", 0.0),
-                        "south_wing_deflection": getattr(tracker, "south_wing_deflection", 0.0),
-                        "max_tracker_degree_break": getattr(tracker, "max_tracker_degree_break", 0.0),
-                    }
+def _ndjson(record: dict) -> bytes:
+    # tracker records hold plain floats/strs; only the summary needs the model encoder
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode()
 
-        for tracker in project.trackers:
-            for pile in tracker.piles:
-                cut_fill = pile.final_elevation - pile.initial_elevation
-                if cut_fill > 0:
-                    total_cut += cut_fill
-                else:
-                    total_fill += abs(cut_fill)
-
-                if pile.pile_revealed < (
-                    min_reveal_m + pile.flooding_allowance + tolerance / 2 - 0.0001
-                ):
-                    violations.append(
-                        {
-                            "pile_id": pile.pile_id,
-                            "type": "min_reveal",
-                            "value": pile.pile_revealed,
-                            "limit": min_reveal_m + pile.flooding_allowance + tolerance / 2,
-                        }
-                    )
-                elif pile.pile_revealed > (max_reveal_m - tolerance / 2 + 0.0001):
-                    violations.append(
-                        {
-                            "pile_id": pile.pile_id,
-                            "type": "max_reveal",
-                            "value": pile.pile_revealed,
-                            "limit": max_reveal_m - tolerance / 2,
-                        }
-                    )
-                
-                # Grab degree break if exists
-                p_break = getattr(pile, "final_degree_break", 0.0)
-
-                pile_results.append(
-                    PileResult(
-                        pile_id=str(pile.pile_id), # Ensure output is str
-                        pile_in_tracker=pile.pile_in_tracker,
-                        northing=pile.northing,
-                        easting=pile.easting,
-                        initial_elevation=pile.initial_elevation,
-                        final_elevation=pile.final_elevation,
-                        pile_revealed=pile.pile_revealed,
-                        total_height=pile.total_height,
-                        cut_fill=cut_fill,
-                        flooding_allowance=pile.flooding_allowance,
-                        final_degree_break=p_break,
-                    )
-                )
 
-        return ProjectGradingResponse(
-            total_cut=total_cut,
-            total_fill=total_fill,
-            piles=pile_results,
-            violations=violations,
-            success=True,
-            message=f"Successfully graded {len(project.trackers)} trackers",
-            constraints=request.constraints,
-            tracker_metrics=tracker_metrics,
-        )
+def _stream_project_grading(request: ProjectGradingRequest, project: Project) -> Iterator[bytes]:
+    """
+    Grade `project` on a background thread and yield NDJSON records as trackers finish.
+
+    Yields one `{"type": "tracker", ...}` record per tracker, in project order, then a
+    `{"type": "summary", ...}` record with the totals, violations and tracker metrics. If
+    grading fails part-way, an `{"type": "error", "detail": ...}` record ends the stream
+    instead of the summary.
+    """
+    finished: queue.Queue = queue.Queue(maxsize=STREAM_BUFFER_TRACKERS)
+    closed = threading.Event()
+
+    def put(item) -> None:
+        while not closed.is_set():
+            try:
+                finished.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _StreamClosed
+
+    def grade() -> None:
+        try:
+            _run_grading(
+                project,
+                request.tracker_type,
+                workers=request.workers,
+                on_tracker_done=put,
+                incremental=request.incremental,
+                engine=request.engine,
+            )
+            put(_STREAM_END)
+        except _StreamClosed:
+            pass
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else f"Grading failed: {str(e)}"
+            try:
+                put(RuntimeError(detail))
+            except _StreamClosed:
+                pass
+
+    threading.Thread(target=grade, name="grade-project-stream", daemon=True).start()
+
+    collector = _ResultCollector(request)
+    try:
+        while True:
+            item = finished.get()
+            if item is _STREAM_END:
+                yield _ndjson(jsonable_encoder({"type": "summary", **collector.summary()}))
+                return
+            if isinstance(item, Exception):
+                yield _ndjson({"type": "error", "detail": str(item)})
+                return
+            piles = collector.add_tracker(item)
+            yield _ndjson({"type": "tracker", "tracker_id": item.tracker_id, "piles": piles})
+    finally:
+        # stops the grading thread at its next finished tracker if the client disconnected
+        closed.set()
+
+
+@router.post("/grade-project/stream")
+def grade_project_stream(request: ProjectGradingRequest):
+    """
+    Grade an entire project, streaming results as newline-delimited JSON.
 
+    Each tracker's pile results are sent as soon as that tracker is finalised, followed by
+    a summary record carrying what /grade-project returns besides `piles`. Request errors
+    are reported with the usual status codes; failures during grading end the stream with
+    an error record.
+    """
+    try:
+        project = _build_project(request)
     except HTTPException:
         raise
     except Exception as e:
@@ -503,3 +1062,6 @@ async def grade_project(request: ProjectGradingRequest):
             status_code=500,
             detail=f"Grading failed: {str(e)}\n{traceback.format_exc()}",
         )
+    return StreamingResponse(
+        _stream_project_grading(request, project), media_type="application/x-ndjson"
+    )
@@ -0,0 +1,314 @@
+# backend/api/endpoints/jobs.py
+"""
+Background grading jobs for /grade-project.
+
+A POST queues the project and returns a job id straight away; grading runs on a small
+thread pool off the event loop (each job may fan out further with `workers`). Clients poll
+the job, or subscribe to its server-sent event stream, for status and per-phase progress,
+fetch the result once it completes, or cancel it. Cancellation is cooperative: the grading
+progress callback raises once a cancel has been requested, so a running job stops at the
+next tracker boundary.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Literal, Optional
+
+from endpoints.grading import ProjectGradingRequest, ProjectGradingResponse, run_project_grading
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from grading_utils import ProgressEvent
+
+router = APIRouter()
+
+JobStatus = Literal["queued", "running", "completed", "failed", "cancelled"]
+
+# runner(request, progress) -> response; swapped out in tests
+JobRunner = Callable[..., ProjectGradingResponse]
+
+
+class JobCancelled(Exception):
+    """Raised from the progress callback to stop a job that has been cancelled."""
+
+
+@dataclass
+class GradingJob:
+    """State of one background grading job."""
+
+    job_id: str
+    pile_count: int
+    status: JobStatus = "queued"
+    phase: Optional[str] = None
+    done: int = 0
+    total: int = 0
+    phase_elapsed: float = 0.0
+    phase_timings: Dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    updated_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    version: int = 0
+    result: Optional[ProjectGradingResponse] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+
+class JobInfo(BaseModel):
+    """
+    Snapshot of a grading job. `done`/`total` count trackers (or passes, for the shading
+    phases) in the current phase; `phase_timings` holds seconds spent in each phase so far.
+    """
+
+    job_id: str
+    status: JobStatus
+    phase: Optional[str] = None
+    done: int
+    total: int
+    phase_elapsed: float
+    rate: float
+    phase_timings: Dict[str, float]
+    pile_count: int
+    created_at: float
+    started_at: Optional[float] = None
+    updated_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_job(cls, job: GradingJob) -> "JobInfo":
+        return cls(
+            job_id=job.job_id,
+            status=job.status,
+            phase=job.phase,
+            done=job.done,
+            total=job.total,
+            phase_elapsed=job.phase_elapsed,
+            rate=job.done / job.phase_elapsed if job.phase_elapsed > 0 else 0.0,
+            phase_timings=dict(job.phase_timings),
+            pile_count=job.pile_count,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            updated_at=job.updated_at,
+            finished_at=job.finished_at,
+            error=job.error,
+        )
+
+
+class JobManager:
+    """
+    In-memory registry and thread pool for grading jobs.
+
+    Parameters
+    ----------
+    max_workers : int
+        Jobs graded concurrently; further jobs wait in the queue.
+    max_finished : int
+        Finished jobs kept for result fetching; the oldest are dropped beyond this.
+    runner : JobRunner
+        Blocking function that grades a request, reporting through `progress`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_finished: int = 50,
+        runner: JobRunner = run_project_grading,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="grading-job"
+        )
+        self._max_finished = max_finished
+        self._runner = runner
+        self._jobs: Dict[str, GradingJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, request: ProjectGradingRequest) -> GradingJob:
+        job = GradingJob(job_id=uuid.uuid4().hex, pile_count=request.pile_count)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        job.future = self._executor.submit(self._run, job, request)
+        return job
+
+    def get(self, job_id: str) -> GradingJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def info(self, job_id: str) -> tuple[int, JobInfo]:
+        """Consistent (version, snapshot) of a job, taken under the lock."""
+        job = self.get(job_id)
+        with self._lock:
+            return job.version, JobInfo.from_job(job)
+
+    def cancel(self, job_id: str) -> GradingJob:
+        job = self.get(job_id)
+        with self._lock:
+            if job.finished:
+                return job
+            job.cancel_event.set()
+            if job.future is not None and job.future.cancel():
+                # never started
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                job.version += 1
+        return job
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job: GradingJob, request: ProjectGradingRequest) -> None:
+        with self._lock:
+            job.version += 1
+            if job.cancel_event.is_set():
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                return
+            job.status = "running"
+            job.started_at = time.time()
+
+        def progress(event: ProgressEvent) -> None:
+            if job.cancel_event.is_set():
+                raise JobCancelled(job.job_id)
+            with self._lock:
+                job.phase = event.phase
+                job.done = event.done
+                job.total = event.total
+                job.phase_elapsed = event.elapsed
+                job.phase_timings[event.phase] = event.elapsed
+                job.updated_at = time.time()
+                job.version += 1
+
+        try:
+            result = self._runner(request, progress=progress)
+        except JobCancelled:
+            status, error, result = "cancelled", None, None
+        except HTTPException as e:
+            status, error, result = "failed", str(e.detail), None
+        except Exception as e:
+            status, error, result = "failed", f"{e}\n{traceback.format_exc()}", None
+        else:
+            status, error = "completed", None
+
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.result = result
+            job.finished_at = time.time()
+            job.version += 1
+
+    def _prune(self) -> None:
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished),
+            key=lambda j: j.finished_at or 0.0,
+        )
+        for job in finished[: max(0, len(finished) - self._max_finished + 1)]:
+            del self._jobs[job.job_id]
+
+
+job_manager = JobManager(max_workers=int(os.environ.get("PCL_GRADING_JOB_WORKERS", "2")))
+
+
+def _get_job(job_id: str) -> GradingJob:
+    try:
+        return job_manager.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown grading job '{job_id}'") from None
+
+
+@router.post("/grade-project/jobs", response_model=JobInfo, status_code=202)
+def submit_grading_job(request: ProjectGradingRequest):
+    """
+    Queue a whole-project grade and return its job id immediately.
+    """
+    return JobInfo.from_job(job_manager.submit(request))
+
+
+@router.get("/grade-project/jobs/{job_id}", response_model=JobInfo)
+def get_grading_job(job_id: str):
+    """
+    Status and per-tracker progress of a grading job.
+    """
+    return JobInfo.from_job(_get_job(job_id))
+
+
+@router.get("/grade-project/jobs/{job_id}/result", response_model=ProjectGradingResponse)
+def get_grading_job_result(job_id: str):
+    """
+    Result of a completed grading job (409 until it has completed).
+    """
+    job = _get_job(job_id)
+    if job.status != "completed" or job.result is None:
+        detail = f"Grading job '{job_id}' is {job.status}"
+        if job.error:
+            detail += f": {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job.result
+
+
+@router.post("/grade-project/jobs/{job_id}/cancel", response_model=JobInfo)
+def cancel_grading_job(job_id: str):
+    """
+    Cancel a queued or running grading job. Running jobs stop at the next tracker.
+    """
+    _get_job(job_id)
+    return JobInfo.from_job(job_manager.cancel(job_id))
+
+
+def _sse(event: str, info: JobInfo) -> str:
+    return f"event: {event}\ndata: {info.model_dump_json()}\n\n"
+
+
+@router.get("/grade-project/jobs/{job_id}/events")
+async def stream_grading_job(
+    job_id: str,
+    interval: float = Query(0.5, gt=0, le=10, description="Seconds between progress checks"),
+):
+    """
+    Server-sent event stream of a grading job's progress.
+
+    Sends a `progress` event whenever the job has moved on since the last check, a
+    keep-alive comment otherwise, and a final `end` event once the job has completed,
+    failed or been cancelled. Each event's data is the job's `JobInfo` as JSON.
+    """
+    _get_job(job_id)
+
+    async def events():
+        seen = -1
+        while True:
+            try:
+                version, info = job_manager.info(job_id)
+            except KeyError:
+                return  # pruned while streaming
+            if info.status in ("completed", "failed", "cancelled"):
+                yield _sse("end", info)
+                return
+            if version != seen:
+                seen = version
+                yield _sse("progress", info)
+            else:
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
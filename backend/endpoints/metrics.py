@@ -0,0 +1,75 @@
+# backend/api/endpoints/metrics.py
+"""
+Grading instrumentation and cache metrics.
+
+Timers and counters come from `grading_utils.instrumentation`, which is off unless the
+server runs with PCL_INSTRUMENT=1 or it is switched on here. They cover grading done in the
+API process; trackers graded in worker processes (`workers > 1`) are not counted.
+"""
+
+from typing import Dict
+
+from endpoints.grading import ResultCacheStats, result_cache, tracker_cache
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from grading_utils import instrumentation
+
+router = APIRouter()
+
+
+class TimerInfo(BaseModel):
+    calls: int
+    seconds: float
+
+
+class TrackerCacheStats(BaseModel):
+    hits: int
+    misses: int
+    entries: int
+
+
+class MetricsResponse(BaseModel):
+    """
+    `timers` maps instrumented functions (e.g. "flat.sliding_line") and grading phases
+    ("phase.sliding") to their call counts and total seconds; `counters` holds candidate
+    evaluations, violations found and corrections applied.
+    """
+
+    enabled: bool
+    timers: Dict[str, TimerInfo]
+    counters: Dict[str, int]
+    result_cache: ResultCacheStats
+    tracker_cache: TrackerCacheStats
+
+
+def _metrics() -> MetricsResponse:
+    return MetricsResponse(
+        **instrumentation.snapshot(),
+        result_cache=result_cache.stats(),
+        tracker_cache=TrackerCacheStats(
+            hits=tracker_cache.hits, misses=tracker_cache.misses, entries=len(tracker_cache)
+        ),
+    )
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+def get_metrics():
+    """
+    Grading timers and counters collected so far, plus result and tracker cache stats.
+    """
+    return _metrics()
+
+
+@router.post("/metrics/instrumentation", response_model=MetricsResponse)
+def set_instrumentation(
+    enabled: bool = Query(..., description="Collect grading timers and counters"),
+    reset: bool = Query(False, description="Clear the timers and counters first"),
+):
+    """
+    Switch grading instrumentation on or off at runtime.
+    """
+    if reset:
+        instrumentation.reset()
+    instrumentation.enabled = enabled
+    return _metrics()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Time the grading engines, shading passes, Excel loaders and API on synthetic sites.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --cases flat terrain
+    python benchmarks/run_benchmarks.py --output new.json --compare bench.json
+
+Each case runs `--repeat` times on a freshly generated site (generation is not timed) and
+records every run, the best time and, for the engines, the time spent in each grading
+phase. Results are written as JSON; `--compare` reports cases that got slower than a
+previous results file and exits non-zero if any slowed down by more than `--threshold`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "backend")]
+
+import numpy as np  # noqa: E402
+
+import flatBatchedGrading  # noqa: E402
+import flatTrackerGrading  # noqa: E402
+import terrainTrackerGrading  # noqa: E402
+import testing_get_data  # noqa: E402
+import testing_get_data_tf  # noqa: E402
+from benchmarks.synthetic_site import (  # noqa: E402
+    SiteSpec,
+    generate_site,
+    site_columns,
+    site_constraints,
+    write_site_workbook,
+)
+from grading_utils import ProgressEvent  # noqa: E402
+
+CASES = ("flat", "flat_batched", "flat_shading", "terrain", "terrain_exact", "loaders", "api")
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings for one case at one site size."""
+
+    case: str
+    project_type: str
+    piles: int
+    trackers: int
+    runs: List[float]
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}[{self.piles}]"
+
+    @property
+    def best(self) -> float:
+        return min(self.runs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "best": self.best, "piles_per_second": self.piles / self.best}
+
+
+def _quietly(fn: Callable[[], Any]) -> Any:
+    """Run `fn` with the engines' progress prints and warnings suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return fn()
+
+
+def _timed(
+    case: str,
+    spec: SiteSpec,
+    setup: Callable[[], Any],
+    run: Callable[[Any, Callable[[ProgressEvent], None]], Any],
+    repeat: int,
+) -> BenchmarkResult:
+    """Time `run(setup(), progress)` `repeat` times, keeping the phases of the best run."""
+    runs: List[float] = []
+    best_phases: Dict[str, float] = {}
+    for _ in range(repeat):
+        state = setup()
+        phases: Dict[str, float] = {}
+
+        def progress(event: ProgressEvent) -> None:
+            phases[event.phase] = event.elapsed
+
+        started = time.perf_counter()
+        _quietly(lambda: run(state, progress))
+        runs.append(time.perf_counter() - started)
+        if runs[-1] == min(runs):
+            best_phases = phases
+    return BenchmarkResult(
+        case=case,
+        project_type=spec.project_type,
+        piles=spec.piles,
+        trackers=spec.trackers,
+        runs=runs,
+        phases=best_phases,
+    )
+
+
+def bench_engines(
+    size: int, case: str, repeat: int, workers: Optional[int], seed: int
+) -> List[BenchmarkResult]:
+    """
+    Time `flatTrackerGrading.main` (with or without shading), `flatBatchedGrading.main` or
+    `terrainTrackerGrading.main` (with the grid or exact shift solver).
+    """
+    if case in ("terrain", "terrain_exact"):
+        spec = SiteSpec.for_piles(size, project_type="terrain_following", seed=seed)
+        solver = "exact" if case == "terrain_exact" else "grid"
+        engine = partial(terrainTrackerGrading.main, workers=workers, solver=solver)
+    elif case == "flat_batched":
+        spec = SiteSpec.for_piles(size, seed=seed)
+        engine = flatBatchedGrading.main
+    else:
+        spec = SiteSpec.for_piles(size, with_shading=case == "flat_shading", seed=seed)
+        engine = partial(flatTrackerGrading.main, workers=workers)
+    return [
+        _timed(
+            case,
+            spec,
+            lambda: generate_site(spec),
+            lambda project, progress: engine(project, progress=progress),
+            repeat,
+        )
+    ]
+
+
+def bench_loaders(size: int, repeat: int, seed: int) -> List[BenchmarkResult]:
+    """Time the pandas and streaming Excel loaders for both sheet layouts."""
+    results = []
+    loaders = {
+        "standard": testing_get_data,
+        "terrain_following": testing_get_data_tf,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for project_type, module in loaders.items():
+            spec = SiteSpec.for_piles(size, project_type=project_type, seed=seed)
+            path = Path(tmp) / f"{project_type}.xlsx"
+            sheet = write_site_workbook(spec, path)
+            kwargs = dict(
+                excel_path=str(path),
+                sheet_name=sheet,
+                project_name="bench",
+                project_type=project_type,
+                constraints=site_constraints(spec),
+            )
+            for name, loader in (
+                ("load", module.load_project_from_excel),
+                ("stream", module.stream_project_from_excel),
+            ):
+                results.append(
+                    _timed(
+                        f"loader_{name}_{project_type}",
+                        spec,
+                        lambda: None,
+                        lambda _, progress, loader=loader: loader(**kwargs),
+                        repeat,
+                    )
+                )
+    return results
+
+
+def _api_request(spec: SiteSpec) -> Dict[str, Any]:
+    """Columnar /grade-project request for a site."""
+    columns = site_columns(spec)
+    constraints = site_constraints(spec)
+    return {
+        "tracker_type": "xtr" if spec.project_type == "terrain_following" else "flat",
+        "columns": {k: v.tolist() for k, v in columns.items() if k != "tracker_id"},
+        "constraints": {
+            "min_reveal_height": constraints.min_reveal_height,
+            "max_reveal_height": constraints.max_reveal_height,
+            "pile_install_tolerance": constraints.pile_install_tolerance,
+            "max_incline": constraints.max_incline * 100.0,  # the API takes percent
+            "target_height_percentage": constraints.target_height_percentage,
+            "max_angle_rotation": constraints.max_angle_rotation,
+            "edge_overhang": constraints.edge_overhang,
+            "max_segment_deflection_deg": constraints.max_segment_deflection_deg,
+            "max_cumulative_deflection_deg": constraints.max_cumulative_deflection_deg,
+        },
+    }
+
+
+def bench_api(size: int, repeat: int, seed: int) -> List[BenchmarkResult]:
+    """
+    Time POST /grade-project (graded, then answered from the result cache) and
+    POST /grade-project/stream for flat and XTR sites, in-process via TestClient.
+    """
+    from endpoints.grading import result_cache
+    from fastapi.testclient import TestClient
+
+    from backend.api.main import app
+
+    client = TestClient(app)
+    results = []
+    for project_type in ("standard", "terrain_following"):
+        spec = SiteSpec.for_piles(size, project_type=project_type, seed=seed)
+        body = json.dumps(_api_request(spec))
+
+        def post(path: str) -> None:
+            response = client.post(path, content=body, headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+
+        for case, path, setup in (
+            ("api_grade", "/api/grade-project", result_cache.clear),
+            ("api_grade_cached", "/api/grade-project", lambda: None),
+            ("api_stream", "/api/grade-project/stream", lambda: None),
+        ):
+            results.append(
+                _timed(
+                    f"{case}_{project_type}",
+                    spec,
+                    setup,
+                    lambda _, progress, path=path: post(path),
+                    repeat,
+                )
+            )
+    return results
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    cases: Sequence[str] = CASES,
+    repeat: int = 1,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    report: Callable[[BenchmarkResult], None] = lambda result: None,
+) -> List[BenchmarkResult]:
+    """Run the selected cases at every size, calling `report` as each result is ready."""
+    results = []
+    for size in sizes:
+        for case in cases:
+            if case in ("flat", "flat_batched", "flat_shading", "terrain", "terrain_exact"):
+                batch = bench_engines(size, case, repeat, workers, seed)
+            elif case == "loaders":
+                batch = bench_loaders(size, repeat, seed)
+            elif case == "api":
+                batch = bench_api(size, repeat, seed)
+            else:
+                raise ValueError(f"Unknown benchmark case '{case}'")
+            for result in batch:
+                report(result)
+            results.extend(batch)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def results_document(results: Sequence[BenchmarkResult], **settings: Any) -> Dict[str, Any]:
+    """JSON document holding the results and the environment they were measured in."""
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "settings": settings,
+        },
+        "results": [r.to_dict() for r in results],
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.25
+) -> List[str]:
+    """
+    Compare best times against a baseline results document.
+
+    Returns
+    -------
+    list[str]
+        One line per case present in both whose best time grew by more than `threshold`×.
+    """
+    before = {f"{r['case']}[{r['piles']}]": r["best"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        key = f"{r['case']}[{r['piles']}]"
+        if key in before and r["best"] > before[key] * threshold:
+            regressions.append(
+                f"{key}: {before[key]:.3f}s -> {r['best']:.3f}s ({r['best'] / before[key]:.2f}x)"
+            )
+    return regressions
+
+
+def _print_result(result: BenchmarkResult) -> None:
+    phases = ", ".join(f"{k}={v:.3f}s" for k, v in result.phases.items())
+    print(
+        f"{result.key:<45} best {result.best:9.3f}s  "
+        f"{result.piles / result.best:12,.0f} piles/s" + (f"  [{phases}]" if phases else ""),
+        flush=True,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        cases=args.cases,
+        repeat=args.repeat,
+        workers=args.workers,
+        seed=args.seed,
+        report=_print_result,
+    )
+    document = results_document(
+        results,
+        sizes=args.sizes,
+        cases=args.cases,
+        repeat=args.repeat,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    args.output.write_text(json.dumps(document, indent=2))
+    print(f"Results saved to {args.output}")
+
+    if args.compare is not None:
+        regressions = compare(json.loads(args.compare.read_text()), document, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
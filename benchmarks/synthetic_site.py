@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic solar sites for benchmarking the grading engines.
+
+A site is a grid of north-south trackers laid out in rows, over terrain made of a planar
+slope, a gentle undulation and per-pile noise. The same `SiteSpec` always produces the same
+project, so timings from different commits grade exactly the same piles.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from openpyxl import Workbook
+
+from BasePile import BasePile
+from BaseTracker import BaseTracker
+from Project import Project
+from ProjectConstraints import ProjectConstraints, ProjectType, ShadingConstraints
+from TerrainFollowingPile import TerrainFollowingPile
+from TerrainFollowingTracker import TerrainFollowingTracker
+
+# sheet names and header rows matching the two Excel loaders
+FLAT_SHEET = "Piling information"
+FLAT_HEADER = ["Tracker", "Row", "Pile", "Easting", "Northing", "", "", "", "Ground"]
+TF_SHEET = "TF"
+TF_HEADER = ["Point", "Northing", "Easting", "Elevation", "Description", "Frame"]
+
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """
+    Parameters of a synthetic site.
+
+    Attributes
+    ----------
+    project_type : {"standard", "terrain_following"}
+        Project (and tracker/pile class) to generate.
+    trackers : int
+        Number of trackers.
+    piles_per_tracker : int
+        Piles on every tracker.
+    pile_spacing : float
+        North-south distance between piles on a tracker (m).
+    pitch : float
+        East-west distance between tracker columns (m).
+    row_gap : float
+        North-south gap between consecutive trackers in a column (m).
+    stagger : float
+        Northing offset added per column (cycling over 7 columns), so neighbouring
+        columns are not perfectly aligned as on real sites (m).
+    ns_slope, ew_slope : float
+        Planar terrain slope towards north and east (rise/run).
+    undulation : float
+        Amplitude of the rolling terrain component (m).
+    wavelength : float
+        Wavelength of the rolling terrain component (m).
+    noise : float
+        Standard deviation of per-pile ground noise (m).
+    flood_fraction : float
+        Fraction of piles that get a flooding allowance.
+    flood_allowance : float
+        Flooding allowance given to those piles (m).
+    with_shading : bool
+        Build a standard project with `ShadingConstraints` and shading enabled.
+    seed : int
+        Random seed for the noise and flood allowances.
+    """
+
+    project_type: ProjectType = "standard"
+    trackers: int = 100
+    piles_per_tracker: int = 10
+    pile_spacing: float = 8.0
+    pitch: float = 5.8
+    row_gap: float = 4.0
+    stagger: float = 0.35
+    ns_slope: float = 0.03
+    ew_slope: float = 0.02
+    undulation: float = 0.6
+    wavelength: float = 150.0
+    noise: float = 0.08
+    flood_fraction: float = 0.1
+    flood_allowance: float = 0.2
+    with_shading: bool = False
+    seed: int = 0
+
+    @classmethod
+    def for_piles(cls, piles: int, **kwargs: Any) -> SiteSpec:
+        """Spec with about `piles` piles (rounded up to whole trackers)."""
+        spec = cls(**kwargs)
+        return replace(spec, trackers=max(1, math.ceil(piles / spec.piles_per_tracker)))
+
+    @property
+    def piles(self) -> int:
+        return self.trackers * self.piles_per_tracker
+
+    @property
+    def columns(self) -> int:
+        """Tracker columns, chosen so the site is roughly square."""
+        length = (self.piles_per_tracker - 1) * self.pile_spacing + self.row_gap
+        return max(1, round(math.sqrt(self.trackers * length / self.pitch)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def site_constraints(spec: SiteSpec) -> ProjectConstraints:
+    """Constraints typical of the project type, as used by the grading scripts."""
+    kwargs: Dict[str, Any] = dict(
+        min_reveal_height=1.375,
+        max_reveal_height=1.675,
+        pile_install_tolerance=0.1,
+        max_incline=0.10,
+        target_height_percentage=0.5,
+        max_angle_rotation=0.0,
+        edge_overhang=0.0,
+    )
+    if spec.project_type == "terrain_following":
+        kwargs.update(max_segment_deflection_deg=0.5, max_cumulative_deflection_deg=4.0)
+    if spec.with_shading:
+        return ShadingConstraints(
+            **kwargs,
+            azimuth_deg=120.0,
+            sun_angle_deg=35.0,
+            zenith_deg=55.0,
+            pitch=spec.pitch,
+            min_gap_btwn_end_modules=1.024,
+            module_length=2.382,
+            tracker_axis_angle=10.0,
+        )
+    return ProjectConstraints(**kwargs)
+
+
+def site_columns(spec: SiteSpec) -> Dict[str, np.ndarray]:
+    """
+    Per-pile input columns for a site, grouped by tracker and in pile order.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        tracker_id, pile_in_tracker, pile_id (object), northing, easting,
+        initial_elevation and flooding_allowance.
+    """
+    rng = np.random.default_rng(spec.seed)
+    n = spec.piles
+    tracker_id = np.repeat(np.arange(1, spec.trackers + 1, dtype=np.int64), spec.piles_per_tracker)
+    pile_in_tracker = np.tile(np.arange(1, spec.piles_per_tracker + 1), spec.trackers)
+
+    index = tracker_id - 1
+    column, row = index % spec.columns, index // spec.columns
+    length = (spec.piles_per_tracker - 1) * spec.pile_spacing
+    northing = (
+        1_000.0
+        + row * (length + spec.row_gap)
+        + (pile_in_tracker - 1) * spec.pile_spacing
+        + (column % 7) * spec.stagger
+    )
+    easting = 500.0 + column * spec.pitch
+
+    k = 2.0 * math.pi / spec.wavelength
+    elevation = (
+        100.0
+        + spec.ns_slope * (northing - 1_000.0)
+        + spec.ew_slope * (easting - 500.0)
+        + spec.undulation * np.sin(k * northing) * np.cos(0.7 * k * easting)
+        + rng.normal(0.0, spec.noise, n)
+    )
+    flooding = np.where(rng.random(n) < spec.flood_fraction, spec.flood_allowance, 0.0)
+
+    return {
+        "tracker_id": tracker_id,
+        "pile_in_tracker": pile_in_tracker.astype(np.int64),
+        "pile_id": np.array(
+            [f"{t}.{p:02d}" for t, p in zip(tracker_id.tolist(), pile_in_tracker.tolist())],
+            dtype=object,
+        ),
+        "northing": northing.astype(np.float64),
+        "easting": easting.astype(np.float64),
+        "initial_elevation": elevation,
+        "flooding_allowance": flooding,
+    }
+
+
+def generate_site(spec: SiteSpec, name: Optional[str] = None) -> Project:
+    """Build the project described by `spec`."""
+    terrain_following = spec.project_type == "terrain_following"
+    tracker_cls = TerrainFollowingTracker if terrain_following else BaseTracker
+    pile_cls = TerrainFollowingPile if terrain_following else BasePile
+
+    project = Project(
+        name=name or f"synthetic-{spec.project_type}-{spec.piles}",
+        project_type=spec.project_type,
+        constraints=site_constraints(spec),
+        with_shading=spec.with_shading,
+    )
+    columns = site_columns(spec)
+    rows = zip(*(columns[k].tolist() for k in columns))
+    tracker = None
+    for tid, pit, pile_id, northing, easting, elevation, flooding in rows:
+        if tracker is None or tracker.tracker_id != tid:
+            tracker = tracker_cls(tracker_id=tid)
+            project.add_tracker(tracker)
+        tracker.add_pile(
+            pile_cls(
+                northing=northing,
+                easting=easting,
+                initial_elevation=elevation,
+                pile_in_tracker=pit,
+                pile_id=pile_id,
+                flooding_allowance=flooding,
+            )
+        )
+    return project
+
+
+def write_site_workbook(spec: SiteSpec, path: str | Path) -> str:
+    """
+    Write a site as an Excel sheet in the layout its project type's loader reads.
+
+    Returns
+    -------
+    str
+        The sheet name to pass to the loader.
+    """
+    columns = site_columns(spec)
+    wb = Workbook(write_only=True)
+    if spec.project_type == "terrain_following":
+        sheet, header = TF_SHEET, TF_HEADER
+    else:
+        sheet, header = FLAT_SHEET, FLAT_HEADER
+    ws = wb.create_sheet(sheet)
+    ws.append(header)
+
+    rows = zip(
+        columns["tracker_id"].tolist(),
+        columns["pile_in_tracker"].tolist(),
+        columns["northing"].tolist(),
+        columns["easting"].tolist(),
+        columns["initial_elevation"].tolist(),
+    )
+    for point, (tid, pit, northing, easting, elevation) in enumerate(rows, start=1):
+        if sheet == TF_SHEET:
+            ws.append([point, northing, easting, elevation, pit, tid])
+        else:
+            ws.append([tid, None, pit, easting, northing, None, None, None, elevation])
+    wb.save(path)
+    return sheet
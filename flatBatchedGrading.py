@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Batched flat-tracker grading.
+
+Trackers are grouped by pile count and each group is graded as one stacked
+(trackers x piles) array problem: target lines, window violations, the slope/intercept grid
+search and the final grading are computed for every tracker of the group in single NumPy
+passes instead of one tracker at a time.
+
+`main` reproduces `flatTrackerGrading.main` exactly. Every candidate is scored with the
+same floating-point operations, in the same order, as the per-tracker grid search, and
+ties are broken the same way, so the graded piles are bit-for-bit identical.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from BaseTracker import BaseTracker
+from flatTrackerGrading import (
+    LineSolver,
+    apply_ew_analysis,
+    apply_ns_analysis,
+    slide_tracker_line,
+)
+from grading_utils import (
+    ProgressCallback,
+    ProgressReporter,
+    TrackerCallback,
+    instrumentation,
+    instrumented,
+    outside_window,
+    tracker_grading_costs,
+    warn_inverted_windows,
+    window_excess,
+    window_limits,
+)
+from Project import Project
+from shading.shadingAnalysis import main as shading_requirements
+
+# search settings used by `flatTrackerGrading.slide_tracker_line`
+SLOPE_TOLERANCE = 0.05
+SLOPE_STEPS = 11
+COARSE_STEPS = 121
+FINE_STEPS = 121
+FINE_SPAN_FRACTION = 0.1
+
+# upper bound on the (piles x trackers x candidates) arrays scored at once
+CHUNK_ELEMENTS = 1 << 21
+
+
+@dataclass(frozen=True)
+class TrackerStack:
+    """
+    Pile northings and grading windows of trackers that have the same number of piles,
+    one tracker per row.
+
+    Attributes
+    ----------
+    trackers : list[BaseTracker]
+        Trackers in row order.
+    northing : np.ndarray
+        (trackers, piles) pile northings, in `tracker.piles` order.
+    window_min, window_max : np.ndarray
+        (trackers, piles) grading window of each pile.
+    """
+
+    trackers: List[BaseTracker]
+    northing: np.ndarray
+    window_min: np.ndarray
+    window_max: np.ndarray
+
+    @classmethod
+    def from_trackers(cls, project: Project, trackers: List[BaseTracker]) -> "TrackerStack":
+        """
+        Stack trackers that all have the same, non-zero, number of piles.
+
+        Warns (UserWarning) for any pile whose window is inverted (min > max).
+        """
+        window_min, window_max = _stacked_window(project, trackers)
+        return cls(
+            trackers=trackers,
+            northing=_stacked(trackers, "northing"),
+            window_min=window_min,
+            window_max=window_max,
+        )
+
+    @property
+    def piles(self) -> int:
+        return self.northing.shape[1]
+
+    def evaluate(
+        self, rows: np.ndarray, slopes: np.ndarray, intercepts: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score candidate intercepts for many trackers at once; the stacked counterpart of
+        `TrackerWindowArrays.evaluate`.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Rows (trackers) to score.
+        slopes : np.ndarray
+            Slope of each row's line.
+        intercepts : np.ndarray
+            (rows, candidates) candidate intercepts of each row.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            (rows, candidates) costs and endpoint feasibility.
+        """
+        # piles on the leading axis, so costs are summed in pile order
+        northing = self.northing[rows].T[:, :, np.newaxis]
+        window_min = self.window_min[rows].T[:, :, np.newaxis]
+        window_max = self.window_max[rows].T[:, :, np.newaxis]
+
+        heights = slopes[np.newaxis, :, np.newaxis] * northing + intercepts[np.newaxis]
+        first, last = heights[0], heights[-1]
+        feasible = (
+            (window_min[0] <= first)
+            & (first <= window_max[0])
+            & (window_min[-1] <= last)
+            & (last <= window_max[-1])
+        )
+
+        # below + above, computed in place (heights is reused for above)
+        below = np.subtract(window_min, heights)
+        np.maximum(below, 0.0, out=below)
+        above = np.subtract(heights, window_max, out=heights)
+        np.maximum(above, 0.0, out=above)
+        below += above
+        return below.sum(axis=0), feasible
+
+    def line_heights(
+        self, rows: np.ndarray, slopes: np.ndarray, intercepts: np.ndarray
+    ) -> np.ndarray:
+        """(rows, piles) pile heights on one line per row."""
+        return slopes[:, np.newaxis] * self.northing[rows] + intercepts[:, np.newaxis]
+
+    def line_costs(
+        self, rows: np.ndarray, slopes: np.ndarray, intercepts: np.ndarray
+    ) -> np.ndarray:
+        """Grading cost of one line per row, as `_total_grading_cost` of its violations."""
+        heights = self.line_heights(rows, slopes, intercepts)
+        below_by, above_by = window_excess(heights, self.window_min[rows], self.window_max[rows])
+        bounds = np.arange(rows.size + 1) * self.piles
+        return tracker_grading_costs(below_by.ravel(), above_by.ravel(), bounds)
+
+
+def _stacked(trackers: List[BaseTracker], name: str) -> np.ndarray:
+    """(trackers, piles) array of one pile attribute."""
+    values = [getattr(p, name) for t in trackers for p in t.piles]
+    return np.array(values, dtype=np.float64).reshape(len(trackers), -1)
+
+
+def _stacked_window(project: Project, trackers: List[BaseTracker]) -> tuple[np.ndarray, np.ndarray]:
+    window_min, window_max = window_limits(
+        _stacked(trackers, "current_elevation"),
+        _stacked(trackers, "flooding_allowance"),
+        project.constraints,
+    )
+    warn_inverted_windows(
+        [p for t in trackers for p in t.piles], window_min.ravel(), window_max.ravel()
+    )
+    return window_min, window_max
+
+
+def _chunks(size: int, piles: int, candidates: int):
+    """Slices of at most CHUNK_ELEMENTS // (piles * candidates) rows covering `size`."""
+    step = max(1, CHUNK_ELEMENTS // (piles * candidates))
+    for start in range(0, size, step):
+        yield slice(start, min(start + step, size))
+
+
+def _set_heights(trackers: List[BaseTracker], heights: np.ndarray) -> None:
+    for tracker, row in zip(trackers, heights.tolist()):
+        for pile, h in zip(tracker.piles, row):
+            pile.height = h
+
+
+def _slope_candidates(
+    baseline: np.ndarray, *, max_abs_slope: float, tolerance: float, steps: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacked `flatTrackerGrading._slope_candidates`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (rows, columns) candidate slopes in ascending order and a mask of the valid ones;
+        each row's valid slopes are exactly the list `_slope_candidates` returns.
+    """
+    max_abs_slope = abs(max_abs_slope)
+    rows = baseline.size
+    if max_abs_slope == 0:
+        return np.zeros((rows, 1)), np.ones((rows, 1), dtype=bool)
+
+    base = np.maximum(-max_abs_slope, np.minimum(max_abs_slope, baseline))
+    band = np.abs(base) * tolerance
+    band = np.where(band == 0, max_abs_slope * tolerance, band)
+    lo = np.maximum(-max_abs_slope, base - band)
+    hi = np.minimum(max_abs_slope, base + band)
+
+    if steps < 2:
+        return base[:, np.newaxis], np.ones((rows, 1), dtype=bool)
+
+    grid = lo[:, np.newaxis] + (hi - lo)[:, np.newaxis] * np.arange(steps) / (steps - 1)
+    slopes = np.column_stack([grid, base])
+
+    # the grid is non-decreasing, so duplicates are neighbours; keep the first of each,
+    # and the baseline only when the grid does not already contain it
+    valid = np.ones(slopes.shape, dtype=bool)
+    valid[:, 1:steps] = grid[:, 1:] != grid[:, :-1]
+    valid[:, steps] = ~(grid == base[:, np.newaxis]).any(axis=1)
+    single = lo == hi
+    valid[single] = False
+    valid[single, steps] = True
+
+    order = np.argsort(np.where(valid, slopes, np.inf), axis=1, kind="stable")
+    return np.take_along_axis(slopes, order, axis=1), np.take_along_axis(valid, order, axis=1)
+
+
+def _intercept_search(
+    stack: TrackerStack,
+    rows: np.ndarray,
+    slopes: np.ndarray,
+    initial: np.ndarray,
+    span: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacked `find_optimal_line_intercept_vectorized` with the grid settings used by
+    `slide_tracker_line`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (best_intercept, best_cost) of each row; cost is inf (and the intercept the
+        initial one) where no candidate keeps the endpoints within their windows.
+    """
+    inf = float("inf")
+
+    coarse = (initial - span)[:, np.newaxis] + (2.0 * span)[:, np.newaxis] * (
+        np.arange(COARSE_STEPS) / (COARSE_STEPS - 1)
+    )
+    costs, feasible = stack.evaluate(rows, slopes, coarse)
+    costs = np.where(feasible, costs, inf)
+    k = np.argmin(costs, axis=1)
+    index = np.arange(rows.size)
+    best_b, best_cost = coarse[index, k], costs[index, k]
+    evaluated = coarse.size
+
+    # fine: rescore each active row's whole fine grid around its current best, take the
+    # first improvement at or after `start` and re-centre, as the per-tracker scan does
+    fine_span = span * FINE_SPAN_FRACTION
+    fractions = np.arange(FINE_STEPS) / (FINE_STEPS - 1)
+    start = np.zeros(rows.size, dtype=np.int64)
+    active = best_cost < inf
+    while active.any():
+        a = np.flatnonzero(active)
+        fine = (best_b[a] - fine_span[a])[:, np.newaxis] + (2.0 * fine_span[a])[
+            :, np.newaxis
+        ] * fractions
+        costs, feasible = stack.evaluate(rows[a], slopes[a], fine)
+        evaluated += int((FINE_STEPS - start[a]).sum())
+        improved = (
+            feasible
+            & (costs < best_cost[a][:, np.newaxis])
+            & (np.arange(FINE_STEPS) >= start[a][:, np.newaxis])
+        )
+        hit = improved.any(axis=1)
+        k = improved.argmax(axis=1)
+        moved, k = a[hit], k[hit]
+        best_b[moved] = fine[hit, k]
+        best_cost[moved] = costs[hit, k]
+        start[moved] = k + 1
+        active[a[~hit]] = False
+        active[moved[start[moved] >= FINE_STEPS]] = False
+    instrumentation.count("flat.find_optimal_line_intercept.candidates", evaluated)
+
+    return np.where(best_cost < inf, best_b, initial), best_cost
+
+
+def _slide_lines(
+    stack: TrackerStack,
+    rows: np.ndarray,
+    slope: np.ndarray,
+    intercept: np.ndarray,
+    span: np.ndarray,
+    max_incline: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacked `find_optimal_line_slope_and_intercept_2d`: best (slope, intercept) of each
+    row, starting from its target line.
+    """
+    inf = float("inf")
+
+    # baseline line, kept unless a candidate slope does strictly better
+    _, feasible = stack.evaluate(rows, slope, intercept[:, np.newaxis])
+    best_cost = np.where(feasible[:, 0], stack.line_costs(rows, slope, intercept), inf)
+    best_slope, best_b = slope.copy(), intercept.copy()
+
+    slopes, valid = _slope_candidates(
+        slope, max_abs_slope=max_incline, tolerance=SLOPE_TOLERANCE, steps=SLOPE_STEPS
+    )
+    for j in range(slopes.shape[1]):
+        sel = np.flatnonzero(valid[:, j])
+        if sel.size == 0:
+            continue
+        s = slopes[sel, j]
+        b, cost = _intercept_search(stack, rows[sel], s, intercept[sel], span[sel])
+        # the per-tracker search reports the cost of the chosen line's violations
+        found = cost < inf
+        cost[found] = stack.line_costs(rows[sel[found]], s[found], b[found])
+
+        better = cost < best_cost[sel]
+        sel = sel[better]
+        best_slope[sel], best_b[sel], best_cost[sel] = s[better], b[better], cost[better]
+    return best_slope, best_b
+
+
+@instrumented("flat.batched.target_lines")
+def target_lines(
+    project: Project, stack: TrackerStack
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stacked `flatTrackerGrading.target_height_line`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        Slope and intercept of each tracker's target-height line and the (trackers, piles)
+        pile heights on it.
+
+    Raises
+    ------
+    ValueError
+        If a multi-pile tracker's first and last piles share a northing.
+    """
+    target = stack.window_min + (stack.window_max - stack.window_min) * (
+        project.constraints.target_height_percentage
+    )
+    if stack.piles == 1:
+        rows = len(stack.trackers)
+        return np.zeros(rows), target[:, 0].copy(), target
+
+    first_target, last_target = target[:, 0], target[:, -1]
+    northing_diff = stack.northing[:, -1] - stack.northing[:, 0]
+    if (np.abs(northing_diff) < 1e-9).any():
+        raise ValueError(
+            "Cannot calculate slope: piles have identical northing coordinates "
+            "(vertical alignment). Check tracker pile positions."
+        )
+    slope = (last_target - first_target) / northing_diff
+
+    max_incline = project.constraints.max_incline
+    slope = np.where(
+        np.abs(slope) > abs(max_incline), np.where(slope > 0, max_incline, -max_incline), slope
+    )
+    intercept = first_target - slope * stack.northing[:, 0]
+    rows = np.arange(len(stack.trackers))
+    return slope, intercept, stack.line_heights(rows, slope, intercept)
+
+
+def slide_plans(stack: TrackerStack, heights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stacked `flatTrackerGrading.place_target_line` decision: the trackers that need their
+    line optimised, and the intercept span to search for each.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Rows with a pile outside its window at `heights`, and their intercept spans.
+    """
+    outside = outside_window(heights, stack.window_min, stack.window_max)
+    rows = np.flatnonzero(outside.any(axis=1))
+
+    # span from the window of each tracker's first violating pile
+    k = outside[rows].argmax(axis=1)
+    span = 4.0 * ((stack.window_max[rows, k] - stack.window_min[rows, k]) / 2.0)
+    return rows, np.where(span > 1e-6, span, 1e-6)
+
+
+@instrumented("flat.batched.slide_lines")
+def slide_lines(
+    project: Project,
+    stack: TrackerStack,
+    slope: np.ndarray,
+    intercept: np.ndarray,
+    heights: np.ndarray,
+    rows: np.ndarray,
+    span: np.ndarray,
+) -> np.ndarray:
+    """
+    Stacked `flatTrackerGrading.slide_tracker_line` with the grid solver.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    stack : TrackerStack
+        Trackers to optimise.
+    slope, intercept, heights : np.ndarray
+        Target lines and pile heights from `target_lines`.
+    rows, span : np.ndarray
+        Rows to optimise and their intercept spans, from `slide_plans`.
+
+    Returns
+    -------
+    np.ndarray
+        (trackers, piles) heights on the optimised lines (target heights for other rows).
+    """
+    heights = heights.copy()
+    for chunk in _chunks(rows.size, stack.piles, COARSE_STEPS):
+        r = rows[chunk]
+        best_slope, best_b = _slide_lines(
+            stack, r, slope[r], intercept[r], span[chunk], project.constraints.max_incline
+        )
+        heights[r] = stack.line_heights(r, best_slope, best_b)
+    return heights
+
+
+@instrumented("flat.batched.finalise")
+def finalise(project: Project, trackers: List[BaseTracker]) -> np.ndarray:
+    """
+    Stacked `flatTrackerGrading.finalise_tracker`, without touching the piles.
+
+    Returns
+    -------
+    np.ndarray
+        (4, trackers, piles) current elevation after grading, final elevation, total height
+        and revealed height of every pile.
+    """
+    current = _stacked(trackers, "current_elevation")
+    heights = _stacked(trackers, "height")
+    window_min, window_max = _stacked_window(project, trackers)
+
+    below_by, above_by = window_excess(heights, window_min, window_max)
+    graded = np.where(
+        outside_window(heights, window_min, window_max), current + (below_by + above_by), current
+    )
+    return np.stack([graded, graded, heights, heights - graded])
+
+
+def _by_pile_count(trackers: List[BaseTracker]) -> Dict[int, List[BaseTracker]]:
+    groups: Dict[int, List[BaseTracker]] = {}
+    for tracker in trackers:
+        groups.setdefault(len(tracker.piles), []).append(tracker)
+    return groups
+
+
+def main(
+    project: Project,
+    *,
+    solver: LineSolver = "grid",
+    progress: Optional[ProgressCallback] = None,
+    on_tracker_done: Optional[TrackerCallback] = None,
+) -> None:
+    """
+    Grade every tracker of a flat project, batched by pile count.
+
+    Drop-in replacement for `flatTrackerGrading.main` producing identical results, with
+    the same phases and progress events. The "target_line", "sliding" and "final_grading"
+    phases each run as a few stacked array passes per group of trackers with the same pile
+    count; the shading phases, when enabled, run as usual in between.
+
+    Parameters
+    ----------
+    project : Project
+        Project containing trackers and grading constraints.
+    solver : {"grid", "exact"}, default="grid"
+        Line optimiser. "grid" is batched; "exact" (already a per-tracker breakpoint
+        sweep) fits the sliding trackers one by one with `slide_tracker_line`.
+    progress : ProgressCallback | None, optional
+        Called with a `ProgressEvent` at the start of each phase and as each group (or
+        shading pass) completes it. Raising from the callback aborts the run.
+    on_tracker_done : TrackerCallback | None, optional
+        Called with each tracker, in `project.trackers` order, once its final outputs are
+        set. Raising from the callback aborts the run.
+
+    Returns
+    -------
+    None
+        Mutates the piles within `project.trackers` in-place.
+    """
+    if solver not in ("grid", "exact"):
+        raise ValueError(f"Unknown line solver '{solver}', expected 'grid' or 'exact'.")
+
+    # ensure piles in trackers are sorted north to south
+    project.renumber_piles_by_northing()
+
+    reporter = ProgressReporter(progress)
+    trackers = [t for t in project.trackers if t.piles]
+    groups = [
+        TrackerStack.from_trackers(project, group) for group in _by_pile_count(trackers).values()
+    ]
+
+    with reporter.phase("target_line", len(trackers)) as tick:
+        lines = []
+        done = 0
+        for stack in groups:
+            lines.append(target_lines(project, stack))
+            done += len(stack.trackers)
+            tick(done)
+
+    plans = [slide_plans(stack, heights) for stack, (_, _, heights) in zip(groups, lines)]
+    with reporter.phase("sliding", sum(rows.size for rows, _ in plans)) as tick:
+        done = 0
+        for stack, (slope, intercept, heights), (rows, span) in zip(groups, lines, plans):
+            if solver == "grid":
+                heights = slide_lines(project, stack, slope, intercept, heights, rows, span)
+                _set_heights(stack.trackers, heights)
+            else:
+                _set_heights(stack.trackers, heights)
+                for row, row_span in zip(rows.tolist(), span.tolist()):
+                    plan = (float(slope[row]), float(intercept[row]), row_span)
+                    slide_tracker_line(project, stack.trackers[row], plan, solver="exact")
+            done += rows.size
+            tick(done)
+
+    # Run shading analysis if required
+    if project.with_shading:
+        with reporter.phase("shading_analysis", 1) as tick:
+            ns_requirements, ew_requirements = shading_requirements(project)
+            tick(1)
+        for i in range(2):
+            with reporter.phase("shading_ns", 2) as tick:
+                apply_ns_analysis(project, ns_requirements)
+                tick(i + 1)
+            with reporter.phase("shading_ew", 2) as tick:
+                apply_ew_analysis(project, ew_requirements)
+                tick(i + 1)
+
+    with reporter.phase("final_grading", len(project.trackers)) as tick:
+        finals = {}
+        for group in _by_pile_count(trackers).values():
+            outputs = finalise(project, group)
+            for i, tracker in enumerate(group):
+                finals[id(tracker)] = outputs[:, i].tolist()
+
+        for done, tracker in enumerate(project.trackers, start=1):
+            values = finals.get(id(tracker))
+            if values is not None:
+                for pile, z, final_z, total_h, revealed in zip(tracker.piles, *values):
+                    pile.current_elevation = z
+                    pile.final_elevation = final_z
+                    pile.total_height = total_h
+                    pile.pile_revealed = revealed
+            if on_tracker_done is not None:
+                on_tracker_done(tracker)
+            tick(done)
@@ -2,11 +2,32 @@
 
 from bisect import bisect_left
 from collections import defaultdict
-import warnings
+from contextlib import closing
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
 
 from grading_utils import (
+    ProgressCallback,
+    ProgressEvent,
+    ProgressReporter,
+    TrackerCallback,
+    TrackerPayload,
+    TrackerResultCache,
+    grading_cost,
+    imap_trackers,
+    instrumentation,
+    instrumented,
+    map_trackers,
+    tracker_fingerprint,
+    tracker_window,
+    violation_records,
+    window_arrays,
+    window_excess,
+    window_records,
+    exact_offset_search as _exact_offset_search,
     y_intercept as _y_intercept,
     window_by_pile_in_tracker as _window_by_pile_in_tracker,
     interpolate_coords as _interpolate_coords,
@@ -22,6 +43,9 @@ from shading.shadingAnalysis import main as shading_requirements
 from testing_get_data import load_project_from_excel, to_excel
 
 
+LineSolver = Literal["grid", "exact"]
+
+
 @dataclass(frozen=True)
 class LineSearchResult:
     best_intercept: float
@@ -37,6 +61,137 @@ class Line2DSearchResult:
     best_violations: list[dict[str, float]]
 
 
+@dataclass(frozen=True)
+class TrackerWindowArrays:
+    """
+    Array-backed snapshot of a tracker's pile northings and grading window.
+
+    The grading window only depends on each pile's current ground elevation, so it can be
+    captured once per tracker and reused to score any number of candidate lines without
+    touching `pile.height`.
+
+    Attributes
+    ----------
+    pile_in_tracker : np.ndarray
+        Pile ids within the tracker, in `tracker.piles` order.
+    northing : np.ndarray
+        Pile northings (x-coordinate of the grading line).
+    window_min : np.ndarray
+        Minimum allowable pile height for each pile.
+    window_max : np.ndarray
+        Maximum allowable pile height for each pile.
+    """
+
+    pile_in_tracker: np.ndarray
+    northing: np.ndarray
+    window_min: np.ndarray
+    window_max: np.ndarray
+
+    @classmethod
+    def from_window(
+        cls, tracker: BaseTracker, window: list[dict[str, float]]
+    ) -> "TrackerWindowArrays":
+        """
+        Build the arrays from a tracker and the output of `grading_window(...)`.
+
+        Piles are stored in `tracker.piles` order, so index 0 and -1 are the first and last
+        piles used for the endpoint feasibility check.
+        """
+        window_min, window_max = window_arrays(window, tracker)
+        return cls(
+            pile_in_tracker=np.array([p.pile_in_tracker for p in tracker.piles], dtype=np.int64),
+            northing=np.array([p.northing for p in tracker.piles], dtype=np.float64),
+            window_min=window_min,
+            window_max=window_max,
+        )
+
+    @classmethod
+    def from_tracker(cls, project: Project, tracker: BaseTracker) -> "TrackerWindowArrays":
+        """
+        Build the arrays straight from the piles' ground elevations (`tracker_window`),
+        without building `grading_window` rows.
+        """
+        window_min, window_max = tracker_window(project, tracker)
+        return cls(
+            pile_in_tracker=np.array([p.pile_in_tracker for p in tracker.piles], dtype=np.int64),
+            northing=np.array([p.northing for p in tracker.piles], dtype=np.float64),
+            window_min=window_min,
+            window_max=window_max,
+        )
+
+    def line_cost(self, slope: float, intercept: float) -> float:
+        """
+        Grading cost of a single line, without touching `pile.height`.
+
+        Matches `grading_utils.tracker_cost` after
+        `_apply_line_to_tracker(tracker, slope, intercept)` bit for bit: heights are evaluated
+        per pile as in `_interpolate_coords` and the cost is summed in pile order.
+        """
+        heights = slope * self.northing + intercept
+        return grading_cost(*window_excess(heights, self.window_min, self.window_max))
+
+    def heights(self, slope: float, intercepts: np.ndarray) -> np.ndarray:
+        """Return a (piles x candidates) matrix of pile heights for each intercept."""
+        return slope * self.northing[:, np.newaxis] + intercepts[np.newaxis, :]
+
+    def evaluate(self, slope: float, intercepts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score many candidate intercepts for a fixed slope in one broadcasted operation.
+
+        Costs are reduced over the pile axis in pile order, so each candidate's cost is
+        accumulated in the same order as `_total_grading_cost(check_within_window(...))`.
+
+        Parameters
+        ----------
+        slope : float
+            Fixed slope of the grading line.
+        intercepts : np.ndarray
+            1D array of candidate y-intercepts.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            (costs, feasible) where `costs[k]` is the total grading cost of candidate k and
+            `feasible[k]` is True when the first and last piles lie within their windows.
+        """
+        heights = self.heights(slope, intercepts)
+        below = np.maximum(self.window_min[:, np.newaxis] - heights, 0.0)
+        above = np.maximum(heights - self.window_max[:, np.newaxis], 0.0)
+        costs = (below + above).sum(axis=0)
+
+        first, last = heights[0], heights[-1]
+        feasible = (
+            (self.window_min[0] <= first)
+            & (first <= self.window_max[0])
+            & (self.window_min[-1] <= last)
+            & (last <= self.window_max[-1])
+        )
+        return costs, feasible
+
+    def violations(self, slope: float, intercept: float) -> list[dict[str, float]]:
+        """
+        Return the violations for a single line in the same format as `check_within_window`.
+        """
+        heights = slope * self.northing + intercept
+        outside = np.flatnonzero((heights < self.window_min) | (heights > self.window_max))
+
+        violations = []
+        for i in outside:
+            wmin = float(self.window_min[i])
+            wmax = float(self.window_max[i])
+            height = float(heights[i])
+            violations.append(
+                {
+                    "pile_in_tracker": int(self.pile_in_tracker[i]),
+                    "grading_window_min": wmin,
+                    "grading_window_max": wmax,
+                    "below_by": min(0.0, height - wmin),
+                    "above_by": max(0.0, height - wmax),
+                }
+            )
+        return violations
+
+
 # Helper functions _y_intercept, _window_by_pile_in_tracker, _interpolate_coords,
 # and _total_grading_cost are imported from grading_utils.py
 
@@ -156,6 +311,7 @@ def _endpoints_within_window(
     return (fmin <= first.height <= fmax) and (lmin <= last.height <= lmax)
 
 
+@instrumented("flat.grading_window")
 def grading_window(project: Project, tracker: BaseTracker) -> list[dict[str, float]]:
     """
     Generate the grading window for all piles in a tracker.
@@ -173,29 +329,8 @@ def grading_window(project: Project, tracker: BaseTracker) -> list[dict[str, flo
         List of dictionaries describing grading limits and ground elevation
         for each pile.
     """
-    window = []
-    for pile in tracker.piles:
-        wmin = pile.true_min_height(project)
-        wmax = pile.true_max_height(project)
-
-        # Warn if inverted window (min > max) from excessive flooding/tolerance
-        if wmin > wmax:
-            warnings.warn(
-                f"Pile {pile.pile_id}: inverted grading window (min={wmin:.3f} > max={wmax:.3f}). "
-                "This may be caused by excessive flooding_allowance or pile_install_tolerance.",
-                UserWarning,
-            )
-
-        window.append(
-            {
-                "pile_id": pile.pile_id,
-                "pile_in_tracker": pile.pile_in_tracker,
-                "grading_window_min": wmin,
-                "grading_window_max": wmax,
-                "ground_elevation": pile.current_elevation,
-            }
-        )
-    return window
+    window_min, window_max = tracker_window(project, tracker)
+    return window_records(tracker, window_min, window_max)
 
 
 def target_height_line(tracker: BaseTracker, project: Project) -> tuple[float, float]:
@@ -254,6 +389,7 @@ def target_height_line(tracker: BaseTracker, project: Project) -> tuple[float, f
     return slope, y_intercept
 
 
+@instrumented("flat.check_within_window")
 def check_within_window(
     window: list[dict[str, float]], tracker: BaseTracker
 ) -> list[dict[str, float]]:
@@ -273,32 +409,12 @@ def check_within_window(
         List of dictionaries describing piles that violate the grading window.
         An empty list indicates no violations.
     """
-    limits = _window_by_pile_in_tracker(window)
-
-    violations = []
-    for pile in tracker.piles:
-        pid = pile.pile_in_tracker
-        if pid not in limits:
-            raise ValueError(f"Pile id {pid} not found in grading window")
-
-        wmin, wmax = limits[pid]
-        height = pile.height
-
-        # if the pile is outside the window, add it to the list and find how far away it is
-        if not wmin <= height <= wmax:
-            violations.append(
-                {
-                    "pile_in_tracker": pid,
-                    "grading_window_min": wmin,
-                    "grading_window_max": wmax,
-                    "below_by": min(0.0, height - wmin),
-                    "above_by": max(0.0, height - wmax),
-                }
-            )
-
+    violations = violation_records(tracker, *window_arrays(window, tracker))
+    instrumentation.count("flat.check_within_window.violations", len(violations))
     return violations
 
 
+@instrumented("flat.find_optimal_line_intercept")
 def find_optimal_line_intercept(
     *,
     tracker: BaseTracker,
@@ -388,6 +504,8 @@ def find_optimal_line_intercept(
             cost, violations, ok = eval_intercept(b)
             if ok and cost < best_cost:
                 best_cost, best_b, best_violations = cost, b, violations
+        instrumentation.count("flat.find_optimal_line_intercept.candidates", fine_steps)
+    instrumentation.count("flat.find_optimal_line_intercept.candidates", coarse_steps)
 
     # restore heights
     for pile, h in zip(tracker.piles, original_heights):
@@ -400,6 +518,88 @@ def find_optimal_line_intercept(
     return LineSearchResult(best_b, best_cost, best_violations)
 
 
+@instrumented("flat.find_optimal_line_intercept_vectorized")
+def find_optimal_line_intercept_vectorized(
+    *,
+    arrays: TrackerWindowArrays,
+    slope: float,
+    initial_intercept: float,
+    span: float,
+    coarse_steps: int = 121,
+    fine_steps: int = 121,
+    fine_span_fraction: float = 0.1,
+) -> LineSearchResult:
+    """
+    Array-backed equivalent of `find_optimal_line_intercept`.
+
+    Uses the same coarse and fine intercept grids, but scores every candidate of a grid in a
+    single (candidates x piles) NumPy operation against a fixed window snapshot. Pile heights
+    are never modified.
+
+    Parameters
+    ----------
+    arrays : TrackerWindowArrays
+        Northings and grading window of the tracker being optimised.
+    slope : float
+        Fixed slope of the grading line.
+    initial_intercept : float
+        Starting y-intercept about which the search is centred.
+    span : float
+        Half-width of the intercept search interval.
+    coarse_steps : int, default=121
+        Number of samples in the coarse grid.
+    fine_steps : int, default=121
+        Number of samples in the fine grid.
+    fine_span_fraction : float, default=0.1
+        Fine-search span is (span * fine_span_fraction) around the best coarse intercept.
+
+    Returns
+    -------
+    LineSearchResult
+        Same fields and fallbacks as `find_optimal_line_intercept`.
+    """
+    if arrays.northing.size == 0:
+        return LineSearchResult(initial_intercept, 0.0, [])
+
+    inf = float("inf")
+
+    # coarse: the grid is fixed, so the first minimum matches a strict `<` scan
+    coarse = (
+        initial_intercept - span + (2.0 * span) * (np.arange(coarse_steps) / (coarse_steps - 1))
+    )
+    costs, feasible = arrays.evaluate(slope, coarse)
+    costs = np.where(feasible, costs, inf)
+    k = int(np.argmin(costs))
+    best_b, best_cost = float(coarse[k]), float(costs[k])
+    evaluated = coarse.size
+
+    # fine around best coarse. The scalar search re-centres the remaining fine candidates
+    # every time it finds an improvement, so score the rest of the grid in one pass, take
+    # the first improvement and re-centre from there.
+    if best_cost < inf:
+        fine_span = span * fine_span_fraction
+        fractions = np.arange(fine_steps) / (fine_steps - 1)
+        start = 0
+        while start < fine_steps:
+            fine = best_b - fine_span + (2.0 * fine_span) * fractions[start:]
+            costs, feasible = arrays.evaluate(slope, fine)
+            evaluated += fine.size
+            improved = np.flatnonzero(feasible & (costs < best_cost))
+            if improved.size == 0:
+                break
+            k = int(improved[0])
+            best_b, best_cost = float(fine[k]), float(costs[k])
+            start += k + 1
+    instrumentation.count("flat.find_optimal_line_intercept.candidates", evaluated)
+
+    # If nothing feasible was found, fall back to initial intercept
+    if best_cost == inf:
+        return LineSearchResult(initial_intercept, inf, [])
+
+    best_violations = arrays.violations(slope, best_b)
+    return LineSearchResult(best_b, _total_grading_cost(best_violations), best_violations)
+
+
 def find_optimal_line_slope_and_intercept_2d(
     *,
     tracker: BaseTracker,
@@ -417,15 +617,15 @@ def find_optimal_line_slope_and_intercept_2d(
       - Enumerate candidate slopes in a small band around `baseline_slope`,
         clipped to +/- project.constraints.max_incline.
       - For each candidate slope, run a 1D intercept optimisation using
-        `find_optimal_line_intercept_feasible`, which:
-          * recomputes the grading window per candidate via grading_window(project, tracker)
+        `find_optimal_line_intercept_vectorized`, which:
+          * scores all intercepts of a grid against one grading window snapshot
           * enforces that the first and last piles are within their grading windows
 
     The objective is to minimise the total grading cost:
 
         sum(abs(below_by) + above_by) over violating piles
 
-    The tracker pile heights are restored to their original values before returning.
+    The tracker pile heights are not modified.
     The caller is responsible for applying the chosen line.
 
     Parameters
@@ -460,19 +660,15 @@ def find_optimal_line_slope_and_intercept_2d(
     if not tracker.piles:
         return Line2DSearchResult(baseline_slope, baseline_intercept, 0.0, [])
 
-    original_heights = [p.height for p in tracker.piles]
-
-    def window_fn():
-        return grading_window(project, tracker)
+    # The window only depends on ground elevations, so one snapshot serves every candidate
+    arrays = TrackerWindowArrays.from_window(tracker, grading_window(project, tracker))
 
     max_abs_slope = abs(project.constraints.max_incline)
 
     # Baseline Eval
-    # Apply baseline line (temporarily)
-    _apply_line_to_tracker(tracker, baseline_slope, baseline_intercept)
-    w0 = window_fn()
-    baseline_feasible = _endpoints_within_window(tracker, w0)
-    v0 = check_within_window(w0, tracker) if baseline_feasible else []
+    _, feasible0 = arrays.evaluate(baseline_slope, np.array([baseline_intercept]))
+    baseline_feasible = bool(feasible0[0])
+    v0 = arrays.violations(baseline_slope, baseline_intercept) if baseline_feasible else []
     c0 = _total_grading_cost(v0) if baseline_feasible else float("inf")
 
     best = Line2DSearchResult(
@@ -482,10 +678,6 @@ def find_optimal_line_slope_and_intercept_2d(
         best_violations=v0,
     )
 
-    # restore before searching
-    for pile, h in zip(tracker.piles, original_heights):
-        pile.height = h
-
     # Looping through slopes
     for s in _slope_candidates(
         baseline_slope,
@@ -493,14 +685,9 @@ def find_optimal_line_slope_and_intercept_2d(
         tolerance=slope_tolerance,
         steps=slope_steps,
     ):
-        # restore heights for this slope
-        for pile, h in zip(tracker.piles, original_heights):
-            pile.height = h
-
         # 1D intercept search
-        res1d = find_optimal_line_intercept(
-            tracker=tracker,
-            window_fn=window_fn,
+        res1d = find_optimal_line_intercept_vectorized(
+            arrays=arrays,
             slope=s,
             initial_intercept=baseline_intercept,
             span=intercept_span,
@@ -517,13 +704,203 @@ def find_optimal_line_slope_and_intercept_2d(
                 best_violations=res1d.best_violations,
             )
 
-    # restore heights
-    for pile, h in zip(tracker.piles, original_heights):
-        pile.height = h
-
     return best
 
 
+def _endpoint_intercept_bounds(arrays: TrackerWindowArrays, slope: float) -> tuple[float, float]:
+    """
+    Return the intercept interval that keeps the first and last piles within their windows:
+    wmin <= slope * northing + b <= wmax.
+    """
+    first = slope * arrays.northing[0]
+    last = slope * arrays.northing[-1]
+    lower = max(arrays.window_min[0] - first, arrays.window_min[-1] - last)
+    upper = min(arrays.window_max[0] - first, arrays.window_max[-1] - last)
+    return float(lower), float(upper)
+
+
+def _exact_intercept(
+    arrays: TrackerWindowArrays, slope: float, initial_intercept: float
+) -> tuple[float, float]:
+    """
+    Return (best_intercept, best_cost) for a fixed slope, or (initial_intercept, inf) if no
+    intercept keeps the first and last piles within their windows.
+    """
+    lower, upper = _endpoint_intercept_bounds(arrays, slope)
+    return _exact_offset_search(
+        slope * arrays.northing,
+        arrays.window_min,
+        arrays.window_max,
+        lower=lower,
+        upper=upper,
+        reference=initial_intercept,
+    )
+
+
+def _nudge_into_endpoint_windows(arrays: TrackerWindowArrays, slope: float, b: float) -> float:
+    """
+    An intercept sitting exactly on an endpoint bound can round just outside the window once
+    the line is evaluated; nudge it inwards so the endpoints pass the grid search check.
+    """
+    lower, upper = _endpoint_intercept_bounds(arrays, slope)
+    for _ in range(8):
+        _, feasible = arrays.evaluate(slope, np.array([b]))
+        if feasible[0]:
+            break
+        b = float(np.nextafter(b, 0.5 * (lower + upper)))
+    return b
+
+
+@instrumented("flat.find_optimal_line_intercept_exact")
+def find_optimal_line_intercept_exact(
+    *,
+    arrays: TrackerWindowArrays,
+    slope: float,
+    initial_intercept: float,
+) -> LineSearchResult:
+    """
+    Find the minimum-cost intercept for a fixed slope exactly.
+
+    For a fixed slope the grading cost is convex and piecewise-linear in the intercept, and
+    the endpoint requirement bounds the intercept to an interval. The optimum is found with
+    a sorted-breakpoint sweep (`grading_utils.exact_offset_search`) in O(n log n), so the
+    result is not limited by a grid resolution.
+
+    When several intercepts share the minimum cost, the one closest to `initial_intercept`
+    is returned.
+
+    Parameters
+    ----------
+    arrays : TrackerWindowArrays
+        Northings and grading window of the tracker being optimised.
+    slope : float
+        Fixed slope of the grading line.
+    initial_intercept : float
+        Preferred intercept, used to break ties and as the infeasible fallback.
+
+    Returns
+    -------
+    LineSearchResult
+        Same fields and fallbacks as `find_optimal_line_intercept`.
+    """
+    if arrays.northing.size == 0:
+        return LineSearchResult(initial_intercept, 0.0, [])
+
+    best_b, best_cost = _exact_intercept(arrays, slope, initial_intercept)
+    if best_cost == float("inf"):
+        return LineSearchResult(initial_intercept, float("inf"), [])
+
+    best_b = _nudge_into_endpoint_windows(arrays, slope, best_b)
+    best_violations = arrays.violations(slope, best_b)
+    return LineSearchResult(best_b, _total_grading_cost(best_violations), best_violations)
+
+
+def find_optimal_line_slope_and_intercept_exact(
+    *,
+    tracker: BaseTracker,
+    project: Project,
+    baseline_slope: float,
+    baseline_intercept: float,
+    slope_tolerance: float = 0.05,
+    slope_steps: int = 11,
+    refine_iterations: int = 60,
+    slope_resolution: float = 1e-9,
+) -> Line2DSearchResult:
+    """
+    Optimise the slope and intercept of a grading line using exact intercept solves.
+
+    For every slope the best intercept is found exactly with
+    `find_optimal_line_intercept_exact`. The resulting cost as a function of slope is
+    itself convex (it is the partial minimum of a convex function over a convex set), so
+    after scoring the same slope candidates as the grid search, a golden-section search
+    between the neighbours of the best candidate converges on the minimum-cost slope within
+    the search band.
+
+    The tracker pile heights are not modified. The caller is responsible for applying the
+    chosen line.
+
+    Parameters
+    ----------
+    tracker : BaseTracker
+        Tracker whose piles are evaluated.
+    project : Project
+        Project providing grading constraints and window rules.
+    baseline_slope : float
+        Initial slope estimate used to centre the slope search.
+    baseline_intercept : float
+        Preferred intercept, used to break ties between equal-cost intercepts.
+    slope_tolerance : float, default=0.05
+        Relative band half-width around the baseline slope (e.g. 0.05 = ±5%).
+    slope_steps : int, default=11
+        Number of candidate slopes scored before refining.
+    refine_iterations : int, default=60
+        Maximum number of golden-section iterations used to refine the slope.
+    slope_resolution : float, default=1e-9
+        Refinement stops once the slope bracket is narrower than this.
+
+    Returns
+    -------
+    Line2DSearchResult
+        Best slope, intercept, cost and violations found. `best_cost` is inf if no line
+        keeps both endpoints within their windows.
+    """
+    if not tracker.piles:
+        return Line2DSearchResult(baseline_slope, baseline_intercept, 0.0, [])
+
+    arrays = TrackerWindowArrays.from_window(tracker, grading_window(project, tracker))
+    inf = float("inf")
+
+    def solve(s: float) -> tuple[float, float]:
+        return _exact_intercept(arrays, s, baseline_intercept)
+
+    slopes = _slope_candidates(
+        baseline_slope,
+        max_abs_slope=abs(project.constraints.max_incline),
+        tolerance=slope_tolerance,
+        steps=slope_steps,
+    )
+    results = [solve(s) for s in slopes]
+
+    k = min(range(len(slopes)), key=lambda i: results[i][1])
+    best_slope, (best_b, best_cost) = slopes[k], results[k]
+
+    # golden-section refinement between the neighbours of the best candidate slope
+    a = slopes[max(k - 1, 0)]
+    c = slopes[min(k + 1, len(slopes) - 1)]
+    if best_cost < inf and c > a:
+        ratio = (5**0.5 - 1) / 2
+        x1, x2 = c - ratio * (c - a), a + ratio * (c - a)
+        r1, r2 = solve(x1), solve(x2)
+        for _ in range(refine_iterations):
+            if c - a < slope_resolution:
+                break
+            if r1[1] <= r2[1]:
+                c, x2, r2 = x2, x1, r1
+                x1 = c - ratio * (c - a)
+                r1 = solve(x1)
+            else:
+                a, x1, r1 = x1, x2, r2
+                x2 = a + ratio * (c - a)
+                r2 = solve(x2)
+
+        for s, (b, cost) in ((x1, r1), (x2, r2)):
+            if cost < best_cost:
+                best_slope, best_b, best_cost = s, b, cost
+
+    if best_cost == inf:
+        return Line2DSearchResult(baseline_slope, baseline_intercept, inf, [])
+
+    best_b = _nudge_into_endpoint_windows(arrays, best_slope, best_b)
+    best_violations = arrays.violations(best_slope, best_b)
+    return Line2DSearchResult(
+        best_slope=best_slope,
+        best_intercept=best_b,
+        best_cost=_total_grading_cost(best_violations),
+        best_violations=best_violations,
+    )
+
+
+@instrumented("flat.sliding_line")
 def sliding_line(
     tracker: BaseTracker,
     project: Project,
@@ -533,6 +910,7 @@ def sliding_line(
     intercept_span: float,
     slope_tolerance: float = 0.05,
     slope_steps: int = 11,
+    solver: LineSolver = "grid",
 ) -> tuple[float, float]:
     """
     Optimise the grading line (slope + intercept) and apply it to the tracker.
@@ -560,48 +938,49 @@ def sliding_line(
         Relative slope search band half-width (±5% by default).
     slope_steps : int, default=11
         Number of candidate slopes to evaluate.
+    solver : {"grid", "exact"}, default="grid"
+        "grid" samples a fixed coarse/fine intercept grid for each candidate slope.
+        "exact" solves each intercept exactly and refines the slope, ignoring
+        `intercept_span`.
 
     Returns
     -------
     tuple[float, float]
         (best_slope, best_intercept) chosen by the optimiser and applied to the tracker.
     """
-    res = find_optimal_line_slope_and_intercept_2d(
-        tracker=tracker,
-        project=project,
-        baseline_slope=slope,
-        baseline_intercept=y_intercept,
-        intercept_span=intercept_span,
-        slope_tolerance=slope_tolerance,
-        slope_steps=slope_steps,
-    )
+    if solver == "grid":
+        res = find_optimal_line_slope_and_intercept_2d(
+            tracker=tracker,
+            project=project,
+            baseline_slope=slope,
+            baseline_intercept=y_intercept,
+            intercept_span=intercept_span,
+            slope_tolerance=slope_tolerance,
+            slope_steps=slope_steps,
+        )
+    elif solver == "exact":
+        res = find_optimal_line_slope_and_intercept_exact(
+            tracker=tracker,
+            project=project,
+            baseline_slope=slope,
+            baseline_intercept=y_intercept,
+            slope_tolerance=slope_tolerance,
+            slope_steps=slope_steps,
+        )
+    else:
+        raise ValueError(f"Unknown line solver '{solver}', expected 'grid' or 'exact'.")
 
     # Apply chosen line
     _apply_line_to_tracker(tracker, res.best_slope, res.best_intercept)
     return res.best_slope, res.best_intercept
 
 
+@instrumented("flat.apply_ns_analysis")
 def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
-    analysed_tracker_ids = []  # keep a list of tracker ids that have already been analysed
-
-    for tracker in project.trackers:
-        if tracker.tracker_id in analysed_tracker_ids:
-            continue  # ensure we don't accidently loop over a tracker twice
-        # get a list of all the trackers that have the same easting
-        trackers_in_col = project.get_trackers_on_easting(
-            tracker.piles[0].easting, analysed_tracker_ids
-        )
-        # sort this list of trackers from northmost to southmost
-        trackers_in_col = sorted(
-            trackers_in_col,
-            key=lambda t: t.get_northmost_pile().northing,
-            reverse=True,
-        )
-
-        for t in trackers_in_col:
-            if t.tracker_id not in analysed_tracker_ids:
-                analysed_tracker_ids.append(t.tracker_id)
-
+    # window arrays of the trackers scored so far; shading only moves pile heights
+    windows: Dict[int, TrackerWindowArrays] = {}
+    # columns of trackers with the same easting, each sorted from northmost to southmost
+    for trackers_in_col in project.get_easting_columns():
         # loop through the pairs of trackers with the same northing
         for i in range(len(trackers_in_col) - 1):
             north = trackers_in_col[i]
@@ -633,6 +1012,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                     requirements["ns_max_height_diff"], height_diff_for_slope
                 )
                 change_required = height_diff - required_height_diff
+                instrumentation.count("flat.apply_ns_analysis.violations")
 
                 # determine which tracker is currently sitting up higher (needed to see which
                 # direction to move the trackers)
@@ -672,7 +1052,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         north_movement = -change_required
                         south_movement = 0
                     cost1, north_slope1, ny_int1, south_slope1, sy_int1 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # CASE 2: south pile moves up entirely
@@ -683,7 +1063,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         south_movement = change_required
                         north_movement = 0
                     cost2, north_slope2, ny_int2, south_slope2, sy_int2 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # CASE 3: north and south piles move equal amounts
@@ -698,7 +1078,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         north_movement = -half_change
                         south_movement = half_change
                     cost3, north_slope3, ny_int3, south_slope3, sy_int3 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # apply the line that produces the least grading costs
@@ -740,7 +1120,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         north_movement = change_required
                         south_movement = 0
                     cost1, north_slope1, ny_int1, south_slope1, sy_int1 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # CASE 2: south pile moves up entirely
@@ -751,7 +1131,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         south_movement = -change_required
                         north_movement = 0
                     cost2, north_slope2, ny_int2, south_slope2, sy_int2 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # CASE 3: north and south piles move equal amounts
@@ -766,7 +1146,7 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         north_movement = half_change
                         south_movement = -half_change
                     cost3, north_slope3, ny_int3, south_slope3, sy_int3 = test_tracker_movement(
-                        project, north, south, north_movement, south_movement
+                        project, north, south, north_movement, south_movement, windows
                     )
 
                     # apply the line that produces the least grading costs
@@ -781,8 +1161,11 @@ def apply_ns_analysis(project: Project, requirements: dict[str, float]) -> None:
                         _apply_line_to_tracker(south, south_slope3, sy_int3)
 
 
+@instrumented("flat.apply_ew_analysis")
 def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
     northings = _build_northing_index(project)
+    # window arrays of the trackers scored so far; shading only moves pile heights
+    windows: Dict[int, TrackerWindowArrays] = {}
     for tracker in project.trackers:
         for pile in tracker.piles:
             west_pile = _find_pile_west(
@@ -804,6 +1187,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                     requirements["ew_max_pile_height_diff"], height_diff_for_slope
                 )
                 change_required = required_height_diff - height_diff
+                instrumentation.count("flat.apply_ew_analysis.violations")
                 east_tracker = project.get_tracker_for_pile(pile)
                 west_tracker = project.get_tracker_for_pile(west_pile)
 
@@ -851,6 +1235,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # CASE 2: west pile moves up entirely
@@ -866,6 +1251,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # CASE 3: east and west piles move equal amounts
@@ -885,6 +1271,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # apply the line that produces the least grading costs
@@ -931,6 +1318,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # CASE 2: west pile moves up entirely
@@ -946,6 +1334,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # CASE 3: east and west piles move equal amounts
@@ -965,6 +1354,7 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         west_tracker,
                         east_movement,
                         west_movement,
+                        windows,
                     )
 
                     # apply the line that produces the least grading costs
@@ -979,56 +1369,74 @@ def apply_ew_analysis(project: Project, requirements: dict[str, float]) -> None:
                         _apply_line_to_tracker(west_tracker, west_slope3, wy_int3)
 
 
+def _end_pile_line(tracker: BaseTracker) -> tuple[float, float]:
+    """(slope, y_intercept) of the line through a tracker's first and last pile heights."""
+    first = tracker.get_first()
+    slope = (first.height - tracker.get_last().height) / tracker.distance_first_to_last_pile
+    return slope, _y_intercept(slope, first.northing, first.height)
+
+
+def _cached_window_arrays(
+    project: Project, tracker: BaseTracker, windows: Dict[int, TrackerWindowArrays]
+) -> TrackerWindowArrays:
+    """`TrackerWindowArrays.from_tracker`, built once per tracker id and kept in `windows`."""
+    arrays = windows.get(tracker.tracker_id)
+    if arrays is None:
+        arrays = windows[tracker.tracker_id] = TrackerWindowArrays.from_tracker(project, tracker)
+    return arrays
+
+
+@instrumented("flat.test_tracker_movement")
 def test_tracker_movement(
     project: Project,
     north_tracker: BaseTracker,
     south_tracker: BaseTracker,
     north_movement: float,
     south_movement: float,
+    windows: Optional[Dict[int, TrackerWindowArrays]] = None,
 ) -> tuple[float, float, float, float, float]:
-    # store original tracker heights
-    north_original_heights = [p.height for p in north_tracker.piles]
-    south_original_heights = [p.height for p in south_tracker.piles]
-
-    north_slope = (
-        north_tracker.get_first().height - north_tracker.get_last().height
-    ) / north_tracker.distance_first_to_last_pile()
-    ny_int = _y_intercept(
-        north_slope,
-        north_tracker.get_first().northing,
-        north_tracker.get_first().height,
-    )
-    south_slope = (
-        south_tracker.get_first().height - south_tracker.get_last().height
-    ) / south_tracker.distance_first_to_last_pile()
-    sy_int = _y_intercept(
-        south_slope,
-        south_tracker.get_first().northing,
-        south_tracker.get_first().height,
-    )
+    """
+    Grading cost of shifting the end-pile lines of two trackers up or down.
+
+    Each tracker's line runs through its first and last pile heights and is shifted by
+    its movement; a tracker that does not move adds no cost. Costs are computed from the
+    trackers' window arrays, so no pile heights are changed.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    north_tracker, south_tracker : BaseTracker
+        The pair of trackers being tested (east/west for the EW analysis).
+    north_movement, south_movement : float
+        Vertical shift of each tracker's line.
+    windows : dict[int, TrackerWindowArrays] | None
+        Window arrays by tracker id, filled in as trackers are first scored. Ground
+        elevations do not change during a shading pass, so one dict can be shared by
+        every call of the pass.
+
+    Returns
+    -------
+    tuple[float, float, float, float, float]
+        (cost, north_slope, north_intercept, south_slope, south_intercept) with the
+        intercepts already shifted.
+    """
+    if windows is None:
+        windows = {}
+    north_slope, ny_int = _end_pile_line(north_tracker)
+    south_slope, sy_int = _end_pile_line(south_tracker)
 
     north_cost = south_cost = 0
 
-    # apply the height changes to both trackers
     if north_movement != 0:
         ny_int += north_movement
-        _apply_line_to_tracker(north_tracker, north_slope, ny_int)
-        north_window = grading_window(project, north_tracker)
-        north_violations = check_within_window(north_window, north_tracker)
-        north_cost = _total_grading_cost(north_violations)
+        arrays = _cached_window_arrays(project, north_tracker, windows)
+        north_cost = arrays.line_cost(north_slope, ny_int)
 
     if south_movement != 0:
         sy_int += south_movement
-        _apply_line_to_tracker(south_tracker, south_slope, sy_int)
-        south_window = grading_window(project, south_tracker)
-        south_violations = check_within_window(south_window, south_tracker)
-        south_cost = _total_grading_cost(south_violations)
-
-    # revert all piles back to original heights
-    for pile, h in zip(north_tracker.piles, north_original_heights):
-        pile.height = h
-    for pile, h in zip(south_tracker.piles, south_original_heights):
-        pile.height = h
+        arrays = _cached_window_arrays(project, south_tracker, windows)
+        south_cost = arrays.line_cost(south_slope, sy_int)
 
     # return the total cost for grading
     return abs(north_cost + south_cost), north_slope, ny_int, south_slope, sy_int
@@ -1070,7 +1478,202 @@ def grading(tracker: BaseTracker, violating_piles: list[dict[str, float]]) -> No
         p.set_current_elevation(p.current_elevation + movement)
 
 
-def main(project: Project) -> None:
+# (slope, y_intercept, intercept_span) to start `sliding_line` from
+SlidePlan = tuple[float, float, float]
+
+
+def place_target_line(project: Project, tracker: BaseTracker) -> Optional[SlidePlan]:
+    """
+    Set a tracker's piles to its target-height line.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    tracker : BaseTracker
+        Tracker whose pile heights are updated in-place.
+
+    Returns
+    -------
+    SlidePlan | None
+        Starting line and intercept span for `slide_tracker_line` if any pile falls outside
+        its grading window, otherwise None (also for empty trackers).
+    """
+    if not tracker.piles:
+        return None
+
+    # determine the grading window for the tracker
+    window = grading_window(project, tracker)
+
+    # set the tracker piles to the target height line
+    slope, y_intercept = target_height_line(tracker, project)
+
+    # if at least one of the piles is outside the window, slide the line up
+    # or down to determine its optimal position
+    piles_outside = check_within_window(window, tracker)
+    if not piles_outside:
+        return None
+
+    window_half = (
+        piles_outside[0]["grading_window_max"] - piles_outside[0]["grading_window_min"]
+    ) / 2.0
+    return slope, y_intercept, max(1e-6, 4.0 * window_half)
+
+
+def slide_tracker_line(
+    project: Project, tracker: BaseTracker, plan: SlidePlan, *, solver: LineSolver = "grid"
+) -> None:
+    """
+    Optimise a tracker's line (slope + intercept) from the plan made by `place_target_line`.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    tracker : BaseTracker
+        Tracker whose pile heights are updated in-place.
+    plan : SlidePlan
+        Starting slope, intercept and intercept span.
+    solver : {"grid", "exact"}, default="grid"
+        Line optimiser used by `sliding_line`.
+    """
+    slope, y_intercept, intercept_span = plan
+    sliding_line(
+        tracker,
+        project,
+        slope,
+        y_intercept,
+        intercept_span=intercept_span,
+        slope_tolerance=0.05,
+        slope_steps=11,
+        solver=solver,
+    )
+
+
+def fit_tracker_line(
+    project: Project, tracker: BaseTracker, *, solver: LineSolver = "grid"
+) -> None:
+    """
+    Place a single tracker's piles on its optimal straight line.
+
+    Sets the piles to the target-height line and, if any pile falls outside its grading
+    window, optimises the line (slope + intercept) with `sliding_line`. Empty trackers are
+    left untouched.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    tracker : BaseTracker
+        Tracker whose pile heights are updated in-place.
+    solver : {"grid", "exact"}, default="grid"
+        Line optimiser used by `sliding_line`.
+    """
+    plan = place_target_line(project, tracker)
+    if plan is not None:
+        slide_tracker_line(project, tracker, plan, solver=solver)
+
+
+def finalise_tracker(project: Project, tracker: BaseTracker) -> None:
+    """
+    Grade any remaining violations on a tracker and record the final pile outputs.
+
+    Parameters
+    ----------
+    project : Project
+        Project providing the grading constraints.
+    tracker : BaseTracker
+        Tracker whose piles are graded and finalised in-place.
+    """
+    # Re-check after applying the optimal line (fresh window)
+    window = grading_window(project, tracker)
+    piles_outside = check_within_window(window, tracker)
+
+    if piles_outside:
+        grading(tracker, piles_outside)
+
+    # Set the final ground elevations, reveal heights and total heights of all piles,
+    # some will remain the same
+    for pile in tracker.piles:
+        pile.set_final_elevation(pile.current_elevation)
+        pile.set_total_height(pile.height)
+        pile.set_total_revealed()
+
+
+def _worker_tracker(project: Project, payload: TrackerPayload) -> tuple[Project, BaseTracker]:
+    """Rebuild a single-tracker project inside a worker process."""
+    worker_project = _shell_project(project)
+    tracker = payload.to_tracker(BaseTracker, BasePile)
+    worker_project.add_tracker(tracker)
+    return worker_project, tracker
+
+
+def _slide_tracker_line_worker(
+    project: Project, solver: LineSolver, item: tuple[TrackerPayload, SlidePlan]
+) -> np.ndarray:
+    """Process-pool task for `slide_tracker_line`; returns the fitted pile heights."""
+    payload, plan = item
+    worker_project, tracker = _worker_tracker(project, payload)
+    slide_tracker_line(worker_project, tracker, plan, solver=solver)
+    return np.array([p.height for p in tracker.piles], dtype=np.float64)
+
+
+def _finalise_tracker_worker(project: Project, payload: TrackerPayload) -> np.ndarray:
+    """Process-pool task for `finalise_tracker`; returns the tracker's `_final_outputs`."""
+    worker_project, tracker = _worker_tracker(project, payload)
+    finalise_tracker(worker_project, tracker)
+    return _final_outputs(tracker)
+
+
+def _final_outputs(tracker: BaseTracker) -> np.ndarray:
+    """
+    (4, piles) array of current elevation, final elevation, total height and revealed
+    height: everything `finalise_tracker` sets.
+    """
+    return np.array(
+        [
+            [p.current_elevation for p in tracker.piles],
+            [p.final_elevation for p in tracker.piles],
+            [p.total_height for p in tracker.piles],
+            [p.pile_revealed for p in tracker.piles],
+        ],
+        dtype=np.float64,
+    )
+
+
+def _apply_final_outputs(tracker: BaseTracker, finals: np.ndarray) -> None:
+    """Write `_final_outputs` back onto a tracker's piles."""
+    for pile, (z, final_z, total_h, revealed) in zip(tracker.piles, finals.T.tolist()):
+        pile.current_elevation = z
+        pile.final_elevation = final_z
+        pile.total_height = total_h
+        pile.pile_revealed = revealed
+
+
+def _set_heights(tracker: BaseTracker, heights: np.ndarray) -> None:
+    for pile, h in zip(tracker.piles, heights.tolist()):
+        pile.height = h
+
+
+def _shell_project(project: Project) -> Project:
+    """Copy of the project's settings without any trackers (cheap to pickle)."""
+    return Project(
+        name=project.name,
+        project_type=project.project_type,
+        constraints=project.constraints,
+        with_shading=project.with_shading,
+    )
+
+
+def main(
+    project: Project,
+    *,
+    solver: LineSolver = "grid",
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    on_tracker_done: Optional[TrackerCallback] = None,
+    cache: Optional[TrackerResultCache] = None,
+) -> None:
     """
     Run grading optimisation for all trackers in a project.
 
@@ -1082,10 +1685,37 @@ def main(project: Project) -> None:
       4) Recompute violations and apply grading if required.
       5) Finalise pile outputs (final elevation, total height, revealed height).
 
+    The run proceeds phase by phase across all trackers: "target_line" (steps 1-2),
+    "sliding" (step 3, only trackers with violations), the shading phases when enabled
+    ("shading_analysis", then alternating "shading_ns" and "shading_ew" passes) and
+    "final_grading" (steps 4-5). Trackers are independent in the sliding and final grading
+    phases, so with `workers > 1` those are fanned out to a process pool. Shading analysis
+    couples neighbouring trackers and always runs serially in between. Results are merged
+    back in tracker order, so parallel runs produce exactly the same output as serial ones.
+
     Parameters
     ----------
     project : Project
         Project containing trackers and grading constraints.
+    solver : {"grid", "exact"}, default="grid"
+        Line optimiser used by `sliding_line`.
+    workers : int | None, optional
+        Number of worker processes. None or 1 grades serially in-process.
+    progress : ProgressCallback | None, optional
+        Called with a `ProgressEvent` (phase, done/total, elapsed seconds in the phase) at
+        the start of each phase and as each tracker, or shading pass, completes it.
+        Raising from the callback aborts the run.
+    on_tracker_done : TrackerCallback | None, optional
+        Called with each tracker, in `project.trackers` order, as soon as its final
+        outputs are set, so results can be streamed while later trackers are still
+        grading. Raising from the callback aborts the run.
+    cache : TrackerResultCache | None, optional
+        Regrade incrementally. Each tracker's fitted line is cached under a fingerprint of
+        its pile inputs, the constraints and the solver, and its final outputs under a
+        fingerprint of its state after shading. Unchanged trackers reuse both, so only
+        edited trackers are fitted again. Shading always re-runs over the whole site (it
+        is cheap next to fitting), so its knock-on effects are exact: NS column and EW
+        west neighbours that shading moves differently are re-finalised.
 
     Returns
     -------
@@ -1095,62 +1725,101 @@ def main(project: Project) -> None:
     # ensure piles in trackers are sorted north to south
     project.renumber_piles_by_northing()
 
-    for tracker in project.trackers:
-        if not tracker.piles:
-            continue  # skip to the next tracker if the current one is empty
-
-        # determine the grading window for the tracker
-        window = grading_window(project, tracker)
-
-        # set the tracker piles to the target height line
-        slope, y_intercept = target_height_line(tracker, project)
-
-        # if at least one of the piles is outside the window, slide the line up
-        # or down to determine its optimal position
-        piles_outside = check_within_window(window, tracker)
-
-        if piles_outside:
-            window_half = (
-                piles_outside[0]["grading_window_max"] - piles_outside[0]["grading_window_min"]
-            ) / 2.0
-
-            intercept_span = max(1e-6, 4.0 * window_half)
-
-            slope, y_intercept = sliding_line(
-                tracker,
-                project,
-                slope,
-                y_intercept,
-                intercept_span=intercept_span,
-                slope_tolerance=0.05,
-                slope_steps=11,
+    reporter = ProgressReporter(progress)
+    parallel = workers is not None and workers > 1
+    shell = _shell_project(project)
+    trackers = [t for t in project.trackers if t.piles]
+
+    with reporter.phase("target_line", len(trackers)) as tick:
+        plans = []
+        fitted = []  # (tracker, fingerprint) of trackers to cache once their line is final
+        for done, tracker in enumerate(trackers, start=1):
+            heights = None
+            if cache is not None:
+                key = tracker_fingerprint(tracker, "fit", solver, project.constraints)
+                heights = cache.get(key)
+                if heights is None:
+                    fitted.append((tracker, key))
+            if heights is not None:
+                _set_heights(tracker, heights)
+            else:
+                plan = place_target_line(project, tracker)
+                if plan is not None:
+                    plans.append((tracker, plan))
+            tick(done)
+
+    with reporter.phase("sliding", len(plans)) as tick:
+        if parallel:
+            heights = map_trackers(
+                partial(_slide_tracker_line_worker, shell, solver),
+                [(TrackerPayload.from_tracker(t), plan) for t, plan in plans],
+                workers=workers,
+                on_done=tick,
             )
+            for (tracker, _), tracker_heights in zip(plans, heights):
+                _set_heights(tracker, tracker_heights)
+        else:
+            for done, (tracker, plan) in enumerate(plans, start=1):
+                slide_tracker_line(project, tracker, plan, solver=solver)
+                tick(done)
+
+    for tracker, key in fitted:
+        cache.put(key, np.array([p.height for p in tracker.piles], dtype=np.float64))
 
     # Run shading analysis if required
     if project.with_shading:
-        print("start shading")
-        ns_requirements, ew_requirements = shading_requirements(project)
-        for _ in range(2):
-            apply_ns_analysis(project, ns_requirements)
-            apply_ew_analysis(project, ew_requirements)
-        print("end shading")
-
-    print("Start Grading ...")
-    # final grading for all trackers and piles
-    for tracker in project.trackers:
-        # Re-check after applying the optimal line (fresh window)
-        window = grading_window(project, tracker)
-        piles_outside = check_within_window(window, tracker)
+        with reporter.phase("shading_analysis", 1) as tick:
+            ns_requirements, ew_requirements = shading_requirements(project)
+            tick(1)
+        for i in range(2):
+            with reporter.phase("shading_ns", 2) as tick:
+                apply_ns_analysis(project, ns_requirements)
+                tick(i + 1)
+            with reporter.phase("shading_ew", 2) as tick:
+                apply_ew_analysis(project, ew_requirements)
+                tick(i + 1)
+
+    # final grading for all trackers and piles; cached outputs are keyed on the
+    # post-shading state, so trackers moved by shading are always re-finalised
+    with reporter.phase("final_grading", len(project.trackers)) as tick:
+        keys: list[Optional[str]] = [None] * len(project.trackers)
+        cached: list[Optional[np.ndarray]] = [None] * len(project.trackers)
+        if cache is not None:
+            for i, tracker in enumerate(project.trackers):
+                keys[i] = tracker_fingerprint(tracker, "final_grading", project.constraints)
+                cached[i] = cache.get(keys[i])
+        pending = [t for t, finals in zip(project.trackers, cached) if finals is None]
+
+        if parallel:
+            outputs = imap_trackers(
+                partial(_finalise_tracker_worker, shell),
+                [TrackerPayload.from_tracker(t) for t in pending],
+                workers=workers,
+            )
+        else:
 
-        if piles_outside:
-            grading(tracker, piles_outside)
+            def _finalise_serial():
+                for tracker in pending:
+                    finalise_tracker(project, tracker)
+                    yield _final_outputs(tracker) if cache is not None else None
 
-        # Set the final ground elevations, reveal heights and total heights of all piles,
-        # some will remain the same
-        for pile in tracker.piles:
-            pile.set_final_elevation(pile.current_elevation)
-            pile.set_total_height(pile.height)
-            pile.set_total_revealed()
+            outputs = _finalise_serial()
+
+        with closing(outputs):
+            for done, (tracker, key, finals) in enumerate(
+                zip(project.trackers, keys, cached), start=1
+            ):
+                if finals is None:
+                    finals = next(outputs)
+                    if key is not None:
+                        cache.put(key, finals)
+                    if parallel:
+                        _apply_final_outputs(tracker, finals)
+                else:
+                    _apply_final_outputs(tracker, finals)
+                if on_tracker_done is not None:
+                    on_tracker_done(tracker)
+                tick(done)
 
 
 if __name__ == "__main__":
@@ -1201,8 +1870,12 @@ if __name__ == "__main__":
         with_shading=shading,
     )
 
+    def print_phase(event: ProgressEvent) -> None:
+        if event.done == 0:
+            print(f"Start {event.phase} ...")
+
     print("Find Optimal Line...")
-    main(project)
+    main(project, progress=print_phase)
     to_excel(project)
     print("Results saved to final_pile_elevations_slide_twice.xlsx")
     # print("Comparing results to expected outcome...")
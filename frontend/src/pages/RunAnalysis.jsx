@@ -25,6 +25,7 @@ export default function RunAnalysis() {
 
   const [gradingResults, setGradingResults] = useState(null);
   const [gradingLoading, setGradingLoading] = useState(false);
+  const [gradingProgress, setGradingProgress] = useState(null);
   const [sidebarOpen, setSidebarOpen] = useState(false);
   const [sidebarSearch, setSidebarSearch] = useState("");
   const [okPage, setOkPage] = useState(0);
@@ -275,7 +276,15 @@ export default function RunAnalysis() {
     setGradingResults(null);
 
     try {
-      const piles = [];
+      // Send piles as parallel arrays (one per field) rather than one object per pile:
+      // a much smaller body that the backend validates column by column.
+      const columns = {
+        pile_id: [],
+        pile_in_tracker: [],
+        easting: [],
+        northing: [],
+        initial_elevation: [],
+      };
       const zLS = JSON.parse(localStorage.getItem("pcl_columns_z") || "[]");
       const n = Math.min(frame.length, pole.length, x.length, y.length, zLS.length);
 
@@ -286,20 +295,15 @@ export default function RunAnalysis() {
         const yv = toNum(y[i]);
         const zv = toNum(zLS[i]);
         if (f && p && xv !== null && yv !== null && zv !== null) {
-          const pileId = parseFloat(`${f}.${p.padStart(2, "0")}`);
-
-          piles.push({
-            pile_id: pileId,
-            pile_in_tracker: parseInt(p),
-            easting: xv,
-            northing: yv,
-            initial_elevation: zv,
-            flooding_allowance: 0.0,
-          });
+          columns.pile_id.push(parseFloat(`${f}.${p.padStart(2, "0")}`));
+          columns.pile_in_tracker.push(parseInt(p));
+          columns.easting.push(xv);
+          columns.northing.push(yv);
+          columns.initial_elevation.push(zv);
         }
       }
 
-      if (piles.length === 0) throw new Error("No valid piles found to grade.");
+      if (columns.pile_id.length === 0) throw new Error("No valid piles found to grade.");
 
       const params = JSON.parse(localStorage.getItem("pcl_parameters") || "{}");
 
@@ -312,7 +316,7 @@ export default function RunAnalysis() {
 
       const request = {
         tracker_type: trackerType,
-        piles: piles,
+        columns,
         constraints: {
           min_reveal_height: parseFloat(params.minPileReveal),
           max_reveal_height: parseFloat(params.maxPileReveal),
@@ -326,7 +330,10 @@ export default function RunAnalysis() {
         },
       };
 
-      const res = await fetch(`${config.API_BASE_URL}/api/grade-project`, {
+      // Queue the grade as a background job rather than holding one long request open
+      // for the whole run.
+      const jobsUrl = `${config.API_BASE_URL}/api/grade-project/jobs`;
+      const res = await fetch(jobsUrl, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(request),
@@ -337,12 +344,35 @@ export default function RunAnalysis() {
         throw new Error(errText);
       }
 
-      const result = await res.json();
+      // Follow the job's server-sent progress events until it finishes.
+      const submitted = await res.json();
+      const job = await new Promise((resolve, reject) => {
+        const source = new EventSource(`${jobsUrl}/${submitted.job_id}/events`);
+        source.addEventListener("progress", (ev) => setGradingProgress(JSON.parse(ev.data)));
+        source.addEventListener("end", (ev) => {
+          source.close();
+          resolve(JSON.parse(ev.data));
+        });
+        source.onerror = () => {
+          source.close();
+          reject(new Error("Lost connection to grading job"));
+        };
+      });
+
+      if (job.status !== "completed") {
+        throw new Error(job.error || `Grading ${job.status}`);
+      }
+
+      const resultRes = await fetch(`${jobsUrl}/${job.job_id}/result`);
+      if (!resultRes.ok) throw new Error(await resultRes.text());
+
+      const result = await resultRes.json();
       setGradingResults(result);
     } catch (e) {
       setError(e.message || "Grading failed");
     } finally {
       setGradingLoading(false);
+      setGradingProgress(null);
     }
   }
 
@@ -557,7 +587,11 @@ export default function RunAnalysis() {
               disabled={gradingLoading}
               title="Run grading using backend constraints"
             >
-              {gradingLoading ? "Running Grading..." : "Run Grading"}
+              {gradingLoading
+                ? gradingProgress?.total
+                  ? `Grading (${gradingProgress.phase}) ${gradingProgress.done}/${gradingProgress.total}...`
+                  : "Running Grading..."
+                : "Run Grading"}
             </button>
 
             {gradingResults && (
@@ -5,11 +5,37 @@ Common utility functions shared between flat and terrain tracker grading modules
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import math
+import os
+import threading
+import time
+import warnings
 from bisect import bisect_left
-from typing import DefaultDict, Dict, List, Optional, Protocol
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+import numpy as np
 
 from Project import Project
 from BasePile import BasePile
+from TrackerABC import TrackerABC
 
 
 class PileProtocol(Protocol):
@@ -18,6 +44,452 @@ class PileProtocol(Protocol):
     northing: float
 
 
+@dataclass(frozen=True)
+class TrackerPayload:
+    """
+    Compact, picklable snapshot of one tracker's pile inputs and grading state.
+
+    Used to ship trackers to worker processes without pickling the pile objects or the
+    rest of the project. Arrays are stored in `tracker.piles` order.
+
+    Attributes
+    ----------
+    tracker_id : int
+        Id of the tracker.
+    pile_id : tuple
+        Pile ids (kept as given: str, float or int).
+    pile_in_tracker : np.ndarray
+        Pile positions within the tracker.
+    northing, easting : np.ndarray
+        Pile coordinates.
+    initial_elevation, current_elevation : np.ndarray
+        Original and current ground elevations.
+    flooding_allowance : np.ndarray
+        Flooding allowance for each pile.
+    height : np.ndarray
+        Current pile heights.
+    """
+
+    tracker_id: int
+    pile_id: tuple
+    pile_in_tracker: np.ndarray
+    northing: np.ndarray
+    easting: np.ndarray
+    initial_elevation: np.ndarray
+    current_elevation: np.ndarray
+    flooding_allowance: np.ndarray
+    height: np.ndarray
+
+    @classmethod
+    def from_tracker(cls, tracker: TrackerABC) -> TrackerPayload:
+        """Snapshot a tracker's piles."""
+        piles = tracker.piles
+        return cls(
+            tracker_id=tracker.tracker_id,
+            pile_id=tuple(p.pile_id for p in piles),
+            pile_in_tracker=np.array([p.pile_in_tracker for p in piles], dtype=np.int64),
+            northing=np.array([p.northing for p in piles], dtype=np.float64),
+            easting=np.array([p.easting for p in piles], dtype=np.float64),
+            initial_elevation=np.array([p.initial_elevation for p in piles], dtype=np.float64),
+            current_elevation=np.array([p.current_elevation for p in piles], dtype=np.float64),
+            flooding_allowance=np.array([p.flooding_allowance for p in piles], dtype=np.float64),
+            height=np.array([p.height for p in piles], dtype=np.float64),
+        )
+
+    def to_tracker(self, tracker_cls: Type[TrackerABC], pile_cls: Type[BasePile]) -> TrackerABC:
+        """
+        Rebuild a tracker with fresh pile objects carrying the snapshot state.
+
+        Values are converted back to Python floats so the rebuilt piles behave exactly like
+        the originals.
+        """
+        tracker = tracker_cls(tracker_id=self.tracker_id)  # type: ignore[call-arg]
+        for pid, pit, n, e, z0, z, fa, h in zip(
+            self.pile_id,
+            self.pile_in_tracker.tolist(),
+            self.northing.tolist(),
+            self.easting.tolist(),
+            self.initial_elevation.tolist(),
+            self.current_elevation.tolist(),
+            self.flooding_allowance.tolist(),
+            self.height.tolist(),
+        ):
+            pile = pile_cls(
+                northing=n,
+                easting=e,
+                initial_elevation=z0,
+                pile_id=pid,
+                pile_in_tracker=pit,
+                flooding_allowance=fa,
+            )
+            pile.current_elevation = z
+            pile.height = h
+            tracker.add_pile(pile)
+        return tracker
+
+
+@dataclass
+class TimerStats:
+    """Calls to, and total seconds spent in, one instrumented function or phase."""
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Instrumentation:
+    """
+    Opt-in named timers and counters for the grading hot paths.
+
+    Functions decorated with `instrumented` record a timer each call, and the grading code
+    adds counters such as candidate evaluations and violations found. Grading phases are
+    timed as "phase.<name>". Disabled by default (set PCL_INSTRUMENT=1, or use
+    `instrument()`); while disabled, instrumented functions pay for a single flag check.
+
+    Timers are inclusive of any instrumented functions they call. Only work done in this
+    process is recorded: trackers graded in worker processes (`workers > 1`) are not.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.timers: Dict[str, TimerStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add `n` to a counter (no-op while disabled)."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one call taking `seconds` to a timer."""
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = TimerStats()
+            stats.calls += 1
+            stats.seconds += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the current timers and counters, as plain JSON-serialisable data."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "timers": {
+                    name: {"calls": t.calls, "seconds": t.seconds}
+                    for name, t in self.timers.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+
+instrumentation = Instrumentation(enabled=os.environ.get("PCL_INSTRUMENT", "0") not in ("", "0"))
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    """Decorator recording calls to, and time spent in, the function under timer `name`."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not instrumentation.enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                instrumentation.record(name, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+@contextmanager
+def instrument(reset: bool = True) -> Iterator[Instrumentation]:
+    """
+    Enable instrumentation for the duration of a block, optionally starting from zero.
+
+    Yields the shared `instrumentation`; read it with `snapshot()` inside or after the block.
+    """
+    previous = instrumentation.enabled
+    if reset:
+        instrumentation.reset()
+    instrumentation.enabled = True
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.enabled = previous
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """
+    Progress of one grading phase, as reported to a `ProgressCallback`.
+
+    Attributes
+    ----------
+    phase : str
+        Phase name, e.g. "target_line", "sliding", "shading_ns", "final_grading".
+    done, total : int
+        Units completed so far and in total (trackers, or passes for the shading phases).
+    elapsed : float
+        Seconds spent in this phase so far.
+    """
+
+    phase: str
+    done: int
+    total: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Units completed per second in this phase (0 before any time has elapsed)."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# progress(event): called by the grading mains as each tracker completes a phase
+ProgressCallback = Callable[[ProgressEvent], None]
+
+# on_tracker_done(tracker): called by the grading mains once a tracker's outputs are final
+TrackerCallback = Callable[[TrackerABC], None]
+
+
+class ProgressReporter:
+    """
+    Times the phases of a grading run and forwards progress events to a callback.
+
+    A phase may be entered more than once (the shading passes alternate NS and EW); its
+    elapsed time accumulates across entries and its start event is only sent the first
+    time.
+
+    Attributes
+    ----------
+    timings : dict[str, float]
+        Seconds spent in each phase entered so far, in the order they were first entered.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[ProgressCallback] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._callback = callback
+        self._clock = clock
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str, total: int) -> Iterator[Callable[[int], None]]:
+        """
+        Time a phase. Yields `tick(done)`, which reports `done` of `total` units.
+
+        Raising from the callback propagates out of `tick`, aborting the run.
+        """
+        base = self.timings.get(name)
+        started = self._clock()
+
+        def tick(done: int) -> None:
+            if self._callback is not None:
+                elapsed = (base or 0.0) + self._clock() - started
+                self._callback(ProgressEvent(name, done, total, elapsed))
+
+        if base is None:
+            self.timings[name] = 0.0
+            tick(0)
+        try:
+            yield tick
+        finally:
+            spent = self._clock() - started
+            self.timings[name] = (base or 0.0) + spent
+            if instrumentation.enabled:
+                instrumentation.record(f"phase.{name}", spent)
+
+
+# pile state that determines a tracker's grading result, in fingerprint order
+_FINGERPRINT_COLUMNS = (
+    "pile_in_tracker",
+    "northing",
+    "easting",
+    "initial_elevation",
+    "current_elevation",
+    "flooding_allowance",
+    "height",
+)
+
+
+def tracker_fingerprint(tracker: TrackerABC, *context: Any) -> str:
+    """
+    Content hash of a tracker's piles plus whatever else its grading result depends on.
+
+    Covers the tracker id, pile ids and every pile input and grading-state value, in
+    `tracker.piles` order, so two trackers with equal fingerprints grade identically under
+    the same `context` (constraints, solver, stage name, ...), which is hashed via `repr`.
+
+    Returns
+    -------
+    str
+        Hex digest, stable across processes and runs.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((context, tracker.tracker_id, [p.pile_id for p in tracker.piles])).encode())
+    h.update(
+        np.array(
+            [[getattr(p, name) for name in _FINGERPRINT_COLUMNS] for p in tracker.piles],
+            dtype=np.float64,
+        ).tobytes()
+    )
+    return h.hexdigest()
+
+
+class TrackerResultCache:
+    """
+    Bounded, thread-safe LRU map from tracker fingerprints to per-tracker grading results.
+
+    Passed to the grading mains to regrade incrementally: trackers whose fingerprint is
+    already cached take the stored result instead of being graded again. Stored values are
+    shared between runs and must be treated as read-only.
+
+    Parameters
+    ----------
+    max_entries : int
+        Entries kept before the least recently used are evicted.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for `key` (marking it recently used), or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result, evicting the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def imap_trackers(
+    fn: Callable[[Any], Any],
+    items: Sequence[Any],
+    *,
+    workers: Optional[int],
+    chunksize: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Lazily apply `fn` to every item, fanning out to a process pool when `workers > 1`.
+
+    Results are yielded in the same order as `items` as soon as each one (and every result
+    before it) is ready, so callers can merge and hand on finished trackers while later
+    ones are still being graded.
+
+    Parameters
+    ----------
+    fn : Callable
+        Module-level (picklable) function applied to each item.
+    items : Sequence
+        Per-tracker work items.
+    workers : int | None
+        Number of worker processes. None, 0 or 1 runs serially in-process.
+    chunksize : int | None, optional
+        Items sent to a worker per task. Defaults to splitting the work into roughly four
+        chunks per worker.
+
+    Yields
+    ------
+    Any
+        `fn(item)` for each item, in order. Closing the iterator early, or an exception
+        raised by the consumer, cancels any queued pool tasks.
+    """
+    if not workers or workers <= 1 or len(items) < 2:
+        for item in items:
+            yield fn(item)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(items) / (workers * 4)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            yield from executor.map(fn, items, chunksize=chunksize)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def map_trackers(
+    fn: Callable[[Any], Any],
+    items: Sequence[Any],
+    *,
+    workers: Optional[int],
+    chunksize: Optional[int] = None,
+    on_done: Optional[Callable[[int], None]] = None,
+) -> list[Any]:
+    """
+    Apply `fn` to every item, fanning out to a process pool when `workers > 1`.
+
+    Results are returned in the same order as `items`, so merging them back into a project
+    is deterministic regardless of which worker finished first.
+
+    Parameters
+    ----------
+    fn : Callable
+        Module-level (picklable) function applied to each item.
+    items : Sequence
+        Per-tracker work items.
+    workers : int | None
+        Number of worker processes. None, 0 or 1 runs serially in-process.
+    chunksize : int | None, optional
+        See `imap_trackers`.
+    on_done : Callable[[int], None] | None, optional
+        Called with the number of results collected so far, after each result (in order).
+        An exception raised here stops the run and any queued pool tasks.
+
+    Returns
+    -------
+    list
+        `[fn(item) for item in items]`
+    """
+    results = []
+    with closing(imap_trackers(fn, items, workers=workers, chunksize=chunksize)) as pending:
+        for result in pending:
+            results.append(result)
+            if on_done is not None:
+                on_done(len(results))
+    return results
+
+
 def y_intercept(slope: float, x: float, y: float) -> float:
     """
     Compute the y-intercept (b) of a line y = m*x + b given a point (x, y) and slope m.
@@ -108,6 +580,283 @@ def total_grading_cost(violating_piles: list[dict[str, float]]) -> float:
     return sum(abs(v["below_by"]) + v["above_by"] for v in violating_piles)
 
 
+# ---------------------------------------------------------------------------
+# Array kernels for grading windows, violations and costs.
+#
+# Every kernel works on flat float64 arrays of piles; a run of several trackers is the
+# trackers' piles back to back with `bounds` (tracker k is rows bounds[k]:bounds[k + 1]).
+# Costs are summed sequentially in pile order, so they match the dict-based functions
+# bit for bit.
+# ---------------------------------------------------------------------------
+
+
+def window_limits(
+    current_elevation: np.ndarray,
+    flooding_allowance: np.ndarray,
+    constraints: Any,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Grading window of each pile, as `BasePile.true_min_height`/`true_max_height`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (window_min, window_max)
+    """
+    tolerance = constraints.pile_install_tolerance / 2
+    window_min = current_elevation + constraints.min_reveal_height + flooding_allowance + tolerance
+    window_max = current_elevation + constraints.max_reveal_height - tolerance
+    return window_min, window_max
+
+
+def outside_window(
+    heights: np.ndarray, window_min: np.ndarray, window_max: np.ndarray
+) -> np.ndarray:
+    """Boolean mask of piles whose height is not within [window_min, window_max]."""
+    return ~((window_min <= heights) & (heights <= window_max))
+
+
+def window_excess(
+    heights: np.ndarray, window_min: np.ndarray, window_max: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    How far each pile lies outside its window.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (below_by, above_by): below_by <= 0 is height - window_min where the pile is below
+        its window, above_by >= 0 is height - window_max where it is above, 0 otherwise.
+    """
+    below = heights - window_min
+    above = heights - window_max
+    # same as min(0.0, d) / max(0.0, d): NaN and -0.0 map to 0.0
+    return np.where(below < 0.0, below, 0.0), np.where(above > 0.0, above, 0.0)
+
+
+def grading_cost(below_by: np.ndarray, above_by: np.ndarray) -> float:
+    """Total grading cost of one tracker, sum(|below_by| + above_by) in pile order."""
+    if below_by.size == 0:
+        return 0.0
+    # accumulate (unlike sum) adds strictly left to right
+    return float(np.add.accumulate(np.abs(below_by) + above_by)[-1])
+
+
+def tracker_grading_costs(
+    below_by: np.ndarray, above_by: np.ndarray, bounds: np.ndarray
+) -> np.ndarray:
+    """
+    Total grading cost of each tracker in a run of trackers.
+
+    Parameters
+    ----------
+    below_by, above_by : np.ndarray
+        Output of `window_excess` for every pile of the run.
+    bounds : np.ndarray
+        Tracker row offsets, length trackers + 1.
+
+    Returns
+    -------
+    np.ndarray
+        Cost of each tracker, each summed in pile order like `grading_cost`.
+    """
+    bounds = np.asarray(bounds, dtype=np.int64)
+    lengths = np.diff(bounds)
+    if lengths.size == 0:
+        return np.zeros(0, dtype=np.float64)
+    # one padded row per tracker; padding adds 0.0, which leaves the sums unchanged
+    padded = np.zeros((lengths.size, max(int(lengths.max()), 1)), dtype=np.float64)
+    rows = np.repeat(np.arange(lengths.size), lengths)
+    cols = np.arange(bounds[-1] - bounds[0]) - np.repeat(bounds[:-1] - bounds[0], lengths)
+    padded[rows, cols] = (np.abs(below_by) + above_by)[bounds[0] : bounds[-1]]
+    return np.add.accumulate(padded, axis=1)[:, -1]
+
+
+def tracker_window(project: Project, tracker: TrackerABC) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Grading window of each pile of a tracker, in `tracker.piles` order.
+
+    Warns (UserWarning) for any pile whose window is inverted (min > max).
+    """
+    piles = tracker.piles
+    window_min, window_max = window_limits(
+        np.array([p.current_elevation for p in piles], dtype=np.float64),
+        np.array([p.flooding_allowance for p in piles], dtype=np.float64),
+        project.constraints,
+    )
+    warn_inverted_windows(piles, window_min, window_max)
+    return window_min, window_max
+
+
+def warn_inverted_windows(
+    piles: Sequence[BasePile], window_min: np.ndarray, window_max: np.ndarray
+) -> None:
+    """Warn (UserWarning) for each pile whose window is inverted (min > max)."""
+    for i in np.flatnonzero(window_min > window_max).tolist():
+        warnings.warn(
+            f"Pile {piles[i].pile_id}: inverted grading window "
+            f"(min={window_min[i]:.3f} > max={window_max[i]:.3f}). "
+            "This may be caused by excessive flooding_allowance or pile_install_tolerance.",
+            UserWarning,
+        )
+
+
+def tracker_heights(tracker: TrackerABC) -> np.ndarray:
+    return np.array([p.height for p in tracker.piles], dtype=np.float64)
+
+
+def window_records(
+    tracker: TrackerABC, window_min: np.ndarray, window_max: np.ndarray
+) -> list[dict[str, float]]:
+    """`grading_window`-style rows for a tracker's window arrays."""
+    return [
+        {
+            "pile_id": pile.pile_id,
+            "pile_in_tracker": pile.pile_in_tracker,
+            "grading_window_min": wmin,
+            "grading_window_max": wmax,
+            "ground_elevation": pile.current_elevation,
+        }
+        for pile, wmin, wmax in zip(tracker.piles, window_min.tolist(), window_max.tolist())
+    ]
+
+
+def window_arrays(
+    window: list[dict[str, float]], tracker: TrackerABC
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Window min/max arrays in `tracker.piles` order from `grading_window`-style rows.
+
+    Raises
+    ------
+    ValueError
+        If a pile of the tracker has no row in the window.
+    """
+    limits = window_by_pile_in_tracker(window)
+    try:
+        rows = [limits[p.pile_in_tracker] for p in tracker.piles]
+    except KeyError as e:
+        raise ValueError(f"Pile id {e.args[0]} not found in grading window") from None
+    return (
+        np.array([wmin for wmin, _ in rows], dtype=np.float64),
+        np.array([wmax for _, wmax in rows], dtype=np.float64),
+    )
+
+
+def violation_records(
+    tracker: TrackerABC, window_min: np.ndarray, window_max: np.ndarray
+) -> list[dict[str, float]]:
+    """
+    `check_within_window`-style violation rows for the piles of a tracker that lie
+    outside the given window.
+    """
+    heights = tracker_heights(tracker)
+    index = np.flatnonzero(outside_window(heights, window_min, window_max))
+    if index.size == 0:
+        return []
+    window_min, window_max = window_min[index], window_max[index]
+    below_by, above_by = window_excess(heights[index], window_min, window_max)
+    piles = tracker.piles
+    return [
+        {
+            "pile_in_tracker": piles[i].pile_in_tracker,
+            "grading_window_min": wmin,
+            "grading_window_max": wmax,
+            "below_by": below,
+            "above_by": above,
+        }
+        for i, wmin, wmax, below, above in zip(
+            index.tolist(),
+            window_min.tolist(),
+            window_max.tolist(),
+            below_by.tolist(),
+            above_by.tolist(),
+        )
+    ]
+
+
+def tracker_cost(project: Project, tracker: TrackerABC) -> float:
+    """
+    Grading cost of a tracker at its current pile heights, against a fresh window; the
+    array equivalent of `total_grading_cost(check_within_window(grading_window(...)))`.
+    """
+    window_min, window_max = tracker_window(project, tracker)
+    return grading_cost(*window_excess(tracker_heights(tracker), window_min, window_max))
+
+
+def exact_offset_search(
+    base: np.ndarray,
+    window_min: np.ndarray,
+    window_max: np.ndarray,
+    *,
+    lower: float,
+    upper: float,
+    reference: float,
+    tie_tolerance: float = 1e-9,
+) -> tuple[float, float]:
+    """
+    Find the uniform offset `b` that minimises the grading cost of heights `base + b`.
+
+    The cost
+
+        cost(b) = sum(max(0, window_min - (base + b)) + max(0, (base + b) - window_max))
+
+    is convex and piecewise-linear in `b`, with breakpoints at each pile's window edges
+    (`window_min - base` and `window_max - base`). The minimum over `[lower, upper]` is
+    therefore attained at a breakpoint or an interval end, so every such candidate is scored
+    with sorted prefix sums in O(n log n) instead of sampling a grid.
+
+    Parameters
+    ----------
+    base : np.ndarray
+        Pile heights before the offset is applied (e.g. `slope * northing`).
+    window_min : np.ndarray
+        Minimum allowable pile height for each pile.
+    window_max : np.ndarray
+        Maximum allowable pile height for each pile.
+    lower : float
+        Smallest feasible offset.
+    upper : float
+        Largest feasible offset.
+    reference : float
+        Preferred offset. When several offsets share the minimum cost (a flat section of
+        the cost curve), the one closest to `reference` is returned.
+    tie_tolerance : float, default=1e-9
+        Costs within this amount of the minimum are treated as equal.
+
+    Returns
+    -------
+    tuple[float, float]
+        (best_offset, best_cost). Returns (reference, inf) if `lower > upper`.
+    """
+    if lower > upper:
+        return reference, float("inf")
+
+    # Work relative to the reference so the prefix sums stay small for large coordinates
+    ref = min(upper, max(lower, reference))
+    lo = np.sort(window_min - base - ref)
+    hi = np.sort(window_max - base - ref)
+    lo_cum = np.concatenate(([0.0], np.cumsum(lo)))
+    hi_cum = np.concatenate(([0.0], np.cumsum(hi)))
+    n = lo.size
+
+    candidates = np.concatenate((lo, hi, [lower - ref, upper - ref, 0.0]))
+    candidates = candidates[(candidates >= lower - ref) & (candidates <= upper - ref)]
+
+    # piles still below the window: lo > b, each costs (lo - b)
+    i_lo = np.searchsorted(lo, candidates, side="right")
+    below = (lo_cum[n] - lo_cum[i_lo]) - (n - i_lo) * candidates
+    # piles above the window: hi < b, each costs (b - hi)
+    i_hi = np.searchsorted(hi, candidates, side="left")
+    above = i_hi * candidates - hi_cum[i_hi]
+    costs = below + above
+
+    best_cost = float(costs.min())
+    ties = np.flatnonzero(costs <= best_cost + tie_tolerance)
+    k = ties[np.argmin(np.abs(candidates[ties]))]
+    return float(candidates[k]) + ref, float(costs[k])
+
+
 def build_northing_index(
     project: Project,
 ) -> Dict[float, List[tuple[float, BasePile]]]:
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Export graded pile results to columnar files (Parquet, Arrow IPC, CSV) or, on request, xlsx.
+
+Results are gathered column by column straight from the piles (or from the project's
+`PileArray` when it has one) and written in tracker-aligned chunks, so large projects are
+never materialised as per-pile dicts.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional, Sequence
+
+import numpy as np
+
+from PileArray import PileView, TerrainFollowingPileView
+from Project import Project
+from TrackerABC import TrackerABC
+
+try:  # optional: only needed for Parquet/Arrow output
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+    pq = None
+
+ResultFormat = Literal["parquet", "arrow", "csv", "xlsx"]
+
+# output column order, matching to_excel in the loaders
+RESULT_COLUMNS = (
+    "tracker_id",
+    "pile_id",
+    "pile_in_tracker",
+    "northing",
+    "easting",
+    "initial_elevation",
+    "final_elevation",
+    "change",
+    "total_height",
+    "total_revealed",
+)
+
+_SUFFIX_FORMATS: Dict[str, ResultFormat] = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+}
+
+# source attribute for each float column read from the piles
+_FLOAT_SOURCES = {
+    "northing": "northing",
+    "easting": "easting",
+    "initial_elevation": "initial_elevation",
+    "final_elevation": "final_elevation",
+    "total_height": "total_height",
+    "total_revealed": "pile_revealed",
+}
+
+
+def result_columns(project: Project, trackers: Sequence[TrackerABC]) -> Dict[str, np.ndarray]:
+    """
+    Collect the result columns for the given trackers, in `tracker.piles` order.
+
+    When every pile is a view onto `project.pile_array`, the columns are gathered from the
+    store's arrays; otherwise each column is read from the piles in one pass.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        One array per name in `RESULT_COLUMNS`. `pile_id` is an object array holding the
+        ids as given.
+    """
+    piles = [p for t in trackers for p in t.piles]
+    tracker_id = np.repeat(
+        np.array([t.tracker_id for t in trackers], dtype=np.int64),
+        [len(t.piles) for t in trackers],
+    )
+
+    store = project.pile_array
+    if store is not None and all(
+        isinstance(p, (PileView, TerrainFollowingPileView)) and p._store is store for p in piles
+    ):
+        rows = np.array([p._index for p in piles], dtype=np.int64)
+        floats = {name: getattr(store, src)[rows] for name, src in _FLOAT_SOURCES.items()}
+        pile_in_tracker = store.pile_in_tracker[rows]
+        pile_id = np.array([store.pile_id[i] for i in rows.tolist()], dtype=object)
+    else:
+        floats = {
+            name: np.array([getattr(p, src) for p in piles], dtype=np.float64)
+            for name, src in _FLOAT_SOURCES.items()
+        }
+        pile_in_tracker = np.array([p.pile_in_tracker for p in piles], dtype=np.int64)
+        pile_id = np.array([p.pile_id for p in piles], dtype=object)
+
+    columns = {
+        "tracker_id": tracker_id,
+        "pile_id": pile_id,
+        "pile_in_tracker": pile_in_tracker,
+        **floats,
+        "change": floats["final_elevation"] - floats["initial_elevation"],
+    }
+    return {name: columns[name] for name in RESULT_COLUMNS}
+
+
+def iter_result_chunks(
+    project: Project, chunk_rows: Optional[int] = None
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Yield result columns in chunks of whole trackers.
+
+    Parameters
+    ----------
+    project : Project
+        Graded project.
+    chunk_rows : int | None, optional
+        Target rows per chunk; a chunk closes once it reaches this many rows, so trackers
+        are never split. None yields a single chunk.
+    """
+    if chunk_rows is not None and chunk_rows < 1:
+        raise ValueError("chunk_rows must be >= 1")
+
+    batch: List[TrackerABC] = []
+    rows = 0
+    for tracker in project.trackers:
+        batch.append(tracker)
+        rows += len(tracker.piles)
+        if chunk_rows is not None and rows >= chunk_rows:
+            yield result_columns(project, batch)
+            batch, rows = [], 0
+
+    if batch or not project.trackers:
+        yield result_columns(project, batch)
+
+
+def write_results(
+    project: Project,
+    path: str | Path,
+    *,
+    fmt: Optional[ResultFormat] = None,
+    chunk_rows: Optional[int] = None,
+) -> Path:
+    """
+    Write the graded pile results for a project.
+
+    Parameters
+    ----------
+    project : Project
+        Graded project.
+    path : str | Path
+        Output file chosen by the caller.
+    fmt : {"parquet", "arrow", "csv", "xlsx"}, optional
+        Output format. Inferred from the file suffix when omitted. xlsx is supported for
+        hand-off spreadsheets but is much slower than the columnar formats.
+    chunk_rows : int | None, optional
+        Stream the output in chunks of about this many rows (whole trackers per chunk).
+        Parquet chunks become row groups and Arrow chunks record batches.
+
+    Returns
+    -------
+    Path
+        The path written.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown or cannot be inferred.
+    ImportError
+        If Parquet/Arrow output is requested without pyarrow installed.
+    """
+    path = Path(path)
+    if fmt is None:
+        fmt = _SUFFIX_FORMATS.get(path.suffix.lower())
+        if fmt is None:
+            raise ValueError(f"Cannot infer result format from '{path.name}'; pass fmt=")
+
+    chunks = iter_result_chunks(project, chunk_rows)
+    if fmt == "csv":
+        _write_csv(path, chunks)
+    elif fmt == "parquet":
+        _write_parquet(path, chunks)
+    elif fmt == "arrow":
+        _write_arrow(path, chunks)
+    elif fmt == "xlsx":
+        _write_xlsx(path, chunks)
+    else:
+        raise ValueError(f"Unknown result format '{fmt}'")
+    return path
+
+
+def _column_lists(chunk: Dict[str, np.ndarray]) -> List[List[Any]]:
+    """Convert chunk columns to Python lists (native ints/floats) in RESULT_COLUMNS order."""
+    return [chunk[name].tolist() for name in RESULT_COLUMNS]
+
+
+def _write_csv(path: Path, chunks: Iterator[Dict[str, np.ndarray]]) -> None:
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(zip(*_column_lists(chunk)))
+
+
+def _write_xlsx(path: Path, chunks: Iterator[Dict[str, np.ndarray]]) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(RESULT_COLUMNS)
+    for chunk in chunks:
+        for row in zip(*_column_lists(chunk)):
+            ws.append(row)
+    wb.save(path)
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet/Arrow result export requires pyarrow (pip install pyarrow)")
+
+
+def _arrow_table(chunk: Dict[str, np.ndarray]) -> Any:
+    columns = dict(chunk)
+    # ids arrive as str, int or float depending on the loader; store them as text
+    columns["pile_id"] = np.array([str(v) for v in chunk["pile_id"].tolist()], dtype=object)
+    return pa.table({name: columns[name] for name in RESULT_COLUMNS})
+
+
+def _write_parquet(path: Path, chunks: Iterator[Dict[str, np.ndarray]]) -> None:
+    _require_pyarrow()
+    writer = None
+    try:
+        for chunk in chunks:
+            table = _arrow_table(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_arrow(path: Path, chunks: Iterator[Dict[str, np.ndarray]]) -> None:
+    _require_pyarrow()
+    writer = None
+    try:
+        for chunk in chunks:
+            table = _arrow_table(chunk)
+            if writer is None:
+                writer = pa.ipc.new_file(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -5,26 +5,9 @@ from shading.NorthSouth import NorthSouth
 
 
 def main(ns: NorthSouth, project: Project) -> list[tuple[int, int, float]]:
-    analysed_tracker_ids = []  # keep a list of tracker ids that have already been analysed
     violating_trackers = []
-    for tracker in project.trackers:
-        if tracker.tracker_id in analysed_tracker_ids:
-            continue  # ensure we don't accidently loop over a tracker twice
-        # get a list of all the trackers that have the same easting
-        trackers_in_col = project.get_trackers_on_easting(
-            tracker.piles[0].easting, analysed_tracker_ids
-        )
-        # sort this list of trackers from northmost to southmost
-        trackers_in_col = sorted(
-            trackers_in_col,
-            key=lambda t: t.get_northmost_pile().northing,
-            reverse=True,
-        )
-
-        for t in trackers_in_col:
-            if t.tracker_id not in analysed_tracker_ids:
-                analysed_tracker_ids.append(t.tracker_id)
-
+    # columns of trackers with the same easting, each sorted from northmost to southmost
+    for trackers_in_col in project.get_easting_columns():
         # loop through the trackers with the same northing and determine if each pair is underneath
         for i in range(len(trackers_in_col) - 1):
             north = trackers_in_col[i]
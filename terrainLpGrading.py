@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Optimisation-based grading for terrain-following trackers.
+
+Instead of the shift / slide / slope-correct heuristic, all pile heights of a tracker are
+solved for at once as a sparse linear programme:
+
+    minimise    sum(below_i + above_i) + BREAK_WEIGHT * sum(break_i)
+    subject to  window_min_i - below_i <= h_i <= window_max_i + above_i
+                |slope_in_i - slope_out_i| <= break_i <= slope limit   (interior piles)
+                sum(break_i) over each wing <= wing limit
+                below, above = 0 for the first and last piles (anchor invariant)
+
+`below_i + above_i` is the ground movement needed to bring pile i's window to its height,
+so the objective is the total grading cost of the tracker. Slope changes are measured in
+rise/run; since |atan(a) - atan(b)| <= |a - b| the limits are set in radians, so the
+degree breaks and wing sums checked in degrees are met as well. The small break weight
+picks the straightest of several equally cheap tubes.
+
+The constraint matrix is banded (each row touches at most three consecutive piles) and is
+solved with HiGHS through `scipy.optimize.linprog`. scipy is optional: `lp_available()`
+says whether it is installed, and grading with the "lp" engine without it raises
+ImportError.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from grading_utils import instrumentation, instrumented, tracker_window
+from Project import Project
+from TerrainFollowingTracker import TerrainFollowingTracker
+
+try:  # optional: only needed for the "lp" engine
+    from scipy import sparse
+    from scipy.optimize import linprog
+except ImportError:  # pragma: no cover - depends on environment
+    sparse = None
+    linprog = None
+
+# objective weight on slope changes, relative to metres of grading
+BREAK_WEIGHT = 1e-3
+# slope-change and wing limits are tightened by this much to absorb solver tolerances
+SLOPE_MARGIN = 1e-6
+# solved heights this close outside a window edge are snapped onto it
+SNAP_TOLERANCE = 1e-7
+
+
+def lp_available() -> bool:
+    """True if scipy is installed, so the "lp" engine can be used."""
+    return linprog is not None
+
+
+def require_scipy() -> None:
+    """
+    Raises
+    ------
+    ImportError
+        If scipy is not installed.
+    """
+    if linprog is None:
+        raise ImportError("The 'lp' terrain-following engine requires scipy (pip install scipy)")
+
+
+def break_limits(project: Project) -> tuple[float, float]:
+    """
+    Slope-change limits for the LP: (per interior pile, per wing), in rise/run.
+
+    The per-pile limit is the tighter of `max_strict_segment_slope_change` and the degree
+    limit in radians; the wing limit is the cumulative degree limit in radians.
+    """
+    constraints = project.constraints
+    slope_limit = min(
+        project.max_strict_segment_slope_change,
+        math.radians(constraints.max_segment_deflection_deg),
+    )
+    wing_limit = math.radians(constraints.max_cumulative_deflection_deg)
+    return max(slope_limit - SLOPE_MARGIN, 0.0), max(wing_limit - SLOPE_MARGIN, 0.0)
+
+
+def _wings(n: int) -> list[np.ndarray]:
+    """
+    Interior pile indices of each wing, split at the centre pile as
+    `TerrainFollowingTracker.get_centre_pile` does. The centre pile is counted in both
+    wings, so the limit holds whichever end of the tracker is north.
+    """
+    centre = n // 2 - 1  # 0-based index of pile_in_tracker floor(n / 2)
+    interior = np.arange(1, n - 1)
+    return [interior[interior <= centre], interior[interior >= centre]]
+
+
+def solve_heights(
+    lengths: np.ndarray,
+    window_min: np.ndarray,
+    window_max: np.ndarray,
+    slope_limit: float,
+    wing_limit: float,
+) -> Optional[np.ndarray]:
+    """
+    Minimum-cost pile heights for one tracker.
+
+    Parameters
+    ----------
+    lengths : np.ndarray
+        Plan length of each of the n - 1 segments, in pile order.
+    window_min, window_max : np.ndarray
+        Grading window of each of the n piles.
+    slope_limit : float
+        Largest allowed change in slope (rise/run) at an interior pile.
+    wing_limit : float
+        Largest allowed sum of slope changes over each wing.
+
+    Returns
+    -------
+    np.ndarray | None
+        The n pile heights, or None if the programme could not be solved (e.g. an
+        endpoint window is inverted or a segment has zero length).
+    """
+    require_scipy()
+    n = window_min.size
+    if n == 0 or lengths.size != n - 1 or not np.all(lengths > 0):
+        return None
+
+    # variables: heights h, below, above, breaks, each of size n
+    h, below, above, brk = (np.arange(n) + k * n for k in range(4))
+    rows: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    vals: list[np.ndarray] = []
+    rhs: list[np.ndarray] = []
+
+    def add_rows(columns, values, bound: np.ndarray) -> None:
+        """One row per entry of `bound`: sum(values[k] * x[columns[k]]) <= bound."""
+        r = sum(len(b) for b in rhs) + np.arange(bound.size)
+        for col, val in zip(columns, values):
+            rows.append(r)
+            cols.append(col)
+            vals.append(np.broadcast_to(val, r.shape))
+        rhs.append(bound)
+
+    # -h - below <= -window_min ; h - above <= window_max
+    add_rows((h, below), (-1.0, -1.0), -window_min)
+    add_rows((h, above), (1.0, -1.0), window_max)
+
+    if n > 2:
+        inv_in, inv_out = 1.0 / lengths[:-1], 1.0 / lengths[1:]
+        zeros = np.zeros(n - 2)
+        # +-(slope_in - slope_out) - break <= 0 at each interior pile
+        for sign in (1.0, -1.0):
+            add_rows(
+                (h[:-2], h[1:-1], h[2:], brk[1:-1]),
+                (-sign * inv_in, sign * (inv_in + inv_out), -sign * inv_out, -1.0),
+                zeros,
+            )
+        # sum of breaks over each wing <= wing_limit, one row per wing
+        for wing in _wings(n):
+            add_rows(tuple(brk[wing, None]), (1.0,) * wing.size, np.array([wing_limit]))
+
+    b_ub = np.concatenate(rhs)
+    a_ub = sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(b_ub.size, 4 * n),
+    )
+
+    cost = np.concatenate((np.zeros(n), np.ones(2 * n), np.full(n, BREAK_WEIGHT)))
+    bounds = np.zeros((4 * n, 2))
+    bounds[h] = (-np.inf, np.inf)
+    bounds[below] = bounds[above] = (0.0, np.inf)
+    bounds[brk] = (0.0, slope_limit)
+    # anchor invariant: the end piles stay inside their windows
+    bounds[[below[0], below[-1], above[0], above[-1], brk[0], brk[-1]]] = (0.0, 0.0)
+
+    result = linprog(cost, A_ub=a_ub, b_ub=b_ub, bounds=bounds, method="highs")
+    if result.status != 0:
+        return None
+
+    heights = result.x[:n].copy()
+    # undo solver round-off at the window edges the solution sits on
+    low = (heights < window_min) & (heights > window_min - SNAP_TOLERANCE)
+    high = (heights > window_max) & (heights < window_max + SNAP_TOLERANCE)
+    heights[low] = window_min[low]
+    heights[high] = window_max[high]
+    for i in (0, n - 1):
+        heights[i] = min(max(heights[i], window_min[i]), window_max[i])
+    return heights
+
+
+@instrumented("terrain.lp.solve_tracker")
+def lp_slide_tracker(project: Project, tracker: TerrainFollowingTracker) -> bool:
+    """
+    Set a tracker's pile heights to the LP optimum.
+
+    Returns
+    -------
+    bool
+        True if the heights were set; False if the programme could not be solved, in
+        which case the piles are left untouched.
+    """
+    tracker.create_segments()
+    window_min, window_max = tracker_window(project, tracker)
+    slope_limit, wing_limit = break_limits(project)
+    heights = solve_heights(
+        tracker.segment_lengths, window_min, window_max, slope_limit, wing_limit
+    )
+    if heights is None:
+        instrumentation.count("terrain.lp.failed")
+        return False
+
+    for pile, height in zip(tracker.piles, heights.tolist()):
+        pile.height = height
+    return True
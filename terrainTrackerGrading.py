@@ -1,22 +1,47 @@
 #!/usr/bin/env python3
 
-import warnings
-from typing import Dict
+from __future__ import annotations
+
+from contextlib import closing
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Literal, Optional
+
+import numpy as np
 
 from grading_utils import (
+    ProgressCallback,
+    ProgressReporter,
+    TrackerCallback,
+    TrackerPayload,
+    TrackerResultCache,
+    exact_offset_search,
+    grading_cost,
+    imap_trackers,
+    instrumentation,
+    instrumented,
+    tracker_fingerprint,
+    tracker_heights,
+    tracker_window,
+    violation_records,
+    window_arrays,
+    window_excess,
+    window_records,
     y_intercept as _y_intercept,
-    window_by_pile_in_tracker as _window_by_pile_in_tracker,
+    window_by_pile_in_tracker as _window_by_pile_in_tracker,  # noqa: F401 (re-exported)
     interpolate_coords as _interpolate_coords,
-    total_grading_cost as _total_grading_cost,
+    total_grading_cost as _total_grading_cost,  # noqa: F401 (re-exported)
 )
 from Project import Project
 from ProjectConstraints import ProjectConstraints
+from terrainLpGrading import lp_slide_tracker, require_scipy
 from TerrainFollowingPile import TerrainFollowingPile
 from TerrainFollowingTracker import TerrainFollowingTracker
 from testing_get_data_tf import load_project_from_excel, to_excel
 from shading.shadingAnalysis import main as shading_requirements
 
 
+@instrumented("terrain.grading_window")
 def grading_window(project: Project, tracker: TerrainFollowingTracker) -> list[dict[str, float]]:
     """
     Compute the allowable pile height window (min/max) for each pile in a tracker.
@@ -42,29 +67,8 @@ def grading_window(project: Project, tracker: TerrainFollowingTracker) -> list[d
         - "grading_window_max"
         - "ground_elevation" (current_elevation snapshot)
     """
-    window = []
-    for pile in tracker.piles:
-        wmin = pile.true_min_height(project)
-        wmax = pile.true_max_height(project)
-
-        # Warn if inverted window (min > max) from excessive flooding/tolerance
-        if wmin > wmax:
-            warnings.warn(
-                f"Pile {pile.pile_id}: inverted grading window (min={wmin:.3f} > max={wmax:.3f}). "
-                "This may be caused by excessive flooding_allowance or pile_install_tolerance.",
-                UserWarning,
-            )
-
-        window.append(
-            {
-                "pile_id": pile.pile_id,
-                "pile_in_tracker": pile.pile_in_tracker,
-                "grading_window_min": wmin,
-                "grading_window_max": wmax,
-                "ground_elevation": pile.current_elevation,
-            }
-        )
-    return window
+    window_min, window_max = tracker_window(project, tracker)
+    return window_records(tracker, window_min, window_max)
 
 
 def target_height_line(tracker: TerrainFollowingTracker, project: Project) -> None:
@@ -115,6 +119,7 @@ def target_height_line(tracker: TerrainFollowingTracker, project: Project) -> No
         pile.height = _interpolate_coords(pile, slope, pile_y_intercept)
 
 
+@instrumented("terrain.check_within_window")
 def check_within_window(
     window: list[dict[str, float]], tracker: TerrainFollowingTracker
 ) -> list[dict[str, float]]:
@@ -138,29 +143,8 @@ def check_within_window(
         - "below_by" (<= 0): height - wmin (negative means below)
         - "above_by" (>= 0): height - wmax (positive means above)
     """
-    limits = _window_by_pile_in_tracker(window)
-
-    violations = []
-    for pile in tracker.piles:
-        pid = pile.pile_in_tracker
-        if pid not in limits:
-            raise ValueError(f"Pile id {pid} not found in grading window")
-
-        wmin, wmax = limits[pid]
-        height = pile.height
-
-        # if the pile is outside the window, add it to the list and find how far away it is
-        if not wmin <= height <= wmax:
-            violations.append(
-                {
-                    "pile_in_tracker": pid,
-                    "grading_window_min": wmin,
-                    "grading_window_max": wmax,
-                    "below_by": min(0.0, height - wmin),
-                    "above_by": max(0.0, height - wmax),
-                }
-            )
-
+    violations = violation_records(tracker, *window_arrays(window, tracker))
+    instrumentation.count("terrain.check_within_window.violations", len(violations))
     return violations
 
 
@@ -264,16 +248,81 @@ def shift_piles(
             continue
 
 
+ShiftSolver = Literal["grid", "exact"]
+TerrainEngine = Literal["heuristic", "lp"]
+
+SLOPE_CORRECTION_MODES = ("ordered", "jacobi")
+# fraction of the single-pile correction each pile moves per "jacobi" pass
+JACOBI_RELAXATION = 0.5
+
+
+def _ordered_slope_pass(heights: list[float], lengths: list[float], limit: float) -> list[float]:
+    """
+    One sequential slope-correction pass over `heights`, updated in place.
+
+    Piles are corrected in pole order, each one seeing the corrections already applied to
+    the piles before it. Returns the corrections that were applied.
+    """
+    inf = float("inf")
+    corrections = []
+    for i in range(1, len(heights) - 1):
+        run_in = lengths[i - 1]
+        run_out = lengths[i]
+        slope_in = (heights[i] - heights[i - 1]) / run_in if run_in != 0 else inf
+        slope_out = (heights[i + 1] - heights[i]) / run_out if run_out != 0 else inf
+        slope_delta = slope_in - slope_out
+        if slope_delta > limit:
+            # upwards slope is steeper than allowed, lower the pile
+            correction = run_in * (slope_delta - limit)
+        elif slope_delta < -limit:
+            # downwards slope is steeper than allowed, raise the pile
+            correction = run_in * (slope_delta + limit)
+        else:
+            continue
+        heights[i] -= correction
+        corrections.append(correction)
+    return corrections
+
+
+def _jacobi_slope_pass(heights: np.ndarray, lengths: np.ndarray, limit: float) -> np.ndarray:
+    """
+    One simultaneous slope-correction pass over `heights`, updated in place.
+
+    Every interior pile's correction is computed from the heights at the start of the pass.
+    Moving a pile by `excess * run_in * run_out / (run_in + run_out)` would bring its own
+    slope delta back to the limit, but its neighbours move in the same pass, so each pile
+    only moves `JACOBI_RELAXATION` of that to keep the passes from overshooting. Returns
+    the corrections that were applied.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(lengths != 0, np.diff(heights) / lengths, np.inf)
+        slope_delta = slopes[:-1] - slopes[1:]
+        excess = np.where(
+            slope_delta > limit,
+            slope_delta - limit,
+            np.where(slope_delta < -limit, slope_delta + limit, 0.0),
+        )
+        run_in, run_out = lengths[:-1], lengths[1:]
+        correction = JACOBI_RELAXATION * excess * (run_in * run_out / (run_in + run_out))
+    heights[1:-1] -= correction
+    return correction[excess != 0.0]
+
+
+@instrumented("terrain.slope_correction")
 def slope_correction(
     tracker: TerrainFollowingTracker,
     project: Project,
+    *,
+    mode: str = "ordered",
+    tolerance: float = 0.0,
+    max_passes: int = 5,
 ) -> None:
     """
     Enforce strict local slope-change constraints by iteratively correcting pile heights.
 
     For each interior pile, compute the difference between incoming and outgoing segment
     slopes. If the slope delta exceeds +/- project.max_strict_segment_slope_change, apply
-    a vertical correction proportional to segment length:
+    a vertical correction proportional to the incoming segment length:
 
         correction = length * (excess slope_delta)
 
@@ -282,7 +331,11 @@ def slope_correction(
     Notes
     -----
     - This modifies heights only (not ground elevations).
-    - Re-runs a small fixed number of passes (currently 5).
+    - Piles are taken in pole order with segment lengths from `tracker.segment_lengths`;
+      heights are read once, corrected as arrays and written back at the end.
+    - Passes stop early once the largest correction in a pass is within `tolerance`, so
+      trackers that already comply return after a single pass. With the default
+      tolerance of 0 the result is exactly that of running all `max_passes` passes.
 
     Parameters
     ----------
@@ -290,33 +343,56 @@ def slope_correction(
         Tracker whose pile heights will be adjusted.
     project : Project
         Provides strict segment slope change limit.
+    mode : str, optional
+        "ordered" (default) corrects piles one at a time in pole order, each seeing the
+        corrections made before it in the same pass (Gauss-Seidel). "jacobi" computes all
+        of a pass's corrections from the heights at its start and applies them together
+        with NumPy, each damped by `JACOBI_RELAXATION`; it needs more passes to settle
+        (raise `max_passes`) and does not give the same heights.
+    tolerance : float, optional
+        Stop once no correction in a pass is larger than this (m).
+    max_passes : int, optional
+        Upper limit on the number of passes.
+
+    Raises
+    ------
+    ValueError
+        If `mode` is not one of `SLOPE_CORRECTION_MODES`.
     """
-    if not tracker.segments:
+    if mode not in SLOPE_CORRECTION_MODES:
+        raise ValueError(
+            f"Unknown slope correction mode '{mode}', expected one of {SLOPE_CORRECTION_MODES}"
+        )
+    if len(tracker.piles) < 3:
+        return  # no interior piles
+    if len(tracker.segment_lengths) != len(tracker.piles) - 1:
         tracker.create_segments()
 
-    for _ in range(5):  # iterate slope correction five times
-        # calculate slope delta: the difference between the incoming and outgoing segment slopes
-        # for all piles
-        for pile in tracker.piles:
-            if pile.pile_in_tracker == 1 or pile.pile_in_tracker == len(tracker.piles):
-                slope_delta = 0.0  # first and last piles haves no slope delta
-                continue  # next calculation not needed for first and last piles
-            else:
-                incoming_segment = tracker.get_segment_by_id(pile.get_incoming_segment_id())
-                outgoing_segment = tracker.get_segment_by_id(pile.get_outgoing_segment_id(tracker))
-                slope_delta = incoming_segment.slope() - outgoing_segment.slope()
-            length = abs(incoming_segment.length())
-            if slope_delta > project.max_strict_segment_slope_change:
-                # upwards slope is steeper than allowed, lower the pile
-                correction = length * (slope_delta - project.max_strict_segment_slope_change)
-            elif slope_delta < -project.max_strict_segment_slope_change:
-                # downwards slope is steeper than allowed, raise the pile
-                correction = length * (slope_delta + project.max_strict_segment_slope_change)
-            else:
-                correction = 0.0
-            pile.height -= correction
+    limit = project.max_strict_segment_slope_change
+    if mode == "ordered":
+        heights = [p.height for p in tracker.piles]
+        lengths = tracker.segment_lengths.tolist()
+        correction_pass = _ordered_slope_pass
+    else:
+        heights = tracker_heights(tracker)
+        lengths = tracker.segment_lengths
+        correction_pass = _jacobi_slope_pass
+
+    corrections = 0
+    for _ in range(max_passes):
+        applied = np.abs(correction_pass(heights, lengths, limit))
+        corrections += len(applied)
+        # NaN corrections (zero-length segments) leave nothing more to correct
+        if not np.any(applied > tolerance):
+            break
+    instrumentation.count("terrain.slope_correction.corrections", corrections)
 
+    if corrections:
+        for pile, height in zip(tracker.piles, np.asarray(heights).tolist()):
+            pile.height = height
 
+
+@instrumented("terrain.slide_all_piles")
 def slide_all_piles(
     project: Project,
     tracker: TerrainFollowingTracker,
@@ -325,6 +401,7 @@ def slide_all_piles(
     coarse_steps: int = 121,
     fine_steps: int = 121,
     fine_span_fraction: float = 0.1,
+    solver: ShiftSolver = "grid",
 ) -> None:
     """
     Optimise a uniform vertical shift applied to all pile heights (intercept-only).
@@ -341,6 +418,13 @@ def slide_all_piles(
     Objective:
       - Minimise `_total_grading_cost(...)` over all piles after the shift.
 
+    The cost is convex and piecewise-linear in the shift, with breakpoints at each pile's
+    window edges, so the "exact" solver finds its minimum over the search interval with a
+    sorted-breakpoint sweep (`grading_utils.exact_offset_search`) in O(n log n). Among
+    equal-cost shifts it keeps the one closest to no shift. The "grid" solver samples a
+    coarse grid and a finer grid around the best coarse shift, and is also used by "exact"
+    when a height or window is not finite.
+
     Parameters
     ----------
     project : Project
@@ -356,24 +440,33 @@ def slide_all_piles(
         Number of samples in the refined grid search around the best coarse shift.
     fine_span_fraction : float, optional
         Fraction of the coarse search width used for the fine search window.
+    solver : {"grid", "exact"}, default="grid"
+        How the shift is optimised; the step counts only apply to "grid".
 
     Returns
     -------
     None
         Updates `pile.height` in-place using the best found shift.
+
+    Raises
+    ------
+    ValueError
+        If `solver` is not "grid" or "exact".
     """
+    if solver not in ("grid", "exact"):
+        raise ValueError(f"Unknown shift solver '{solver}', expected 'grid' or 'exact'.")
     if not tracker.piles:
         return
 
     # Ensure consistent ordering
-    tracker.piles.sort(key=lambda p: p.pile_in_tracker)
+    tracker.sort_by_pole_position()
 
     # Cache current heights
-    original_heights = [p.height for p in tracker.piles]
+    original_heights = tracker_heights(tracker)
 
     # Compute a window snapshot ONCE (windows depend on current_elevation; shift doesn't
     # change that)
-    window0 = grading_window(project, tracker)
+    window_min, window_max = window_arrays(grading_window(project, tracker), tracker)
 
     first = tracker.get_first()
     last = tracker.get_last()
@@ -410,102 +503,390 @@ def slide_all_piles(
         initial = max(allowed_min, min(allowed_max, 0.0))
         span = max(span, 1e-9)
 
-    def apply_shift(s: float) -> None:
-        for pile, h0 in zip(tracker.piles, original_heights):
-            pile.height = h0 - s
-
-    def eval_shift(s: float) -> tuple[float, list[dict[str, float]], bool]:
+    def eval_shift(s: float) -> tuple[float, bool]:
         # Enforce feasibility by endpoints (fast reject)
         if s < allowed_min or s > allowed_max:
-            return float("inf"), [], False
+            return float("inf"), False
 
-        apply_shift(s)
+        # Score the shifted heights without touching the piles
+        below_by, above_by = window_excess(original_heights - s, window_min, window_max)
+        return grading_cost(below_by, above_by), True
 
-        # Endpoints guaranteed in-window due to allowed interval,
-        # but keep this consistent with sliding_line logic:
-        viols = check_within_window(window0, tracker)
-        cost = _total_grading_cost(viols)
-        return cost, viols, True
-
-    best_s = initial
-    best_cost = float("inf")
-
-    # --- coarse search over [initial-span, initial+span] intersected with allowed ---
+    # --- search over [initial-span, initial+span] intersected with allowed ---
     lo = max(allowed_min, initial - span)
     hi = min(allowed_max, initial + span)
 
-    if coarse_steps < 2:
-        coarse_steps = 2
+    exact = solver == "exact" and bool(
+        np.isfinite(original_heights).all()
+        and np.isfinite(window_min).all()
+        and np.isfinite(window_max).all()
+    )
+    if exact:
+        # heights are original - shift, i.e. an offset of -shift on the original heights
+        offset, _ = exact_offset_search(
+            original_heights, window_min, window_max, lower=-hi, upper=-lo, reference=0.0
+        )
+        best_s = -offset
+    else:
+        best_s = initial
+        best_cost = float("inf")
+
+        # --- coarse search ---
+        if coarse_steps < 2:
+            coarse_steps = 2
+
+        for k in range(coarse_steps):
+            s = lo + (hi - lo) * (k / (coarse_steps - 1))
+            cost, ok = eval_shift(s)
+            if ok and cost < best_cost:
+                best_cost = cost
+                best_s = s
 
-    for k in range(coarse_steps):
-        s = lo + (hi - lo) * (k / (coarse_steps - 1))
-        cost, _, ok = eval_shift(s)
-        if ok and cost < best_cost:
-            best_cost = cost
-            best_s = s
+        # --- fine search around best coarse ---
+        fine_span = (hi - lo) * fine_span_fraction
+        fine_span = max(fine_span, 1e-9)
 
-    # --- fine search around best coarse ---
-    fine_span = (hi - lo) * fine_span_fraction
-    fine_span = max(fine_span, 1e-9)
+        lo2 = max(allowed_min, best_s - fine_span)
+        hi2 = min(allowed_max, best_s + fine_span)
 
-    lo2 = max(allowed_min, best_s - fine_span)
-    hi2 = min(allowed_max, best_s + fine_span)
+        if fine_steps < 2:
+            fine_steps = 2
 
-    if fine_steps < 2:
-        fine_steps = 2
+        for k in range(fine_steps):
+            s = lo2 + (hi2 - lo2) * (k / (fine_steps - 1))
+            cost, ok = eval_shift(s)
+            if ok and cost < best_cost:
+                best_cost = cost
+                best_s = s
 
-    for k in range(fine_steps):
-        s = lo2 + (hi2 - lo2) * (k / (fine_steps - 1))
-        cost, _, ok = eval_shift(s)
-        if ok and cost < best_cost:
-            best_cost = cost
-            best_s = s
+        instrumentation.count("terrain.slide_all_piles.candidates", coarse_steps + fine_steps)
 
     # Apply the best shift permanently
-    apply_shift(best_s)
+    for pile, height in zip(tracker.piles, (original_heights - best_s).tolist()):
+        pile.height = height
 
 
-def main(project: Project) -> None:
+@dataclass(frozen=True)
+class TrackerGradingResult:
     """
-    Run grading optimisation for all trackers in a project.
+    Final grading outputs for one terrain-following tracker.
+
+    Arrays are in `tracker.piles` order (north to south after renumbering).
+
+    Attributes
+    ----------
+    tracker_id : int
+        Id of the graded tracker.
+    height : np.ndarray
+        Final pile heights.
+    current_elevation : np.ndarray
+        Final ground elevations after grading.
+    final_degree_break : np.ndarray
+        Degree break at each pile (deg).
+    north_wing_deflection, south_wing_deflection : float
+        Cumulative wing deflections (deg).
+    max_tracker_degree_break : float
+        Largest degree break on the tracker (deg).
+    """
+
+    tracker_id: int
+    height: np.ndarray
+    current_elevation: np.ndarray
+    final_degree_break: np.ndarray
+    north_wing_deflection: float
+    south_wing_deflection: float
+    max_tracker_degree_break: float
+
+    @classmethod
+    def from_tracker(cls, tracker: TerrainFollowingTracker) -> TrackerGradingResult:
+        """Collect the outputs of a tracker that has been through `grade_tracker`."""
+        return cls(
+            tracker_id=tracker.tracker_id,
+            height=np.array([p.height for p in tracker.piles], dtype=np.float64),
+            current_elevation=np.array(
+                [p.current_elevation for p in tracker.piles], dtype=np.float64
+            ),
+            final_degree_break=np.array(
+                [p.final_degree_break for p in tracker.piles], dtype=np.float64
+            ),
+            north_wing_deflection=tracker.north_wing_deflection,
+            south_wing_deflection=tracker.south_wing_deflection,
+            max_tracker_degree_break=tracker.max_tracker_degree_break,
+        )
+
+    def apply(self, tracker: TerrainFollowingTracker) -> None:
+        """
+        Write the results back onto the tracker's piles, as `grade_tracker` would have.
+
+        Raises
+        ------
+        ValueError
+            If the result belongs to a different tracker or pile count.
+        """
+        if self.tracker_id != tracker.tracker_id or len(self.height) != len(tracker.piles):
+            raise ValueError(
+                f"Grading result for tracker {self.tracker_id} does not match "
+                f"tracker {tracker.tracker_id}"
+            )
+
+        for pile, h, z, brk in zip(
+            tracker.piles,
+            self.height.tolist(),
+            self.current_elevation.tolist(),
+            self.final_degree_break.tolist(),
+        ):
+            pile.height = h
+            pile.current_elevation = z
+            pile.set_final_elevation(z)
+            pile.set_total_height(h)
+            pile.set_total_revealed()
+            pile.final_degree_break = brk
+
+        tracker.create_segments()
+        tracker.north_wing_deflection = self.north_wing_deflection
+        tracker.south_wing_deflection = self.south_wing_deflection
+        tracker.max_tracker_degree_break = self.max_tracker_degree_break
+
+
+def place_target_line(
+    project: Project, tracker: TerrainFollowingTracker
+) -> tuple[list[dict[str, float]], list[dict[str, float]]]:
+    """
+    Set a tracker's piles to its target-height line.
+
+    Returns
+    -------
+    tuple[list[dict[str, float]], list[dict[str, float]]]
+        The tracker's grading window and the piles outside it on the target line.
+    """
+    # determine the grading window for the tracker
+    window = grading_window(project, tracker)
+
+    # set the tracker piles to the target height line
+    target_height_line(tracker, project)
+    return window, check_within_window(window, tracker)
+
+
+def slide_tracker(
+    project: Project,
+    tracker: TerrainFollowingTracker,
+    piles_outside: list[dict[str, float]],
+    *,
+    solver: ShiftSolver = "grid",
+    engine: TerrainEngine = "heuristic",
+) -> None:
+    """
+    Shift, slide and slope-correct a tracker whose target line leaves piles outside the
+    window. `solver` is passed to `slide_all_piles`.
+
+    With `engine="lp"` the heights are instead solved for at once by
+    `terrainLpGrading.lp_slide_tracker`, falling back to the heuristic for a tracker whose
+    linear programme cannot be solved.
+    """
+    if engine == "lp" and lp_slide_tracker(project, tracker):
+        return
+    tracker.create_segments()
+    shift_piles(tracker, project, piles_outside)
+    slide_all_piles(project, tracker, solver=solver)
+    slope_correction(tracker, project)
+    slide_all_piles(project, tracker, solver=solver)
+
+
+def finalise_tracker(tracker: TerrainFollowingTracker, window: list[dict[str, float]]) -> None:
+    """
+    Grade any piles still outside the window and record the final pile outputs.
+    """
+    # complete final grading for any piles still outside of the window
+    piles_outside2 = check_within_window(window, tracker)
+    if piles_outside2:
+        grading(tracker, piles_outside2)
+
+    tracker.create_segments()
+    # Set the final ground elevations, reveal heights and total heights of all piles,
+    # some will remain the same
+    for pile in tracker.piles:
+        pile.set_final_elevation(pile.current_elevation)
+        pile.set_total_height(pile.height)
+        pile.set_total_revealed()
+        pile.set_final_degree_break(tracker)
+    tracker.set_final_deflection_metrics()
+
+
+def grade_tracker(
+    project: Project,
+    tracker: TerrainFollowingTracker,
+    *,
+    solver: ShiftSolver = "grid",
+    engine: TerrainEngine = "heuristic",
+) -> None:
+    """
+    Run the full terrain-following grading sequence on a single tracker.
+
+    Reads only the tracker itself and the project constraints, so trackers can be graded
+    independently of one another.
 
     Parameters
     ----------
     project : Project
-        Project containing trackers and grading constraints.
+        Project providing the grading constraints.
+    tracker : TerrainFollowingTracker
+        Tracker whose piles are graded and finalised in-place.
+    solver : {"grid", "exact"}, default="grid"
+        Uniform-shift solver used by `slide_all_piles`.
+    engine : {"heuristic", "lp"}, default="heuristic"
+        How piles outside the window on the target line are brought back; see `main`.
     """
-    # ensure piles in trackers are sorted north to south
-    project.renumber_piles_by_northing()
+    window, piles_outside = place_target_line(project, tracker)
+    if piles_outside:
+        slide_tracker(project, tracker, piles_outside, solver=solver, engine=engine)
+    finalise_tracker(tracker, window)
 
-    for tracker in project.trackers:
-        # determine the grading window for the tracker
-        window = grading_window(project, tracker)
 
-        # set the tracker piles to the target height line
-        target_height_line(tracker, project)
-        piles_outside1 = check_within_window(window, tracker)
+def _grade_tracker_worker(
+    project: Project, solver: ShiftSolver, engine: TerrainEngine, payload: TrackerPayload
+) -> TrackerGradingResult:
+    """Process-pool task for `grade_tracker` on a tracker rebuilt from its payload."""
+    tracker = payload.to_tracker(TerrainFollowingTracker, TerrainFollowingPile)
+    grade_tracker(project, tracker, solver=solver, engine=engine)
+    return TrackerGradingResult.from_tracker(tracker)
 
-        if piles_outside1:
-            tracker.create_segments()
-            shift_piles(tracker, project, piles_outside1)
-            slide_all_piles(project, tracker)
-            slope_correction(tracker, project)
-            slide_all_piles(project, tracker)
 
-        # complete final grading for any piles still outside of the window
-        piles_outside2 = check_within_window(window, tracker)
-        if piles_outside2:
-            grading(tracker, piles_outside2)
+def main(
+    project: Project,
+    *,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    on_tracker_done: Optional[TrackerCallback] = None,
+    cache: Optional[TrackerResultCache] = None,
+    solver: ShiftSolver = "grid",
+    engine: TerrainEngine = "heuristic",
+) -> list[TrackerGradingResult]:
+    """
+    Run grading optimisation for all trackers in a project.
 
-        tracker.create_segments()
-        # Set the final ground elevations, reveal heights and total heights of all piles,
-        # some will remain the same
-        for pile in tracker.piles:
-            pile.set_final_elevation(pile.current_elevation)
-            pile.set_total_height(pile.height)
-            pile.set_total_revealed()
-            pile.set_final_degree_break(tracker)
-        tracker.set_final_deflection_metrics()
+    Trackers are graded independently, so with `workers > 1` they are dispatched in
+    chunks to a process pool and the results are written back in tracker order. Serial
+    and parallel runs produce identical output.
+
+    Parameters
+    ----------
+    project : Project
+        Project containing trackers and grading constraints.
+    workers : int | None, optional
+        Number of worker processes. None or 1 grades serially in-process.
+    progress : ProgressCallback | None, optional
+        Called with a `ProgressEvent` (phase, done/total, elapsed seconds in the phase) at
+        the start of each phase and as each tracker completes it. Serial runs report
+        "target_line", "sliding" (trackers with violations only) and "final_grading";
+        parallel runs grade each tracker whole in a worker and report a single "grade"
+        phase. Raising from the callback aborts the run.
+    on_tracker_done : TrackerCallback | None, optional
+        Called with each tracker, in `project.trackers` order, as soon as its final
+        outputs are set, so results can be streamed while later trackers are still
+        grading. Raising from the callback aborts the run.
+    cache : TrackerResultCache | None, optional
+        Regrade incrementally: each tracker's result is cached under a fingerprint of its
+        pile inputs and the constraints, and trackers whose fingerprint is already cached
+        skip grading and reuse the stored result. Trackers are graded independently, so
+        only edited trackers are recomputed.
+    solver : {"grid", "exact"}, default="grid"
+        How `slide_all_piles` optimises each tracker's uniform shift: "grid" samples a
+        coarse and a fine grid of shifts, "exact" solves for the minimum-cost shift.
+    engine : {"heuristic", "lp"}, default="heuristic"
+        "heuristic" shifts, slides and slope-corrects the piles (`slide_tracker`). "lp"
+        solves each tracker's heights at once as a linear programme minimising grading
+        cost under the window, degree-break and wing deflection limits
+        (`terrainLpGrading`), falling back to the heuristic for a tracker whose
+        programme cannot be solved. Needs scipy.
+
+    Returns
+    -------
+    list[TrackerGradingResult]
+        Per-tracker heights, elevations, degree breaks and wing deflections, in
+        `project.trackers` order. The piles are also updated in-place.
+
+    Raises
+    ------
+    ValueError
+        If `engine` is unknown.
+    ImportError
+        If `engine="lp"` and scipy is not installed.
+    """
+    if engine == "lp":
+        require_scipy()
+    elif engine != "heuristic":
+        raise ValueError(f"Unknown grading engine '{engine}', expected 'heuristic' or 'lp'.")
+
+    # ensure piles in trackers are sorted north to south
+    project.renumber_piles_by_northing()
+
+    reporter = ProgressReporter(progress)
+    total = len(project.trackers)
+
+    # fingerprint every tracker before grading changes its piles
+    keys: list[Optional[str]] = [None] * total
+    cached: list[Optional[TrackerGradingResult]] = [None] * total
+    if cache is not None:
+        for i, tracker in enumerate(project.trackers):
+            keys[i] = tracker_fingerprint(tracker, "grade", solver, engine, project.constraints)
+            cached[i] = cache.get(keys[i])
+
+    if workers is None or workers <= 1:
+        with reporter.phase("target_line", total) as tick:
+            placed = []
+            for done, (tracker, result) in enumerate(zip(project.trackers, cached), start=1):
+                placed.append(place_target_line(project, tracker) if result is None else None)
+                tick(done)
+
+        to_slide = [(t, p[1]) for t, p in zip(project.trackers, placed) if p is not None and p[1]]
+        with reporter.phase("sliding", len(to_slide)) as tick:
+            for done, (tracker, piles_outside) in enumerate(to_slide, start=1):
+                slide_tracker(project, tracker, piles_outside, solver=solver, engine=engine)
+                tick(done)
+
+        results = []
+        with reporter.phase("final_grading", total) as tick:
+            for done, (tracker, p, key, result) in enumerate(
+                zip(project.trackers, placed, keys, cached), start=1
+            ):
+                if result is None:
+                    finalise_tracker(tracker, p[0])
+                    result = TrackerGradingResult.from_tracker(tracker)
+                    if key is not None:
+                        cache.put(key, result)
+                else:
+                    result.apply(tracker)
+                results.append(result)
+                if on_tracker_done is not None:
+                    on_tracker_done(tracker)
+                tick(done)
+        return results
+
+    # workers only need the constraints, not the other trackers
+    shell = Project(
+        name=project.name,
+        project_type=project.project_type,
+        constraints=project.constraints,
+        with_shading=project.with_shading,
+    )
+    results = []
+    pending = imap_trackers(
+        partial(_grade_tracker_worker, shell, solver, engine),
+        [TrackerPayload.from_tracker(t) for t, r in zip(project.trackers, cached) if r is None],
+        workers=workers,
+    )
+    with reporter.phase("grade", total) as tick, closing(pending):
+        for tracker, key, result in zip(project.trackers, keys, cached):
+            if result is None:
+                result = next(pending)
+                if key is not None:
+                    cache.put(key, result)
+            result.apply(tracker)
+            results.append(result)
+            if on_tracker_done is not None:
+                on_tracker_done(tracker)
+            tick(len(results))
+    return results
 
 
 if __name__ == "__main__":
@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-from typing import Dict
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
 
 import pandas as pd
+from openpyxl import load_workbook
 
 from BasePile import BasePile
 from BaseTracker import BaseTracker
 from Project import Project
 from ProjectConstraints import ProjectConstraints
+from results_export import write_results
 
 
 def load_project_from_excel(
@@ -60,14 +63,21 @@ def load_project_from_excel(
     trackers_by_id: Dict[int, BaseTracker] = {}
     piles = 0  # REMOVE LATER TESTING ONLY
 
-    for _, row in df.iterrows():
+    # pull whole columns out once rather than building a Series per row
+    for tracker_value, pit_value, easting_value, northing_value, z_value in zip(
+        df[tracker_col].to_numpy(),
+        df[pile_in_tracker_col].to_numpy(),
+        df[easting_col].to_numpy(),
+        df[northing_col].to_numpy(),
+        df[elevation_col].to_numpy(),
+    ):
         piles += 1  # REMOVE LATER TESTING ONLY
-        tracker_num = int(row[tracker_col])
-        pit = int(row[pile_in_tracker_col])
+        tracker_num = int(tracker_value)
+        pit = int(pit_value)
 
-        easting = float(row[easting_col])
-        northing = float(row[northing_col])
-        ground_z = float(row[elevation_col])
+        easting = float(easting_value)
+        northing = float(northing_value)
+        ground_z = float(z_value)
 
         if tracker_num not in trackers_by_id:
             trackers_by_id[tracker_num] = BaseTracker(tracker_id=tracker_num)
@@ -93,30 +103,127 @@ def load_project_from_excel(
     return project
 
 
-def to_excel(project: Project) -> None:
-    rows = []
-
-    for tracker in project.trackers:
-        for pile in tracker.piles:
-            rows.append(
-                {
-                    "tracker_id": tracker.tracker_id,
-                    "pile_id": pile.pile_id,
-                    "pile_in_tracker": pile.pile_in_tracker,
-                    "northing": pile.northing,
-                    "easting": pile.easting,
-                    "initial_elevation": pile.initial_elevation,
-                    "final_elevation": pile.final_elevation,
-                    "change": pile.final_elevation - pile.initial_elevation,
-                    "total_height": pile.total_height,
-                    "total_revealed": pile.pile_revealed,
-                }
+def iter_sheet_rows(
+    excel_path: str, sheet_name: str, max_col: Optional[int] = None
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Stream the cell values of a sheet row by row.
+
+    Opens the workbook with openpyxl in read-only mode, so rows are parsed as they are read
+    instead of loading the whole sheet into memory first. `max_col` limits each row to its
+    first columns.
+    """
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        yield from wb[sheet_name].iter_rows(values_only=True, max_col=max_col)
+    finally:
+        wb.close()
+
+
+def as_number(value: Any) -> Optional[float]:
+    """Return a cell value as a float, or None if it is blank or not numeric."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            return None
+    return None if number != number else number  # drop NaN
+
+
+# Called by the streaming loaders with the rows read and the seconds loading took
+LoadRateCallback = Callable[[int, float], None]
+
+
+def report_load_rate(rows: int, started: float, on_rate: Optional[LoadRateCallback]) -> None:
+    """Pass how many rows were read, and the seconds elapsed since `started`, to `on_rate`."""
+    if on_rate is not None:
+        on_rate(rows, time.perf_counter() - started)
+
+
+def print_load_rate(rows: int, elapsed: float) -> None:
+    """`on_rate` callback for scripts: print the rows read and the rows/sec achieved."""
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Read {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+
+def stream_project_from_excel(
+    *,
+    excel_path: str,
+    sheet_name: str,
+    project_name: str,
+    project_type: str,
+    constraints: ProjectConstraints,
+    with_shading: bool = False,
+    on_rate: Optional[LoadRateCallback] = None,
+) -> Project:
+    """
+    Streaming equivalent of `load_project_from_excel` for large pile surveys.
+
+    Reads the sheet with openpyxl in read-only mode and builds piles straight from the row
+    tuples, without a DataFrame. Uses the same column layout and skips the same rows (the
+    header, rows with a non-numeric tracker number, and rows missing a required value).
+    `on_rate`, if given, is called with the rows read and the seconds loading took (see
+    `print_load_rate`).
+    """
+    started = time.perf_counter()
+
+    project = Project(
+        name=project_name,
+        project_type=project_type,
+        constraints=constraints,
+        with_shading=with_shading,
+    )
+
+    trackers_by_id: Dict[int, BaseTracker] = {}
+    rows = 0
+    piles_loaded = 0  # pile ids are 1-based load order, as in `load_project_from_excel`
+
+    sheet_rows = iter_sheet_rows(excel_path, sheet_name, max_col=9)
+    next(sheet_rows, None)  # header
+    for row in sheet_rows:
+        rows += 1
+        if len(row) < 9:
+            continue
+
+        # Col 1: tracker, Col 3: pile in tracker, Col 4: easting, Col 5: northing, Col 9: ground
+        values = [as_number(row[i]) for i in (0, 2, 3, 4, 8)]
+        if any(v is None for v in values):
+            continue
+        tracker_value, pit_value, easting, northing, ground_z = values
+
+        piles_loaded += 1
+        tracker_num = int(tracker_value)
+
+        if tracker_num not in trackers_by_id:
+            trackers_by_id[tracker_num] = BaseTracker(tracker_id=tracker_num)
+
+        trackers_by_id[tracker_num].piles.append(
+            BasePile(
+                northing=northing,
+                easting=easting,
+                initial_elevation=ground_z,
+                pile_id=piles_loaded,
+                pile_in_tracker=int(pit_value),
+                flooding_allowance=0.0,
             )
+        )
+
+    for tid in sorted(trackers_by_id.keys()):
+        t = trackers_by_id[tid]
+        t.sort_by_pole_position()
+        project.trackers.append(t)
+
+    report_load_rate(rows, started, on_rate)
+    return project
 
-    df = pd.DataFrame(rows)
 
-    output_path = "final_pile_elevations_slide_twice.xlsx"
-    df.to_excel(output_path, index=False)
+def to_excel(project: Project, output_path: str = "final_pile_elevations_slide_twice.xlsx") -> None:
+    """Write the graded pile results to an xlsx file (see `results_export` for columnar output)."""
+    write_results(project, output_path, fmt="xlsx")
 
 
 # def main() -> None:
@@ -1,14 +1,31 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-from typing import Dict
+import time
+from typing import Dict, Optional
 
 import pandas as pd
 
 from Project import Project
 from ProjectConstraints import ProjectConstraints
+from results_export import write_results
 from TerrainFollowingPile import TerrainFollowingPile
 from TerrainFollowingTracker import TerrainFollowingTracker
+from testing_get_data import (
+    LoadRateCallback,
+    as_number,
+    iter_sheet_rows,
+    report_load_rate,
+)
+
+# header name -> fallback column position (B..F)
+_COLUMNS = {
+    "Northing": 1,
+    "Easting": 2,
+    "Elevation": 3,
+    "Description": 4,  # pile_in_tracker
+    "Frame": 5,  # tracker_id
+}
 
 
 def load_project_from_excel(
@@ -85,13 +102,20 @@ def load_project_from_excel(
 
     trackers_by_id: Dict[int, TerrainFollowingTracker] = {}
 
-    for _, row in df.iterrows():
-        tracker_id = int(row[tracker_id_col])
-        pit = int(row[pile_in_tracker_col])
-
-        northing = float(row[northing_col])
-        easting = float(row[easting_col])
-        ground_z = float(row[elevation_col])
+    # pull whole columns out once rather than building a Series per row
+    for tracker_value, pit_value, northing_value, easting_value, z_value in zip(
+        df[tracker_id_col].to_numpy(),
+        df[pile_in_tracker_col].to_numpy(),
+        df[northing_col].to_numpy(),
+        df[easting_col].to_numpy(),
+        df[elevation_col].to_numpy(),
+    ):
+        tracker_id = int(tracker_value)
+        pit = int(pit_value)
+
+        northing = float(northing_value)
+        easting = float(easting_value)
+        ground_z = float(z_value)
 
         # Create tracker if needed
         if tracker_id not in trackers_by_id:
@@ -119,24 +143,78 @@ def load_project_from_excel(
     return project
 
 
-def to_excel(project: Project, output_path: str = "final_pile_elevations_for_tf.xlsx") -> None:
-    rows = []
-
-    for tracker in project.trackers:
-        for pile in tracker.piles:
-            rows.append(
-                {
-                    "tracker_id": tracker.tracker_id,
-                    "pile_id": pile.pile_id,  # "tracker.pile"
-                    "pile_in_tracker": pile.pile_in_tracker,
-                    "northing": pile.northing,
-                    "easting": pile.easting,
-                    "initial_elevation": pile.initial_elevation,
-                    "final_elevation": pile.final_elevation,
-                    "change": pile.final_elevation - pile.initial_elevation,
-                    "total_height": pile.total_height,
-                    "total_revealed": pile.pile_revealed,
-                }
+def stream_project_from_excel(
+    *,
+    excel_path: str,
+    sheet_name: str,
+    project_name: str,
+    project_type: str,
+    constraints: ProjectConstraints,
+    on_rate: Optional[LoadRateCallback] = None,
+) -> Project:
+    """
+    Streaming equivalent of `load_project_from_excel` for large pile surveys.
+
+    Reads the sheet with openpyxl in read-only mode and builds piles straight from the row
+    tuples, without a DataFrame. Columns are found by header name with the same positional
+    fallbacks, and rows missing a numeric value in any required column are skipped.
+    `on_rate`, if given, is called with the rows read and the seconds loading took (see
+    `testing_get_data.print_load_rate`).
+    """
+    started = time.perf_counter()
+
+    sheet_rows = iter_sheet_rows(excel_path, sheet_name)
+    header = next(sheet_rows, ())
+    names = {c.strip(): i for i, c in enumerate(header) if isinstance(c, str)}
+    positions = [names.get(name, fallback) for name, fallback in _COLUMNS.items()]
+    needed = max(positions) + 1
+
+    project = Project(
+        name=project_name,
+        project_type=project_type,
+        constraints=constraints,
+    )
+
+    trackers_by_id: Dict[int, TerrainFollowingTracker] = {}
+    rows = 0
+
+    for row in sheet_rows:
+        rows += 1
+        if len(row) < needed:
+            continue
+
+        values = [as_number(row[i]) for i in positions]
+        if any(v is None for v in values):
+            continue
+        northing, easting, ground_z, pit_value, tracker_value = values
+
+        tracker_id = int(tracker_value)
+        pit = int(pit_value)
+
+        if tracker_id not in trackers_by_id:
+            trackers_by_id[tracker_id] = TerrainFollowingTracker(tracker_id=tracker_id)
+
+        trackers_by_id[tracker_id].piles.append(
+            TerrainFollowingPile(
+                northing=northing,
+                easting=easting,
+                initial_elevation=ground_z,
+                pile_id=f"{tracker_id}.{pit:02d}",  # string id "tracker.pile"
+                pile_in_tracker=pit,  # from Description
+                flooding_allowance=0.0,
             )
+        )
 
-    pd.DataFrame(rows).to_excel(output_path, index=False)
+    # Attach trackers in numeric order and sort their piles
+    for tid in sorted(trackers_by_id.keys()):
+        t = trackers_by_id[tid]
+        t.sort_by_pole_position()  # sorts by pile_in_tracker
+        project.trackers.append(t)
+
+    report_load_rate(rows, started, on_rate)
+    return project
+
+
+def to_excel(project: Project, output_path: str = "final_pile_elevations_for_tf.xlsx") -> None:
+    """Write the graded pile results to an xlsx file (see `results_export` for columnar output)."""
+    write_results(project, output_path, fmt="xlsx")
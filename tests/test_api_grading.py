@@ -1,17 +1,37 @@
+import json
+import re
 import sys
+import threading
+import time
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 # Add parent directory to path to import your modules
 sys.path.append(str(Path(__file__).parent.parent))
 sys.path.append(str(Path(__file__).parent.parent / "backend"))
 
+import endpoints.grading as grading
+from endpoints.grading import (
+    ProjectGradingRequest,
+    ProjectResultCache,
+    project_cache_key,
+    result_cache,
+    tracker_cache,
+)
+
 from backend.api.main import app
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def fresh_result_cache():
+    """Grade each test's requests afresh rather than from an earlier test's results."""
+    result_cache.clear()
+
+
 def test_grade_project():
     # Sample data
     request_data = {
@@ -123,3 +143,460 @@ def test_grade_project_with_floats():
     assert "1.01" in piles
     assert "1.10" in piles  # 1.1 float -> "1.10" string
 
+
+
+def test_grade_project_with_workers():
+    """
+    Test that grading with a worker pool returns the same piles as the serial run.
+    """
+    piles = [
+        {
+            "pile_id": f"{t}.{i:02d}",
+            "pile_in_tracker": i,
+            "northing": 8.0 * i,
+            "easting": 10.0 * t,
+            "initial_elevation": 100.0 + 0.3 * ((i * t) % 4),
+            "flooding_allowance": 0.0,
+        }
+        for t in range(1, 4)
+        for i in range(1, 7)
+    ]
+    request_data = {
+        "tracker_type": "flat",
+        "piles": piles,
+        "constraints": {
+            "min_reveal_height": 1.2,
+            "max_reveal_height": 3.2,
+            "pile_install_tolerance": 0.2,
+            "max_incline": 15,
+            "target_height_percentage": 0.5,
+            "max_angle_rotation": 0.0,
+            "edge_overhang": 0.0,
+        },
+    }
+
+    serial = client.post("/api/grade-project", json=request_data)
+    pooled = client.post("/api/grade-project", json={**request_data, "workers": 2})
+
+    assert serial.status_code == 200
+    assert pooled.status_code == 200
+    assert pooled.json()["piles"] == serial.json()["piles"]
+
+
+def test_grade_project_caps_workers(monkeypatch):
+    """
+    Test that a request cannot start more worker processes than the server allows.
+    """
+    seen = []
+    monkeypatch.setattr(grading, "MAX_GRADING_WORKERS", 2)
+    monkeypatch.setattr(
+        grading.flatTrackerGrading, "main", lambda project, **kw: seen.append(kw["workers"])
+    )
+
+    grading._run_grading(None, "flat", workers=10_000)
+    grading._run_grading(None, "flat", workers=1)
+
+    assert seen == [2, 1]
+
+
+def _job_request():
+    piles = [
+        {
+            "pile_id": f"{t}.{i:02d}",
+            "pile_in_tracker": i,
+            "northing": 8.0 * i,
+            "easting": 10.0 * t,
+            "initial_elevation": 100.0 + 0.3 * ((i * t) % 4),
+            "flooding_allowance": 0.0,
+        }
+        for t in range(1, 4)
+        for i in range(1, 7)
+    ]
+    return {
+        "tracker_type": "flat",
+        "piles": piles,
+        "constraints": {
+            "min_reveal_height": 1.2,
+            "max_reveal_height": 3.2,
+            "pile_install_tolerance": 0.2,
+            "max_incline": 15,
+            "target_height_percentage": 0.5,
+            "max_angle_rotation": 0.0,
+            "edge_overhang": 0.0,
+        },
+    }
+
+
+def _wait_for_job(job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/grade-project/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_grade_project_job():
+    """
+    Test that a background grading job reports progress and returns the sync result.
+    """
+    request_data = _job_request()
+
+    submitted = client.post("/api/grade-project/jobs", json=request_data)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+
+    job = _wait_for_job(job_id)
+    assert job["status"] == "completed"
+    assert job["phase"] == "final_grading"
+    assert job["done"] == job["total"] == 3
+    assert list(job["phase_timings"]) == ["target_line", "sliding", "final_grading"]
+
+    result = client.get(f"/api/grade-project/jobs/{job_id}/result")
+    assert result.status_code == 200
+    expected = client.post("/api/grade-project", json=request_data).json()
+    assert result.json()["piles"] == expected["piles"]
+
+
+def test_grade_project_result_cache():
+    """
+    Test that an identical request is answered from the result cache with the same body,
+    and that changing the constraints grades again.
+    """
+    request_data = _job_request()
+
+    first = client.post("/api/grade-project", json=request_data)
+    again = client.post("/api/grade-project", json={**request_data, "workers": 2})
+    assert (first.headers["x-result-cache"], again.headers["x-result-cache"]) == ("miss", "hit")
+    assert again.content == first.content
+
+    request_data["constraints"]["max_incline"] = 15.0  # same value, so still a hit
+    assert client.post("/api/grade-project", json=request_data).headers["x-result-cache"] == "hit"
+    request_data["constraints"]["max_reveal_height"] = 3.0
+    assert client.post("/api/grade-project", json=request_data).headers["x-result-cache"] == "miss"
+
+    # jobs share the cache
+    job = _wait_for_job(client.post("/api/grade-project/jobs", json=request_data).json()["job_id"])
+    result = client.get(f"/api/grade-project/jobs/{job['job_id']}/result").json()
+    assert result["piles"] == client.post("/api/grade-project", json=request_data).json()["piles"]
+
+    stats = client.get("/api/grade-project/cache").json()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (4, 2, 2)
+
+
+def test_metrics():
+    """
+    Test that grading metrics can be switched on and are reported with the cache stats.
+    """
+    enabled = client.post("/api/metrics/instrumentation?enabled=true&reset=true")
+    assert enabled.json()["enabled"] is True
+    try:
+        client.post("/api/grade-project", json=_job_request())
+        metrics = client.get("/api/metrics").json()
+    finally:
+        client.post("/api/metrics/instrumentation?enabled=false")
+
+    # three trackers, each windowed and checked once placing the line and once finalising
+    assert metrics["timers"]["flat.grading_window"]["calls"] == 6
+    assert metrics["timers"]["phase.target_line"]["calls"] == 1
+    assert metrics["counters"]["flat.check_within_window.violations"] == 0
+    assert metrics["result_cache"]["misses"] == 1
+    assert client.get("/api/metrics").json()["enabled"] is False
+
+
+def test_project_result_cache_eviction(tmp_path):
+    """
+    Test entry and byte limits, spilling evicted entries to disk and reading them back.
+    """
+    cache = ProjectResultCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    cache.put("c", b"90")
+    assert cache.get("a") is None  # over the entry limit
+    cache.put("d", b"abcdefghi")
+    assert cache.get("c") is None  # over the byte limit
+    assert cache.stats()["bytes"] == 9
+
+    spilled = ProjectResultCache(max_entries=1, spill_dir=tmp_path)
+    spilled.put("a", b"first")
+    spilled.put("b", b"second")
+    assert (tmp_path / "a.json").read_bytes() == b"first"
+
+    reloaded = ProjectResultCache(max_entries=1, spill_dir=tmp_path)
+    assert reloaded.get("a") == b"first"
+    assert (reloaded.stats()["disk_hits"], reloaded.stats()["disk_entries"]) == (1, 0)
+    assert not (tmp_path / "a.json").exists()
+
+
+def test_project_cache_key_ignores_execution_options():
+    """
+    Test that workers and incremental do not change the cache key.
+    """
+    request = ProjectGradingRequest.model_validate(_job_request())
+    key = project_cache_key(request)
+
+    assert project_cache_key(request.model_copy(update={"workers": 4, "incremental": True})) == key
+    assert project_cache_key(request.model_copy(update={"tracker_type": "xtr"})) != key
+
+
+def test_project_cache_key_includes_cache_version(monkeypatch):
+    """
+    Test that bumping the result cache version invalidates earlier keys.
+    """
+    request = ProjectGradingRequest.model_validate(_job_request())
+    key = project_cache_key(request)
+
+    monkeypatch.setattr(grading, "RESULT_CACHE_VERSION", grading.RESULT_CACHE_VERSION + 1)
+    assert project_cache_key(request) != key
+
+
+def test_grade_project_job_events():
+    """
+    Test that the job event stream reports progress and ends with the final job state.
+    """
+    job_id = client.post("/api/grade-project/jobs", json=_job_request()).json()["job_id"]
+
+    with client.stream(
+        "GET", f"/api/grade-project/jobs/{job_id}/events", params={"interval": 0.01}
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [
+        (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+        for lines in (block.splitlines() for block in body.split("\n\n"))
+        if lines and lines[0].startswith("event: ")
+    ]
+    assert events[-1][0] == "end"
+    assert events[-1][1]["status"] == "completed"
+    assert all(name == "progress" for name, _ in events[:-1])
+
+
+@pytest.mark.parametrize("tracker_type", ["flat", "xtr"])
+def test_grade_project_stream(tracker_type):
+    """
+    Test that the NDJSON stream carries the same piles and totals as /grade-project,
+    one record per tracker followed by a summary.
+    """
+    request_data = {**_job_request(), "tracker_type": tracker_type}
+    request_data["constraints"].update(
+        max_segment_deflection_deg=0.75, max_cumulative_deflection_deg=4.0
+    )
+
+    response = client.post("/api/grade-project/stream", json=request_data)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    expected = client.post("/api/grade-project", json=request_data).json()
+    assert [r["type"] for r in records] == ["tracker"] * 3 + ["summary"]
+    assert [r["tracker_id"] for r in records[:-1]] == [1, 2, 3]
+    assert [p for r in records[:-1] for p in r["piles"]] == expected["piles"]
+
+    summary = records[-1]
+    del summary["type"]
+    assert summary == {k: v for k, v in expected.items() if k != "piles"}
+
+
+def test_grade_project_stream_rejects_bad_request():
+    """
+    Test that request errors are reported before streaming starts.
+    """
+    response = client.post(
+        "/api/grade-project/stream", json={**_job_request(), "tracker_type": "unknown"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("tracker_type", ["flat", "xtr"])
+def test_grade_project_columns(tracker_type):
+    """
+    Test that a columnar payload grades exactly like the same piles sent as objects,
+    whatever order the rows arrive in.
+    """
+    request_data = {**_job_request(), "tracker_type": tracker_type}
+    request_data["constraints"].update(
+        max_segment_deflection_deg=0.75, max_cumulative_deflection_deg=4.0
+    )
+    piles = request_data["piles"][::-1]
+    piles[0]["pile_id"] = float(piles[0]["pile_id"])
+    columns = {name: [p[name] for p in piles] for name in piles[0]}
+
+    expected = client.post("/api/grade-project", json={**request_data, "piles": piles})
+    response = client.post(
+        "/api/grade-project",
+        json={k: v for k, v in request_data.items() if k != "piles"} | {"columns": columns},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == expected.json()
+
+
+@pytest.mark.parametrize("tracker_type", ["flat", "xtr"])
+def test_grade_project_incremental(tracker_type):
+    """
+    Test that incremental requests reuse cached trackers and still match a full grade after
+    one pile is edited.
+    """
+    request_data = {**_job_request(), "tracker_type": tracker_type}
+    request_data["constraints"].update(
+        max_segment_deflection_deg=0.75, max_cumulative_deflection_deg=4.0
+    )
+    tracker_cache.clear()
+    first = client.post("/api/grade-project", json={**request_data, "incremental": True})
+    assert first.status_code == 200
+
+    request_data["piles"][8]["initial_elevation"] += 0.9
+    expected = client.post("/api/grade-project", json=request_data).json()
+    result_cache.clear()  # otherwise the identical request above answers this one
+    hits = tracker_cache.hits
+    response = client.post("/api/grade-project", json={**request_data, "incremental": True})
+
+    assert response.json() == expected
+    assert tracker_cache.hits > hits
+
+
+def test_grade_project_lp_engine():
+    """
+    Test that XTR requests can select the LP engine, cached apart from the heuristic.
+    """
+    pytest.importorskip("scipy")
+    request_data = {**_job_request(), "tracker_type": "xtr"}
+    request_data["constraints"].update(
+        max_segment_deflection_deg=0.75, max_cumulative_deflection_deg=4.0
+    )
+    lp_request = {**request_data, "engine": "lp"}
+
+    heuristic = client.post("/api/grade-project", json=request_data)
+    response = client.post("/api/grade-project", json=lp_request)
+
+    assert response.status_code == 200
+    assert response.headers["X-Result-Cache"] == "miss"
+    data, expected = response.json(), heuristic.json()
+    assert data["total_cut"] + data["total_fill"] <= expected["total_cut"] + expected["total_fill"]
+    assert project_cache_key(ProjectGradingRequest.model_validate(lp_request)) != (
+        project_cache_key(ProjectGradingRequest.model_validate(request_data))
+    )
+
+
+def test_grade_project_lp_engine_requires_xtr():
+    """
+    Test that the LP engine is rejected for flat trackers.
+    """
+    response = client.post("/api/grade-project", json={**_job_request(), "engine": "lp"})
+
+    assert response.status_code == 422
+    assert "only available for xtr" in response.text
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        ({"northing": [0.0]}, "columns.northing has 1 rows"),
+        ({"pile_id": ["1.01", "x"]}, "numeric"),
+        ({"pile_in_tracker": [1, 0]}, ">= 1"),
+        ({"flooding_allowance": [0.0, -0.1]}, "non-negative"),
+    ],
+)
+def test_grade_project_columns_validation(change, message):
+    """
+    Test that columnar payloads are rejected with a 422 naming the bad column.
+    """
+    columns = {
+        "pile_id": ["1.01", "1.02"],
+        "pile_in_tracker": [1, 2],
+        "northing": [0.0, 10.0],
+        "easting": [0.0, 0.0],
+        "initial_elevation": [100.0, 100.5],
+    }
+    request_data = {k: v for k, v in _job_request().items() if k != "piles"}
+    request_data["columns"] = {**columns, **change}
+
+    response = client.post("/api/grade-project", json=request_data)
+
+    assert response.status_code == 422
+    assert re.search(message, json.dumps(response.json()))
+
+
+def test_pile_columns_reject_non_finite():
+    """
+    Test that non-finite coordinates or elevations are rejected.
+    """
+    from endpoints.grading import PileColumns
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError, match=r"initial_elevation\[1\] is not a finite number"):
+        PileColumns(
+            pile_id=[1.01, 1.02],
+            pile_in_tracker=[1, 2],
+            northing=[0.0, 10.0],
+            easting=[0.0, 0.0],
+            initial_elevation=[100.0, float("inf")],
+        )
+
+
+def test_grade_project_requires_one_pile_source():
+    """
+    Test that requests must carry piles or columns, but not both.
+    """
+    request_data = _job_request()
+    columns = {name: [p[name] for p in request_data["piles"]] for name in request_data["piles"][0]}
+
+    neither = {k: v for k, v in request_data.items() if k != "piles"}
+    assert client.post("/api/grade-project", json=neither).status_code == 422
+    both = {**request_data, "columns": columns}
+    assert client.post("/api/grade-project", json=both).status_code == 422
+
+
+def test_grade_project_job_unknown():
+    """
+    Test that unknown job ids are reported as 404.
+    """
+    assert client.get("/api/grade-project/jobs/missing").status_code == 404
+    assert client.get("/api/grade-project/jobs/missing/result").status_code == 404
+    assert client.post("/api/grade-project/jobs/missing/cancel").status_code == 404
+    assert client.get("/api/grade-project/jobs/missing/events").status_code == 404
+
+
+def test_job_manager_cancel():
+    """
+    Test that cancelling a running job stops it at the next progress report, and that
+    queued jobs behind it are cancelled without running.
+    """
+    from endpoints.grading import ProjectGradingRequest
+    from endpoints.jobs import JobManager
+
+    from grading_utils import ProgressEvent
+
+    started = threading.Event()
+    release = threading.Event()
+    reports = []
+
+    def runner(request, progress=None):
+        progress(ProgressEvent("target_line", 0, 3, 0.0))
+        started.set()
+        release.wait(5)
+        progress(ProgressEvent("target_line", 1, 3, 0.1))
+        reports.append("unreachable")
+
+    manager = JobManager(max_workers=1, runner=runner)
+    try:
+        request = ProjectGradingRequest(**_job_request())
+        running = manager.submit(request)
+        queued = manager.submit(request)
+        assert started.wait(5)
+
+        assert manager.cancel(queued.job_id).status == "cancelled"
+        manager.cancel(running.job_id)
+        release.set()
+        running.future.result(5)
+
+        assert running.status == "cancelled"
+        assert running.phase == "target_line"
+        assert (running.done, running.total) == (0, 3)
+        assert running.result is None
+        assert reports == []
+    finally:
+        release.set()
+        manager.shutdown()
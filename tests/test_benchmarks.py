@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic site generator and benchmark harness.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import testing_get_data_tf
+from benchmarks import run_benchmarks
+from benchmarks.synthetic_site import SiteSpec, generate_site, write_site_workbook
+from TerrainFollowingPile import TerrainFollowingPile
+
+
+def _snapshot(project):
+    return [(t.tracker_id, [repr(p) for p in t.piles]) for t in project.trackers]
+
+
+def test_site_is_deterministic():
+    """The same spec always builds the same project; another seed changes the terrain."""
+    spec = SiteSpec.for_piles(95, piles_per_tracker=8)
+
+    project = generate_site(spec)
+    assert (spec.trackers, project.total_piles) == (12, 96)
+    assert _snapshot(generate_site(spec)) == _snapshot(project)
+    assert _snapshot(generate_site(SiteSpec.for_piles(95, piles_per_tracker=8, seed=1))) != (
+        _snapshot(project)
+    )
+
+    piles = [p for t in project.trackers for p in t.piles]
+    assert {p.flooding_allowance for p in piles} == {0.0, spec.flood_allowance}
+    assert len({p.easting for p in piles}) == spec.columns
+
+
+def test_terrain_following_site_round_trips_through_loader(tmp_path):
+    """A generated workbook loads back as the generated terrain-following project."""
+    spec = SiteSpec(project_type="terrain_following", trackers=6, piles_per_tracker=5)
+    project = generate_site(spec)
+    sheet = write_site_workbook(spec, tmp_path / "site.xlsx")
+
+    loaded = testing_get_data_tf.stream_project_from_excel(
+        excel_path=str(tmp_path / "site.xlsx"),
+        sheet_name=sheet,
+        project_name="site",
+        project_type="terrain_following",
+        constraints=project.constraints,
+    )
+
+    assert isinstance(project.trackers[0].piles[0], TerrainFollowingPile)
+    assert [t.tracker_id for t in loaded.trackers] == [t.tracker_id for t in project.trackers]
+    for a, b in zip(loaded.trackers, project.trackers):
+        assert [(p.northing, p.easting) for p in a.piles] == [
+            (p.northing, p.easting) for p in b.piles
+        ]
+        # xlsx stores 15 significant digits
+        assert [p.initial_elevation for p in a.piles] == pytest.approx(
+            [p.initial_elevation for p in b.piles], abs=1e-12
+        )
+
+
+def test_benchmark_run_writes_comparable_json(tmp_path):
+    """A tiny run covers every case, records phases and compares against itself."""
+    output = tmp_path / "bench.json"
+
+    assert run_benchmarks.main(["--sizes", "40", "--output", str(output)]) == 0
+
+    document = json.loads(output.read_text())
+    cases = {r["case"] for r in document["results"]}
+    assert {"flat", "flat_shading", "terrain", "api_grade_cached_standard"} <= cases
+    assert "loader_stream_terrain_following" in cases
+    flat_shading = next(r for r in document["results"] if r["case"] == "flat_shading")
+    assert {"shading_ns", "shading_ew"} <= set(flat_shading["phases"])
+    assert run_benchmarks.compare(document, document) == []
+
+    slower = json.loads(output.read_text())
+    slower["results"][0]["best"] *= 2
+    regressions = run_benchmarks.compare(document, slower)
+    assert len(regressions) == 1 and regressions[0].startswith("flat[40]")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the Excel project loaders (pandas and streaming).
+"""
+
+from __future__ import annotations
+
+import pytest
+from openpyxl import Workbook
+
+import testing_get_data
+import testing_get_data_tf
+from ProjectConstraints import ProjectConstraints
+
+
+@pytest.fixture
+def constraints():
+    return ProjectConstraints(
+        min_reveal_height=1.0,
+        max_reveal_height=2.0,
+        pile_install_tolerance=0.0,
+        max_incline=0.1,
+        max_angle_rotation=0.0,
+        edge_overhang=0.0,
+        max_segment_deflection_deg=1.0,
+        max_cumulative_deflection_deg=5.0,
+    )
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """Workbook with a flat-layout sheet and a terrain-following-layout sheet."""
+    wb = Workbook()
+    flat = wb.active
+    flat.title = "Piling information"
+    flat.append(["Tracker", "Row", "Pile", "Easting", "Northing", "", "", "", "Ground"])
+    tf = wb.create_sheet("TF")
+    tf.append(["Point", "Northing", "Easting", "Elevation", "Description", "Frame"])
+
+    for i in range(24):
+        tracker_id, pit = i // 6 + 1, 6 - i % 6  # piles listed out of order
+        flat.append(
+            [
+                tracker_id,
+                None,
+                pit,
+                100.0 + tracker_id,
+                200.0 + pit,
+                None,
+                None,
+                None,
+                10.0 + 0.1 * i,
+            ]
+        )
+        tf.append([i, 200.0 + pit, 100.0 + tracker_id, 10.0 + 0.1 * i, pit, tracker_id])
+
+    # rows both loaders should skip
+    flat.append(["Total", None, None, None, None, None, None, None, None])
+    flat.append([5, None, 1, 105.0, 201.0, None, None, None, None])
+    tf.append([99, 201.0, 105.0, 10.0, 1, None])
+
+    path = tmp_path / "piles.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def _snapshot(project):
+    return [(t.tracker_id, [repr(p) for p in t.piles]) for t in project.trackers]
+
+
+@pytest.mark.parametrize(
+    "module, sheet_name, project_type",
+    [
+        (testing_get_data, "Piling information", "standard"),
+        (testing_get_data_tf, "TF", "terrain_following"),
+    ],
+)
+def test_stream_loader_matches_pandas_loader(
+    module, sheet_name, project_type, constraints, workbook_path, capsys
+):
+    """The streaming loader builds the same project as the DataFrame loader."""
+    kwargs = dict(
+        excel_path=workbook_path,
+        sheet_name=sheet_name,
+        project_name="Test",
+        project_type=project_type,
+        constraints=constraints,
+    )
+
+    rates = []
+    expected = module.load_project_from_excel(**kwargs)
+    streamed = module.stream_project_from_excel(
+        **kwargs, on_rate=lambda rows, elapsed: rates.append((rows, elapsed))
+    )
+
+    assert len(streamed.trackers) == 4
+    assert streamed.total_piles == 24
+    assert _snapshot(streamed) == _snapshot(expected)
+    assert [p.pile_in_tracker for p in streamed.trackers[0].piles] == [1, 2, 3, 4, 5, 6]
+    [(rows, elapsed)] = rates
+    assert rows >= 24 and elapsed >= 0
+    assert capsys.readouterr().out == ""  # loaders leave printing to scripts
+
+
+def test_print_load_rate(capsys):
+    """The script-side `on_rate` callback prints the rows/sec achieved."""
+    testing_get_data.print_load_rate(1000, 0.5)
+
+    assert capsys.readouterr().out == "Read 1000 rows in 0.50s (2,000 rows/sec)\n"
+
+
+def test_as_number():
+    """Cell values are coerced to float, with blanks and text rejected."""
+    assert testing_get_data.as_number(3) == 3.0
+    assert testing_get_data.as_number(" 4.5 ") == 4.5
+    assert testing_get_data.as_number(None) is None
+    assert testing_get_data.as_number("Total") is None
+    assert testing_get_data.as_number(float("nan")) is None
+    assert testing_get_data.as_number(True) is None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for batched flat-tracker grading against the per-tracker engine.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import flatBatchedGrading
+import flatTrackerGrading
+from BasePile import BasePile
+from BaseTracker import BaseTracker
+from benchmarks.synthetic_site import SiteSpec, generate_site
+from flatTrackerGrading import _slope_candidates
+
+
+def _graded_state(project):
+    return [
+        (
+            t.tracker_id,
+            [
+                (p.height, p.current_elevation, p.final_elevation, p.total_height, p.pile_revealed)
+                for p in t.piles
+            ],
+        )
+        for t in project.trackers
+    ]
+
+
+def _mixed_site(spec):
+    """Site whose trackers have 10, 8, 1 and 7 piles."""
+    project = generate_site(spec)
+    for i, tracker in enumerate(project.trackers):
+        if i % 4 == 1:
+            del tracker.piles[-2:]
+        elif i % 4 == 2:
+            del tracker.piles[1:]
+        elif i % 4 == 3:
+            del tracker.piles[:3]
+    return project
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize(
+    "spec",
+    [
+        SiteSpec.for_piles(400, seed=2, noise=0.3, undulation=2.0),
+        SiteSpec.for_piles(300, with_shading=True),
+    ],
+    ids=["rough", "shading"],
+)
+@pytest.mark.parametrize("solver", ["grid", "exact"])
+def test_matches_per_tracker_main(spec, solver):
+    """Batched grading leaves every pile exactly as `flatTrackerGrading.main` does."""
+    expected, project = _mixed_site(spec), _mixed_site(spec)
+
+    flatTrackerGrading.main(expected, solver=solver)
+    flatBatchedGrading.main(project, solver=solver)
+
+    assert _graded_state(project) == _graded_state(expected)
+
+
+def test_slope_candidates_match_per_tracker_lists():
+    """Each row's valid stacked candidates are the per-tracker candidate list."""
+    rng = np.random.default_rng(0)
+    baseline = np.concatenate([rng.normal(0.0, 0.1, 200), [0.0, 0.15, -0.15, 0.5, -0.5]])
+
+    for steps in (1, 2, 11):
+        slopes, valid = flatBatchedGrading._slope_candidates(
+            baseline, max_abs_slope=0.15, tolerance=0.05, steps=steps
+        )
+        for b, row, keep in zip(baseline.tolist(), slopes, valid):
+            expected = _slope_candidates(b, max_abs_slope=0.15, tolerance=0.05, steps=steps)
+            assert row[keep].tolist() == expected
+
+
+def test_progress_and_tracker_callbacks():
+    """Phases report every tracker, and trackers are handed back in project order."""
+    project = _mixed_site(SiteSpec.for_piles(200, seed=1, noise=0.3))
+    project.add_tracker(BaseTracker(tracker_id=21))
+    events, done = [], []
+
+    flatBatchedGrading.main(project, progress=events.append, on_tracker_done=done.append)
+
+    assert [t.tracker_id for t in done] == [t.tracker_id for t in project.trackers]
+    last = {e.phase: e for e in events}
+    assert list(last) == ["target_line", "sliding", "final_grading"]
+    assert (last["target_line"].done, last["target_line"].total) == (20, 20)
+    assert last["sliding"].done == last["sliding"].total > 0
+    assert last["final_grading"].done == 21
+
+
+def test_identical_northings_raise():
+    project = generate_site(SiteSpec.for_piles(20))
+    tracker = BaseTracker(tracker_id=99)
+    for i in (1, 2):
+        tracker.add_pile(BasePile(100.0, 50.0, 10.0, i, float(f"99.0{i}"), 0.0))
+    project.add_tracker(tracker)
+
+    with pytest.raises(ValueError, match="identical northing"):
+        flatBatchedGrading.main(project)
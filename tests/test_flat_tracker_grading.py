@@ -6,20 +6,46 @@ Tests core grading algorithms and helper functions.
 
 from __future__ import annotations
 
+import numpy as np
 import pytest
 
+import flatTrackerGrading
 from BasePile import BasePile
 from BaseTracker import BaseTracker
 from flatTrackerGrading import (
+    TrackerWindowArrays,
     _interpolate_coords,
     _window_by_pile_in_tracker,
     _y_intercept,
     check_within_window,
+    find_optimal_line_intercept,
+    find_optimal_line_intercept_exact,
+    find_optimal_line_intercept_vectorized,
+    find_optimal_line_slope_and_intercept_2d,
+    find_optimal_line_slope_and_intercept_exact,
     grading,
     grading_window,
+    main,
     sliding_line,
     target_height_line,
 )
+from grading_utils import (
+    ProgressEvent,
+    ProgressReporter,
+    TrackerPayload,
+    TrackerResultCache,
+    exact_offset_search,
+    grading_cost,
+    instrument,
+    instrumentation,
+    map_trackers,
+    total_grading_cost,
+    tracker_cost,
+    tracker_fingerprint,
+    tracker_grading_costs,
+    tracker_window,
+    window_excess,
+)
 from Project import Project
 from ProjectConstraints import ProjectConstraints
 
@@ -390,6 +416,545 @@ class TestSlidingLine:
         assert abs(pile.height - initial_height) > 1e-6
 
 
+@pytest.fixture
+def window_project():
+    """Standard project with a small install tolerance."""
+    constraints = ProjectConstraints(
+        min_reveal_height=1.375,
+        max_reveal_height=1.675,
+        pile_install_tolerance=0.05,
+        max_incline=0.15,
+        target_height_percentage=0.5,
+        max_angle_rotation=0.0,
+        edge_overhang=0.0,
+    )
+    return Project(name="Test", project_type="standard", constraints=constraints)
+
+
+@pytest.fixture
+def undulating_tracker():
+    """Ten piles on undulating ground so several fall outside the target line window."""
+    elevations = [10.0, 10.4, 9.7, 10.9, 10.1, 9.5, 10.6, 10.2, 11.0, 10.3]
+    tracker = BaseTracker(tracker_id=1)
+    for i, z in enumerate(elevations, start=1):
+        tracker.add_pile(
+            BasePile(
+                northing=100.0 + 8.0 * i,
+                easting=50.0,
+                initial_elevation=z,
+                pile_id=float(f"1.{i:02d}"),
+                pile_in_tracker=i,
+                flooding_allowance=0.0,
+            )
+        )
+    return tracker
+
+
+class TestVectorizedInterceptSearch:
+    """Test the array-backed intercept search against the per-candidate search."""
+
+    def test_matches_scalar_search(self, window_project, undulating_tracker):
+        """Both searches return the same LineSearchResult for a range of slopes."""
+        window = grading_window(window_project, undulating_tracker)
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+        arrays = TrackerWindowArrays.from_window(undulating_tracker, window)
+
+        for s in (slope - 0.01, slope, slope + 0.01):
+            expected = find_optimal_line_intercept(
+                tracker=undulating_tracker,
+                window_fn=lambda: grading_window(window_project, undulating_tracker),
+                slope=s,
+                initial_intercept=intercept,
+                span=0.6,
+            )
+            result = find_optimal_line_intercept_vectorized(
+                arrays=arrays, slope=s, initial_intercept=intercept, span=0.6
+            )
+            assert result == expected
+
+    def test_does_not_modify_heights(self, window_project, undulating_tracker):
+        """The vectorized search never writes pile heights."""
+        window = grading_window(window_project, undulating_tracker)
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+        heights = [p.height for p in undulating_tracker.piles]
+
+        find_optimal_line_intercept_vectorized(
+            arrays=TrackerWindowArrays.from_window(undulating_tracker, window),
+            slope=slope,
+            initial_intercept=intercept,
+            span=0.6,
+        )
+
+        assert [p.height for p in undulating_tracker.piles] == heights
+
+    def test_infeasible_returns_initial_intercept(self, window_project, undulating_tracker):
+        """If no candidate keeps the endpoints in window, fall back to the initial intercept."""
+        window = grading_window(window_project, undulating_tracker)
+        arrays = TrackerWindowArrays.from_window(undulating_tracker, window)
+
+        result = find_optimal_line_intercept_vectorized(
+            arrays=arrays, slope=0.0, initial_intercept=-50.0, span=0.1
+        )
+
+        assert result.best_intercept == -50.0
+        assert result.best_cost == float("inf")
+        assert result.best_violations == []
+
+
+def _reference_violations(window, tracker):
+    """Per-pile scalar window check the array kernels must reproduce."""
+    limits = _window_by_pile_in_tracker(window)
+    violations = []
+    for pile in tracker.piles:
+        wmin, wmax = limits[pile.pile_in_tracker]
+        if not wmin <= pile.height <= wmax:
+            violations.append(
+                {
+                    "pile_in_tracker": pile.pile_in_tracker,
+                    "grading_window_min": wmin,
+                    "grading_window_max": wmax,
+                    "below_by": min(0.0, pile.height - wmin),
+                    "above_by": max(0.0, pile.height - wmax),
+                }
+            )
+    return violations
+
+
+class TestGradingKernels:
+    """Test the shared array kernels against the per-pile window checks."""
+
+    def test_window_matches_pile_methods(self, window_project, undulating_tracker):
+        window = grading_window(window_project, undulating_tracker)
+
+        assert [(w["grading_window_min"], w["grading_window_max"]) for w in window] == [
+            (p.true_min_height(window_project), p.true_max_height(window_project))
+            for p in undulating_tracker.piles
+        ]
+
+    @pytest.mark.parametrize("offset", [-0.3, 0.0, 0.05, 0.4])
+    def test_violations_and_cost_are_exact(self, window_project, undulating_tracker, offset):
+        """Kernel violations and costs equal the scalar ones bit for bit, NaN included."""
+        target_height_line(undulating_tracker, window_project)
+        for pile in undulating_tracker.piles:
+            pile.height += offset
+        undulating_tracker.piles[4].height = float("nan")
+        window = grading_window(window_project, undulating_tracker)
+
+        expected = _reference_violations(window, undulating_tracker)
+        assert check_within_window(window, undulating_tracker) == expected
+
+        heights = np.array([p.height for p in undulating_tracker.piles])
+        window_min, window_max = tracker_window(window_project, undulating_tracker)
+        cost = grading_cost(*window_excess(heights, window_min, window_max))
+        assert cost == total_grading_cost(expected)
+
+    def test_tracker_costs_match_per_tracker_cost(self):
+        """Costs of trackers packed back to back, of uneven lengths, match one by one."""
+        rng = np.random.default_rng(3)
+        bounds = np.array([0, 7, 7, 10, 25])
+        heights = rng.normal(1.5, 0.3, bounds[-1])
+        window_min = np.full(bounds[-1], 1.4)
+        window_max = np.full(bounds[-1], 1.6)
+        below_by, above_by = window_excess(heights, window_min, window_max)
+
+        costs = tracker_grading_costs(below_by, above_by, bounds)
+
+        assert costs.tolist() == [
+            grading_cost(below_by[a:b], above_by[a:b]) for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        assert costs[1] == 0.0
+
+    def test_inverted_window_warns(self, window_project, undulating_tracker):
+        undulating_tracker.piles[2].flooding_allowance = 1.0
+
+        with pytest.warns(UserWarning, match="Pile 1.03: inverted grading window"):
+            window_min, window_max = tracker_window(window_project, undulating_tracker)
+
+        assert window_min[2] > window_max[2]
+
+
+class TestExactLineSolver:
+    """Test the exact (breakpoint sweep) line optimiser."""
+
+    def test_offset_search_flat_minimum_closest_to_reference(self):
+        """Cost is 1.0 for any offset in [1, 2]; the offset nearest the reference is chosen."""
+        base = np.zeros(2)
+        best, cost = exact_offset_search(
+            base,
+            np.array([0.0, 2.0]),
+            np.array([1.0, 3.0]),
+            lower=-10.0,
+            upper=10.0,
+            reference=0.0,
+        )
+        assert abs(best - 1.0) < 1e-12
+        assert abs(cost - 1.0) < 1e-12
+
+    def test_offset_search_respects_bounds(self):
+        """The optimum is clamped to the feasible interval."""
+        base = np.zeros(1)
+        best, cost = exact_offset_search(
+            base, np.array([5.0]), np.array([6.0]), lower=0.0, upper=2.0, reference=0.0
+        )
+        assert best == 2.0
+        assert abs(cost - 3.0) < 1e-12
+
+    def test_exact_intercept_matches_dense_scan(self, window_project, undulating_tracker):
+        """No intercept on a dense grid beats the exact solution."""
+        window = grading_window(window_project, undulating_tracker)
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+        arrays = TrackerWindowArrays.from_window(undulating_tracker, window)
+
+        result = find_optimal_line_intercept_exact(
+            arrays=arrays, slope=slope, initial_intercept=intercept
+        )
+
+        dense = np.linspace(intercept - 1.0, intercept + 1.0, 20001)
+        costs, feasible = arrays.evaluate(slope, dense)
+        assert result.best_cost <= costs[feasible].min() + 1e-9
+        assert result.best_cost == total_grading_cost(result.best_violations)
+
+    def test_exact_never_worse_than_grid(self, window_project, undulating_tracker):
+        """The exact 2D solve finds a line at least as cheap as the grid search."""
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+
+        grid = find_optimal_line_slope_and_intercept_2d(
+            tracker=undulating_tracker,
+            project=window_project,
+            baseline_slope=slope,
+            baseline_intercept=intercept,
+            intercept_span=0.6,
+        )
+        exact = find_optimal_line_slope_and_intercept_exact(
+            tracker=undulating_tracker,
+            project=window_project,
+            baseline_slope=slope,
+            baseline_intercept=intercept,
+        )
+
+        assert exact.best_cost <= grid.best_cost + 1e-9
+        assert abs(exact.best_slope) <= window_project.constraints.max_incline
+
+    def test_sliding_line_exact_keeps_endpoints_in_window(self, window_project, undulating_tracker):
+        """Applying the exact line leaves the first and last piles inside their windows."""
+        window = grading_window(window_project, undulating_tracker)
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+
+        sliding_line(
+            undulating_tracker,
+            window_project,
+            slope,
+            intercept,
+            intercept_span=0.6,
+            solver="exact",
+        )
+
+        violating = {v["pile_in_tracker"] for v in check_within_window(window, undulating_tracker)}
+        assert 1 not in violating
+        assert len(undulating_tracker.piles) not in violating
+
+    def test_unknown_solver_rejected(self, window_project, undulating_tracker):
+        """An unknown solver name raises ValueError."""
+        slope, intercept = target_height_line(undulating_tracker, window_project)
+        with pytest.raises(ValueError):
+            sliding_line(
+                undulating_tracker,
+                window_project,
+                slope,
+                intercept,
+                intercept_span=0.6,
+                solver="simplex",
+            )
+
+
+class TestTrackerMovement:
+    """Test the shading trial evaluator against applying and restoring the lines."""
+
+    @staticmethod
+    def _pair(undulating_tracker):
+        south = BaseTracker(tracker_id=2)
+        for pile in undulating_tracker.piles:
+            south.add_pile(
+                BasePile(
+                    northing=pile.northing - 100.0,
+                    easting=pile.easting,
+                    initial_elevation=pile.initial_elevation - 0.2,
+                    pile_id=pile.pile_id + 1.0,
+                    pile_in_tracker=pile.pile_in_tracker,
+                    flooding_allowance=0.0,
+                )
+            )
+        return undulating_tracker, south
+
+    @staticmethod
+    def _reference(project, north, south, north_movement, south_movement):
+        """Move the piles onto the shifted lines, cost them and put them back."""
+        result = []
+        for tracker, movement in ((north, north_movement), (south, south_movement)):
+            original = [p.height for p in tracker.piles]
+            first, last = tracker.get_first(), tracker.get_last()
+            slope = (first.height - last.height) / tracker.distance_first_to_last_pile
+            intercept = _y_intercept(slope, first.northing, first.height)
+            cost = 0
+            if movement != 0:
+                intercept += movement
+                flatTrackerGrading._apply_line_to_tracker(tracker, slope, intercept)
+                cost = tracker_cost(project, tracker)
+            for pile, h in zip(tracker.piles, original):
+                pile.height = h
+            result.append((cost, slope, intercept))
+        (north_cost, *north_line), (south_cost, *south_line) = result
+        return (abs(north_cost + south_cost), *north_line, *south_line)
+
+    @pytest.mark.parametrize(
+        "movements", [(-0.3, 0.0), (0.0, 0.25), (-0.1, 0.15), (0.45, -0.05), (0.0, 0.0)]
+    )
+    def test_matches_apply_and_restore(self, window_project, undulating_tracker, movements):
+        """Cost and shifted lines equal the mutate-and-restore evaluation bit for bit."""
+        north, south = self._pair(undulating_tracker)
+        for tracker in (north, south):
+            target_height_line(tracker, window_project)
+        heights = [p.height for t in (north, south) for p in t.piles]
+
+        result = flatTrackerGrading.test_tracker_movement(window_project, north, south, *movements)
+
+        assert result == self._reference(window_project, north, south, *movements)
+        assert [p.height for t in (north, south) for p in t.piles] == heights
+
+    def test_window_arrays_are_cached(self, window_project, undulating_tracker):
+        """Window arrays are built once per moved tracker and shared between trials."""
+        north, south = self._pair(undulating_tracker)
+        for tracker in (north, south):
+            target_height_line(tracker, window_project)
+        windows = {}
+
+        flatTrackerGrading.test_tracker_movement(window_project, north, south, -0.1, 0.0, windows)
+        assert list(windows) == [1]
+        cached = windows[1]
+
+        flatTrackerGrading.test_tracker_movement(window_project, north, south, -0.2, 0.1, windows)
+        assert windows[1] is cached
+        assert sorted(windows) == [1, 2]
+        np.testing.assert_array_equal(cached.window_min, tracker_window(window_project, north)[0])
+
+    def test_ns_analysis_moves_both_trackers(self, window_project):
+        """A step between two trackers in a column is split between them when costs tie."""
+        trackers = []
+        for tracker_id, start in ((1, 200.0), (2, 100.0)):
+            tracker = BaseTracker(tracker_id=tracker_id)
+            for i in range(1, 11):
+                tracker.add_pile(
+                    BasePile(
+                        northing=start + 8.0 * i,
+                        easting=50.0,
+                        initial_elevation=10.0,
+                        pile_id=float(f"{tracker_id}.{i:02d}"),
+                        pile_in_tracker=i,
+                        flooding_allowance=0.0,
+                    )
+                )
+            flatTrackerGrading._apply_line_to_tracker(tracker, 0.0, 11.5)
+            window_project.add_tracker(tracker)
+            trackers.append(tracker)
+        north, south = trackers
+        for pile in north.piles:
+            pile.set_total_height(pile.height)
+        for pile in south.piles:
+            pile.set_total_height(pile.height - 0.2)
+
+        flatTrackerGrading.apply_ns_analysis(
+            window_project, {"ns_max_height_diff": 0.1, "ns_max_slope": 1.0}
+        )
+
+        assert [p.height for p in north.piles] == pytest.approx([11.45] * 10)
+        assert [p.height for p in south.piles] == pytest.approx([11.55] * 10)
+
+
+class TestParallelMain:
+    """Test process-pool grading of independent trackers."""
+
+    @staticmethod
+    def _build_project(window_project):
+        project = Project(
+            name="Parallel", project_type="standard", constraints=window_project.constraints
+        )
+        rng = np.random.default_rng(7)
+        for t in range(1, 7):
+            tracker = BaseTracker(tracker_id=t)
+            for i in range(1, 13):
+                tracker.add_pile(
+                    BasePile(
+                        northing=100.0 + 8.0 * i,
+                        easting=10.0 * t,
+                        initial_elevation=float(10.0 + rng.normal(0.0, 0.4)),
+                        pile_id=float(f"{t}.{i:02d}"),
+                        pile_in_tracker=i,
+                        flooding_allowance=0.0,
+                    )
+                )
+            project.add_tracker(tracker)
+        return project
+
+    @staticmethod
+    def _outputs(project):
+        return [
+            (p.pile_id, p.height, p.final_elevation, p.total_height, p.pile_revealed)
+            for t in project.trackers
+            for p in t.piles
+        ]
+
+    def test_payload_round_trip(self, undulating_tracker):
+        """Rebuilding a tracker from its payload preserves pile state."""
+        undulating_tracker.piles[3].height = 11.5
+        rebuilt = TrackerPayload.from_tracker(undulating_tracker).to_tracker(BaseTracker, BasePile)
+
+        assert rebuilt.tracker_id == undulating_tracker.tracker_id
+        for a, b in zip(undulating_tracker.piles, rebuilt.piles):
+            assert (a.pile_id, a.pile_in_tracker, a.northing, a.height) == (
+                b.pile_id,
+                b.pile_in_tracker,
+                b.northing,
+                b.height,
+            )
+            assert type(b.height) is float
+
+    def test_map_trackers_preserves_order(self):
+        """Results come back in input order for serial and pooled runs."""
+        items = list(range(20))
+        assert map_trackers(abs, items, workers=None) == items
+        assert map_trackers(abs, items, workers=2, chunksize=3) == items
+
+    def test_parallel_matches_serial(self, window_project):
+        """Pooled grading produces exactly the serial results."""
+        serial = self._build_project(window_project)
+        pooled = self._build_project(window_project)
+
+        main(serial)
+        main(pooled, workers=2)
+
+        assert self._outputs(pooled) == self._outputs(serial)
+
+    @pytest.mark.parametrize("workers", [None, 2])
+    def test_progress_events(self, window_project, workers):
+        """Each phase reports a start event, per-tracker progress and elapsed time."""
+        project = self._build_project(window_project)
+        events = []
+
+        main(project, workers=workers, progress=events.append)
+
+        phases = list(dict.fromkeys(e.phase for e in events))
+        assert phases == ["target_line", "sliding", "final_grading"]
+        for phase in phases:
+            reported = [e for e in events if e.phase == phase]
+            assert [e.done for e in reported] == list(range(reported[0].total + 1))
+            assert all(a.elapsed <= b.elapsed for a, b in zip(reported, reported[1:]))
+        assert events[-1].total == len(project.trackers)
+
+    @pytest.mark.parametrize("workers", [None, 2])
+    def test_incremental_regrade_matches_full_run(self, window_project, workers):
+        """A cached regrade after editing one tracker equals grading from scratch."""
+        cache = TrackerResultCache()
+        main(self._build_project(window_project), workers=workers, cache=cache)
+        assert (cache.hits, len(cache)) == (0, 12)
+
+        def edited():
+            project = self._build_project(window_project)
+            project.trackers[2].piles[5].initial_elevation += 0.8
+            project.trackers[2].piles[5].current_elevation += 0.8
+            return project
+
+        incremental, fresh = edited(), edited()
+        main(incremental, workers=workers, cache=cache)
+        main(fresh)
+
+        assert self._outputs(incremental) == self._outputs(fresh)
+        # every tracker but the edited one reuses its fitted line and final outputs
+        assert cache.hits == 10
+
+    def test_fingerprint_tracks_pile_inputs(self, undulating_tracker):
+        """Fingerprints change with pile state and context, and nothing else."""
+        before = tracker_fingerprint(undulating_tracker, "fit")
+        assert tracker_fingerprint(undulating_tracker, "fit") == before
+        assert tracker_fingerprint(undulating_tracker, "final") != before
+
+        undulating_tracker.piles[0].initial_elevation += 1e-9
+        assert tracker_fingerprint(undulating_tracker, "fit") != before
+
+    def test_result_cache_evicts_least_recently_used(self):
+        cache = TrackerResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+
+class TestProgressReporter:
+    """Test phase timing and progress event reporting."""
+
+    def test_phase_timing_accumulates(self):
+        """Re-entering a phase accumulates its time and only reports its start once."""
+        clock = iter([0.0, 0.0, 1.0, 2.0, 10.0, 11.0, 13.0]).__next__
+        events = []
+        reporter = ProgressReporter(events.append, clock=clock)
+
+        with reporter.phase("shading_ns", 2) as tick:  # starts (and reports) at 0.0
+            tick(1)  # 1.0
+        # exits at 2.0
+        with reporter.phase("shading_ns", 2) as tick:  # re-enters at 10.0
+            tick(2)  # 11.0
+        # exits at 13.0
+
+        assert events == [
+            ProgressEvent("shading_ns", 0, 2, 0.0),
+            ProgressEvent("shading_ns", 1, 2, 1.0),
+            ProgressEvent("shading_ns", 2, 2, 3.0),
+        ]
+        assert reporter.timings == {"shading_ns": 5.0}
+        assert events[-1].rate == pytest.approx(2 / 3)
+
+    def test_callback_error_aborts(self, window_project):
+        """An exception raised by the callback stops the run."""
+        project = TestParallelMain._build_project(window_project)
+
+        def stop(event):
+            if event.phase == "sliding" and event.done:
+                raise RuntimeError("stop")
+
+        with pytest.raises(RuntimeError, match="stop"):
+            main(project, progress=stop)
+
+
+class TestInstrumentation:
+    """Test opt-in timers and counters on the grading hot paths."""
+
+    def test_disabled_by_default(self, window_project):
+        instrumentation.reset()
+        main(TestParallelMain._build_project(window_project))
+
+        assert instrumentation.snapshot() == {"enabled": False, "timers": {}, "counters": {}}
+
+    def test_main_records_timers_and_counters(self, window_project):
+        """An instrumented run times the hot paths and phases and counts candidates."""
+        project = TestParallelMain._build_project(window_project)
+
+        with instrument() as metrics:
+            main(project)
+        snapshot = metrics.snapshot()
+
+        timers, counters = snapshot["timers"], snapshot["counters"]
+        assert timers["flat.sliding_line"]["calls"] == len(project.trackers)
+        assert timers["phase.final_grading"]["calls"] == 1
+        assert timers["flat.grading_window"]["seconds"] > 0
+        assert timers["flat.check_within_window"]["calls"] >= len(project.trackers)
+        assert counters["flat.find_optimal_line_intercept.candidates"] >= 11 * 121
+        assert "flat.check_within_window.violations" in counters
+        assert instrumentation.enabled is False
+
+
 class TestGrading:
     """Test grading function that adjusts ground elevation."""
 
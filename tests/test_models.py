@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Unit tests for data models: BasePile, BaseTracker, Project, ProjectConstraints.
+Unit tests for data models: BasePile, BaseTracker, Project, ProjectConstraints, PileArray.
 Tests validation, calculations, and data integrity.
 """
 
@@ -10,6 +10,7 @@ import pytest
 
 from BasePile import BasePile
 from BaseTracker import BaseTracker
+from PileArray import PileArray, PileView
 from Project import Project
 from ProjectConstraints import ProjectConstraints
 
@@ -176,6 +177,7 @@ class TestBasePile:
 
         assert abs(pile.pile_at_target_height(project) - expected) < 1e-6
 
+
 class TestBaseTracker:
     """Test BaseTracker model."""
 
@@ -290,6 +292,62 @@ class TestBaseTracker:
         with pytest.raises(ValueError, match="not found"):
             tracker.get_pile_in_tracker(10)
 
+    def test_get_pile_in_tracker_unsorted(self):
+        """Test lookup when piles were added out of position order."""
+        tracker = BaseTracker(tracker_id=1)
+        for pit in (3, 1, 4, 2):
+            tracker.add_pile(
+                BasePile(
+                    northing=100.0 + pit * 10.0,
+                    easting=50.0,
+                    initial_elevation=10.0,
+                    pile_id=1.0 + pit * 0.01,
+                    pile_in_tracker=pit,
+                    flooding_allowance=0.0,
+                )
+            )
+
+        for pit in (1, 2, 3, 4):
+            assert tracker.get_pile_in_tracker(pit).pile_in_tracker == pit
+
+        tracker.sort_by_pole_position()
+        assert tracker.get_pile_in_tracker(2) is tracker.piles[1]
+
+    def test_get_pile_in_tracker_after_renumber(self):
+        """Test lookup follows renumbering by northing."""
+        constraints = ProjectConstraints(
+            min_reveal_height=1.0,
+            max_reveal_height=2.0,
+            pile_install_tolerance=0.0,
+            max_incline=0.1,
+            target_height_percentage=0.5,
+            max_angle_rotation=0.0,
+            edge_overhang=0.0,
+        )
+        project = Project(name="Test", project_type="standard", constraints=constraints)
+        tracker = BaseTracker(tracker_id=1)
+        for pit, northing in ((1, 130.0), (2, 110.0), (3, 120.0)):
+            tracker.add_pile(
+                BasePile(
+                    northing=northing,
+                    easting=50.0,
+                    initial_elevation=10.0,
+                    pile_id=1.0 + pit * 0.01,
+                    pile_in_tracker=pit,
+                    flooding_allowance=0.0,
+                )
+            )
+        project.add_tracker(tracker)
+        tracker.get_pile_in_tracker(3)  # build the index before renumbering
+
+        project.renumber_piles_by_northing()
+
+        assert [tracker.get_pile_in_tracker(i).northing for i in (1, 2, 3)] == [
+            110.0,
+            120.0,
+            130.0,
+        ]
+
 
 class TestProjectConstraints:
     """Test ProjectConstraints validation."""
@@ -529,3 +587,225 @@ class TestProject:
         retrieved = project.get_pile_by_id(175.10)
         assert retrieved.pile_in_tracker == 10
         assert abs(retrieved.pile_id - 175.10) < 1e-6
+
+    def test_lookups_after_direct_append_and_renumber(self):
+        """Test project lookups stay consistent when trackers bypass add_tracker."""
+        constraints = ProjectConstraints(
+            min_reveal_height=1.375,
+            max_reveal_height=1.675,
+            pile_install_tolerance=0.0,
+            max_incline=0.15,
+            target_height_percentage=0.5,
+            max_angle_rotation=0.0,
+            edge_overhang=0.0,
+        )
+        project = Project(name="Test", project_type="standard", constraints=constraints)
+
+        for tracker_id in (1, 2):
+            tracker = BaseTracker(tracker_id=tracker_id)
+            for pit, northing in ((1, 130.0), (2, 110.0), (3, 120.0)):
+                tracker.add_pile(
+                    BasePile(
+                        northing=northing,
+                        easting=10.0 * tracker_id,
+                        initial_elevation=10.0,
+                        pile_id=float(f"{tracker_id}.{pit:02d}"),
+                        pile_in_tracker=pit,
+                        flooding_allowance=0.0,
+                    )
+                )
+            if tracker_id == 1:
+                project.add_tracker(tracker)
+            else:
+                project.trackers.append(tracker)  # as the Excel loaders do
+
+        assert project.get_tracker_by_id(2) is project.trackers[1]
+
+        project.renumber_piles_by_northing()
+
+        pile = project.get_pile_by_id(2.01)
+        assert pile.northing == 130.0
+        assert pile.pile_in_tracker == 3
+        assert project.get_tracker_for_pile(pile) is project.trackers[1]
+
+    def test_get_tracker_for_pile_uses_identity(self):
+        """Test that an equal but distinct pile is not treated as part of a tracker."""
+        constraints = ProjectConstraints(
+            min_reveal_height=1.375,
+            max_reveal_height=1.675,
+            pile_install_tolerance=0.0,
+            max_incline=0.15,
+            target_height_percentage=0.5,
+            max_angle_rotation=0.0,
+            edge_overhang=0.0,
+        )
+        project = Project(name="Test", project_type="standard", constraints=constraints)
+        kwargs = dict(
+            northing=100.0,
+            easting=50.0,
+            initial_elevation=10.0,
+            pile_id=1.01,
+            pile_in_tracker=1,
+            flooding_allowance=0.0,
+        )
+        tracker = BaseTracker(tracker_id=1)
+        tracker.add_pile(BasePile(**kwargs))
+        project.add_tracker(tracker)
+
+        assert project.get_tracker_for_pile(tracker.piles[0]) is tracker
+        with pytest.raises(ValueError, match="not found"):
+            project.get_tracker_for_pile(BasePile(**kwargs))
+
+    def test_get_easting_columns(self):
+        """Test trackers are grouped by easting and sorted north to south."""
+        constraints = ProjectConstraints(
+            min_reveal_height=1.375,
+            max_reveal_height=1.675,
+            pile_install_tolerance=0.0,
+            max_incline=0.15,
+            target_height_percentage=0.5,
+            max_angle_rotation=0.0,
+            edge_overhang=0.0,
+        )
+        project = Project(name="Test", project_type="standard", constraints=constraints)
+
+        # (tracker_id, easting, northing)
+        layout = [(1, 50.0, 100.0), (2, 60.0, 100.0), (3, 50.004, 300.0), (4, 50.0, 200.0)]
+        for tracker_id, easting, northing in layout:
+            tracker = BaseTracker(tracker_id=tracker_id)
+            tracker.add_pile(
+                BasePile(
+                    northing=northing,
+                    easting=easting,
+                    initial_elevation=10.0,
+                    pile_id=float(f"{tracker_id}.01"),
+                    pile_in_tracker=1,
+                    flooding_allowance=0.0,
+                )
+            )
+            project.add_tracker(tracker)
+
+        columns = project.get_easting_columns()
+
+        assert [[t.tracker_id for t in col] for col in columns] == [[3, 4, 1], [2]]
+
+
+class TestPileArray:
+    """Tests for the columnar pile store and its pile views."""
+
+    @pytest.fixture
+    def project(self):
+        constraints = ProjectConstraints(
+            min_reveal_height=1.375,
+            max_reveal_height=1.675,
+            pile_install_tolerance=0.0,
+            max_incline=0.15,
+            target_height_percentage=0.5,
+            max_angle_rotation=0.0,
+            edge_overhang=0.0,
+        )
+        project = Project(name="Test", project_type="standard", constraints=constraints)
+        for tracker_id in (1, 2):
+            tracker = BaseTracker(tracker_id=tracker_id)
+            for pit in range(1, 4):
+                tracker.add_pile(
+                    BasePile(
+                        northing=100.0 + 10.0 * pit,
+                        easting=10.0 * tracker_id,
+                        initial_elevation=10.0 + 0.1 * pit,
+                        pile_id=float(f"{tracker_id}.{pit:02d}"),
+                        pile_in_tracker=pit,
+                        flooding_allowance=0.0,
+                    )
+                )
+            project.add_tracker(tracker)
+        return project
+
+    def test_piles_are_slotted(self):
+        """Test that piles no longer carry a per-instance __dict__."""
+        pile = BasePile(
+            northing=100.0,
+            easting=50.0,
+            initial_elevation=10.0,
+            pile_id=1.01,
+            pile_in_tracker=1,
+            flooding_allowance=0.0,
+        )
+        assert not hasattr(pile, "__dict__")
+
+    def test_to_pile_array_preserves_piles(self, project):
+        """Test that views expose the same values as the original piles."""
+        before = [repr(p) for t in project.trackers for p in t.piles]
+
+        store = project.to_pile_array()
+
+        assert len(store) == 6
+        assert store.tracker_slice(2) == slice(3, 6)
+        assert [
+            repr(p).replace("PileView", "BasePile") for t in project.trackers for p in t.piles
+        ] == before
+        assert all(isinstance(p, BasePile) for t in project.trackers for p in t.piles)
+
+    def test_views_write_through(self, project):
+        """Test that setting attributes on a view updates the arrays and vice versa."""
+        store = project.to_pile_array()
+        pile = project.get_pile_by_id(2.02)
+
+        pile.height = 12.5
+        pile.set_current_elevation(9.75)
+        assert store.height[4] == 12.5
+        assert store.current_elevation[4] == 9.75
+
+        store.height[store.tracker_slice(2)] += 1.0
+        assert pile.height == 13.5
+        assert type(pile.height) is float
+        assert project.get_tracker_for_pile(pile) is project.trackers[1]
+
+    def test_duplicate_tracker_ids_rejected(self, project):
+        """Test that trackers must have unique ids to be sliced."""
+        project.trackers[1].tracker_id = 1
+        with pytest.raises(ValueError, match="Duplicate"):
+            PileArray.from_trackers(project.trackers)
+
+    def test_view_type(self, project):
+        """Test that standard piles become PileView instances."""
+        project.to_pile_array()
+        assert type(project.trackers[0].piles[0]) is PileView
+
+    def test_from_columns_matches_built_piles(self, project):
+        """Test that a store built from input columns matches one built from piles."""
+        piles = [p for t in project.trackers for p in t.piles]
+        store = PileArray.from_columns(
+            tracker_id=[1, 1, 1, 2, 2, 2],
+            pile_in_tracker=[p.pile_in_tracker for p in piles],
+            pile_id=[p.pile_id for p in piles],
+            northing=[p.northing for p in piles],
+            easting=[p.easting for p in piles],
+            initial_elevation=[p.initial_elevation for p in piles],
+            flooding_allowance=[p.flooding_allowance for p in piles],
+        )
+
+        loaded = Project(name="Loaded", project_type="standard", constraints=project.constraints)
+        loaded.load_pile_array(store, BaseTracker)
+
+        assert loaded.pile_array is store
+        assert [t.tracker_id for t in loaded.trackers] == [1, 2]
+        assert [
+            repr(p).replace("PileView", "BasePile") for t in loaded.trackers for p in t.piles
+        ] == [repr(p) for p in piles]
+        assert loaded.get_pile_by_id(2.03) is loaded.trackers[1].piles[2]
+
+    def test_from_columns_requires_grouped_rows(self):
+        """Test that each tracker's rows must be contiguous and columns equal length."""
+        columns = dict(
+            pile_in_tracker=[1, 1, 2],
+            pile_id=["1.01", "2.01", "1.02"],
+            northing=[0.0, 0.0, 1.0],
+            easting=[0.0, 5.0, 0.0],
+            initial_elevation=[1.0, 1.0, 1.0],
+            flooding_allowance=[0.0, 0.0, 0.0],
+        )
+        with pytest.raises(ValueError, match="contiguous"):
+            PileArray.from_columns(tracker_id=[1, 2, 1], **columns)
+        with pytest.raises(ValueError, match="same length"):
+            PileArray.from_columns(tracker_id=[1, 2], **columns)
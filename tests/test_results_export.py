@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for exporting graded pile results.
+"""
+
+from __future__ import annotations
+
+import csv
+
+import pytest
+from openpyxl import load_workbook
+
+from BasePile import BasePile
+from BaseTracker import BaseTracker
+from Project import Project
+from ProjectConstraints import ProjectConstraints
+from results_export import RESULT_COLUMNS, iter_result_chunks, write_results
+
+
+@pytest.fixture
+def project():
+    """Three small trackers with final outputs set."""
+    constraints = ProjectConstraints(
+        min_reveal_height=1.375,
+        max_reveal_height=1.675,
+        pile_install_tolerance=0.0,
+        max_incline=0.15,
+        target_height_percentage=0.5,
+        max_angle_rotation=0.0,
+        edge_overhang=0.0,
+    )
+    project = Project(name="Test", project_type="standard", constraints=constraints)
+    for tracker_id in (1, 2, 3):
+        tracker = BaseTracker(tracker_id=tracker_id)
+        for pit in range(1, 5):
+            pile = BasePile(
+                northing=100.0 + 7.1 * pit,
+                easting=10.0 * tracker_id,
+                initial_elevation=10.0 + 0.1 * pit,
+                pile_id=f"{tracker_id}.{pit:02d}",
+                pile_in_tracker=pit,
+                flooding_allowance=0.0,
+            )
+            pile.set_final_elevation(pile.initial_elevation + 0.03 * pit)
+            pile.set_total_height(pile.final_elevation + 1.5 + 0.001 * pit)
+            pile.set_total_revealed()
+            tracker.add_pile(pile)
+        project.add_tracker(tracker)
+    return project
+
+
+def _expected_rows(project):
+    return [
+        [
+            t.tracker_id,
+            p.pile_id,
+            p.pile_in_tracker,
+            p.northing,
+            p.easting,
+            p.initial_elevation,
+            p.final_elevation,
+            p.final_elevation - p.initial_elevation,
+            p.total_height,
+            p.pile_revealed,
+        ]
+        for t in project.trackers
+        for p in t.piles
+    ]
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [[int(r[0]), r[1], int(r[2]), *(float(v) for v in r[3:])] for r in reader]
+    return header, rows
+
+
+def test_csv_round_trips_exactly(project, tmp_path):
+    """CSV output holds every result value exactly."""
+    path = write_results(project, tmp_path / "results.csv")
+
+    header, rows = _read_csv(path)
+    assert tuple(header) == RESULT_COLUMNS
+    assert rows == _expected_rows(project)
+
+
+def test_chunked_output_matches(project, tmp_path):
+    """Chunked writing keeps whole trackers together and produces the same file."""
+    chunks = list(iter_result_chunks(project, chunk_rows=5))
+    assert [len(c["pile_id"]) for c in chunks] == [8, 4]
+
+    whole = write_results(project, tmp_path / "whole.csv")
+    chunked = write_results(project, tmp_path / "chunked.csv", chunk_rows=5)
+    assert whole.read_text() == chunked.read_text()
+
+
+def test_pile_array_columns_match(project, tmp_path):
+    """Results read from a PileArray match results read from the piles."""
+    before = write_results(project, tmp_path / "before.csv").read_text()
+    project.to_pile_array()
+    after = write_results(project, tmp_path / "after.csv").read_text()
+    assert after == before
+
+
+def test_xlsx_is_opt_in(project, tmp_path):
+    """xlsx output is available when asked for explicitly."""
+    path = write_results(project, tmp_path / "results.xlsx", fmt="xlsx")
+
+    rows = list(load_workbook(path).active.iter_rows(values_only=True))
+    assert rows[0] == RESULT_COLUMNS
+    assert len(rows) == 13
+    for row, expected in zip(rows[1:], _expected_rows(project)):
+        assert row[:3] == tuple(expected[:3])
+        assert row[3:] == pytest.approx(expected[3:], abs=1e-12)  # xlsx stores 15 sig. digits
+
+
+def test_xlsx_sheet_name_matches_pandas(project, tmp_path):
+    """The xlsx sheet keeps the name df.to_excel used, which the compare scripts read."""
+    path = write_results(project, tmp_path / "results.xlsx", fmt="xlsx")
+
+    assert load_workbook(path).sheetnames == ["Sheet1"]
+
+
+def test_unknown_format_rejected(project, tmp_path):
+    """A path without a known suffix needs an explicit format."""
+    with pytest.raises(ValueError, match="infer"):
+        write_results(project, tmp_path / "results.txt")
+
+
+def test_parquet_round_trip(project, tmp_path):
+    """Parquet output can be read back with the same values."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = write_results(project, tmp_path / "results.parquet", chunk_rows=4)
+
+    table = pq.read_table(path)
+    assert table.column_names == list(RESULT_COLUMNS)
+    assert [list(r.values()) for r in table.to_pylist()] == _expected_rows(project)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the linear-programme terrain-following engine.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+import terrainLpGrading
+import terrainTrackerGrading
+from benchmarks.synthetic_site import SiteSpec, generate_site
+
+pytest.importorskip("scipy")
+
+
+def _rough_site(**constraints):
+    spec = SiteSpec.for_piles(
+        300, project_type="terrain_following", seed=3, noise=0.3, undulation=2.0
+    )
+    project = generate_site(spec)
+    for name, value in constraints.items():
+        setattr(project.constraints, name, value)
+    return project
+
+
+def _deflections(tracker):
+    """Degree breaks of the interior piles and the break sums of each wing (deg)."""
+    tracker.create_segments()
+    centre = tracker.get_centre_pile().pile_in_tracker
+    breaks = [
+        tracker.get_pile_in_tracker(pid).degree_break(tracker)
+        for pid in range(1, len(tracker.piles))
+    ]
+    wings = (sum(breaks[:centre]), sum(breaks[centre - 1 :]))
+    return breaks, wings
+
+
+def _grading_cost(project):
+    return sum(
+        abs(p.final_elevation - p.initial_elevation) for t in project.trackers for p in t.piles
+    )
+
+
+@pytest.mark.parametrize("cumulative", [4.0, 1.0])
+def test_lp_meets_deflection_limits(cumulative):
+    """Degree breaks and wing sums stay within the limits, for no more grading."""
+    heuristic = _rough_site(max_cumulative_deflection_deg=cumulative)
+    project = _rough_site(max_cumulative_deflection_deg=cumulative)
+
+    terrainTrackerGrading.main(heuristic)
+    terrainTrackerGrading.main(project, engine="lp")
+
+    limits = project.constraints
+    for tracker in project.trackers:
+        breaks, wings = _deflections(tracker)
+        assert max(breaks) <= limits.max_segment_deflection_deg
+        assert max(wings) <= limits.max_cumulative_deflection_deg
+        # anchor invariant: the end piles are never graded
+        for pile in (tracker.piles[0], tracker.piles[-1]):
+            assert pile.final_elevation == pile.initial_elevation
+    assert _grading_cost(project) <= _grading_cost(heuristic)
+
+
+def test_solve_heights_straight_run():
+    """Piles that fit on a straight tube need no grading and no breaks."""
+    window_min = np.array([10.0, 10.2, 10.4, 10.6, 10.8])
+    heights = terrainLpGrading.solve_heights(
+        np.full(4, 8.0), window_min, window_min + 0.5, slope_limit=0.01, wing_limit=0.05
+    )
+
+    assert np.all(heights >= window_min) and np.all(heights <= window_min + 0.5)
+    assert np.diff(np.diff(heights)) == pytest.approx(np.zeros(3), abs=1e-9)
+
+
+def test_solve_heights_bends_within_limits():
+    """A low pile is reached by bending the tube as far as the limits allow."""
+    window_min = np.array([10.0, 10.0, 9.0, 10.0, 10.0])
+    heights = terrainLpGrading.solve_heights(
+        np.full(4, 8.0), window_min, window_min + 0.5, slope_limit=0.01, wing_limit=0.05
+    )
+
+    breaks = np.abs(np.diff(np.diff(heights) / 8.0))
+    assert breaks.max() <= 0.01 + 1e-9
+    assert breaks.sum() <= 0.05 + 1e-9
+    below = np.maximum(window_min - heights, 0.0)
+    above = np.maximum(heights - (window_min + 0.5), 0.0)
+    # a straight tube through the end windows would leave pile 3 at least 0.5 m high
+    assert 0.0 < (below + above).sum() < 0.5
+
+
+def test_unsolvable_tracker_falls_back_to_heuristic():
+    """A tracker the LP cannot take (zero-length segment) is graded by the heuristic."""
+    expected, project = _rough_site(), _rough_site()
+    for p in (expected, project):
+        tracker = p.trackers[0]
+        tracker.piles[1].northing = tracker.piles[0].northing
+        tracker.piles[1].easting = tracker.piles[0].easting
+
+    terrainTrackerGrading.main(expected)
+    terrainTrackerGrading.main(project, engine="lp")
+
+    # the zero-length segment leaves NaN heights, so compare the reprs
+    assert repr([p.height for p in project.trackers[0].piles]) == repr(
+        [p.height for p in expected.trackers[0].piles]
+    )
+
+
+def test_break_limits_are_conservative():
+    project = _rough_site(max_segment_deflection_deg=0.5, max_cumulative_deflection_deg=4.0)
+
+    slope_limit, wing_limit = terrainLpGrading.break_limits(project)
+
+    assert slope_limit < min(project.max_strict_segment_slope_change, math.radians(0.5))
+    assert wing_limit < math.radians(4.0)
+
+
+def test_engine_selection_errors(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown grading engine"):
+        terrainTrackerGrading.main(_rough_site(), engine="simplex")
+
+    monkeypatch.setattr(terrainLpGrading, "linprog", None)
+    with pytest.raises(ImportError, match="requires scipy"):
+        terrainTrackerGrading.main(_rough_site(), engine="lp")
@@ -6,6 +6,8 @@ Focuses on unusual tracker configurations, extreme terrain, and boundary conditi
 
 from __future__ import annotations
 
+import math
+
 import pytest
 from TerrainFollowingPile import TerrainFollowingPile
 from TerrainFollowingTracker import TerrainFollowingTracker
@@ -664,3 +666,49 @@ class TestMultiTrackerProject:
         for tracker in simple_project.trackers:
             for p in tracker.piles:
                 assert p.final_elevation is not None
+
+
+class TestSegmentGeometryCache:
+    """Cached segment lengths, slopes and angles follow pile height changes."""
+
+    @staticmethod
+    def _tracker():
+        tracker = TerrainFollowingTracker(tracker_id=1)
+        for i, (n, e) in enumerate([(0.0, 0.0), (7.0, 1.0), (15.0, 1.5), (24.0, 1.0)]):
+            p = TerrainFollowingPile(n, e, 10.0, i + 1, float(i + 1), 0.0)
+            p.height = 11.0 + 0.3 * i
+            tracker.add_pile(p)
+        tracker.create_segments()
+        return tracker
+
+    @staticmethod
+    def _uncached(segment):
+        run = math.hypot(
+            segment.start_pile.easting - segment.end_pile.easting,
+            segment.start_pile.northing - segment.end_pile.northing,
+        )
+        rise = segment.end_pile.height - segment.start_pile.height
+        return run, rise / run, math.degrees(math.atan2(rise, run))
+
+    def test_lengths_stored_on_tracker(self):
+        tracker = self._tracker()
+
+        assert tracker.segment_lengths.tolist() == [s.length() for s in tracker.segments]
+        assert tracker.segment_lengths.tolist() == [self._uncached(s)[0] for s in tracker.segments]
+
+    def test_slopes_and_angles_follow_height_changes(self):
+        tracker = self._tracker()
+
+        def geometry():
+            return [(s.length(), s.slope(), s.segment_angle()) for s in tracker.segments]
+
+        assert geometry() == [self._uncached(s) for s in tracker.segments]
+        cached = geometry()
+
+        tracker.piles[2].height -= 0.45
+        changed = geometry()
+
+        assert changed == [self._uncached(s) for s in tracker.segments]
+        # only the two segments either side of pile 3 change
+        assert changed[0] == cached[0]
+        assert changed[1] != cached[1] and changed[2] != cached[2]
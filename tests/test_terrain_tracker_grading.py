@@ -6,9 +6,12 @@ Tests core grading algorithms and helper functions specific to terrain following
 
 from __future__ import annotations
 
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
 
+import terrainTrackerGrading
+
 from TerrainFollowingPile import TerrainFollowingPile
 from TerrainFollowingTracker import TerrainFollowingTracker
 from terrainTrackerGrading import (
@@ -25,6 +28,7 @@ from terrainTrackerGrading import (
     slide_all_piles,
     main,
 )
+from grading_utils import TrackerResultCache, instrument
 from Project import Project
 from ProjectConstraints import ProjectConstraints
 
@@ -686,6 +690,104 @@ class TestSlopeCorrection:
         assert five_pile_tracker.piles[0].height == first_height
         assert five_pile_tracker.piles[-1].height == last_height
 
+    @staticmethod
+    def _kinked_tracker(seed, piles=12):
+        """Tracker with uneven spacing and random heights that break the slope limit."""
+        rng = np.random.default_rng(seed)
+        tracker = TerrainFollowingTracker(tracker_id=seed)
+        northings = np.cumsum(rng.uniform(5.0, 12.0, piles))
+        for i, (n, h) in enumerate(zip(northings, rng.normal(11.0, 0.3, piles))):
+            p = TerrainFollowingPile(float(n), 0.0, 10.0, i + 1, float(i + 1), 0.0)
+            p.height = float(h)
+            tracker.add_pile(p)
+        tracker.create_segments()
+        return tracker
+
+    @staticmethod
+    def _reference_correction(tracker, project, passes=5):
+        """Pile-by-pile correction over the segment objects, as slope_correction did."""
+        limit = project.max_strict_segment_slope_change
+        for _ in range(passes):
+            for pile in tracker.piles[1:-1]:
+                incoming = tracker.get_segment_by_id(pile.get_incoming_segment_id())
+                outgoing = tracker.get_segment_by_id(pile.get_outgoing_segment_id(tracker))
+                slope_delta = incoming.slope() - outgoing.slope()
+                if slope_delta > limit:
+                    pile.height -= incoming.length() * (slope_delta - limit)
+                elif slope_delta < -limit:
+                    pile.height -= incoming.length() * (slope_delta + limit)
+
+    @staticmethod
+    def _worst_excess(tracker, project):
+        heights = np.array([p.height for p in tracker.piles])
+        slopes = np.diff(heights) / tracker.segment_lengths
+        excess = np.abs(slopes[:-1] - slopes[1:]) - project.max_strict_segment_slope_change
+        return max(excess.max(), 0.0)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_ordered_matches_sequential_reference(self, project, seed):
+        """The default ordered mode gives exactly the pile-by-pile heights."""
+        tracker, expected = self._kinked_tracker(seed), self._kinked_tracker(seed)
+
+        slope_correction(tracker, project)
+        self._reference_correction(expected, project)
+
+        assert [p.height for p in tracker.piles] == [p.height for p in expected.piles]
+
+    def test_compliant_tracker_stops_after_one_pass(self, project, five_pile_tracker, monkeypatch):
+        """A tracker with no slope violations is checked once and left untouched."""
+        for i, p in enumerate(five_pile_tracker.piles):
+            p.height = 11.0 + i * 0.5
+        five_pile_tracker.create_segments()
+        passes = []
+        ordered_pass = terrainTrackerGrading._ordered_slope_pass
+        monkeypatch.setattr(
+            terrainTrackerGrading,
+            "_ordered_slope_pass",
+            lambda *args: passes.append(1) or ordered_pass(*args),
+        )
+
+        slope_correction(five_pile_tracker, project)
+
+        assert len(passes) == 1
+        assert [p.height for p in five_pile_tracker.piles] == [11.0, 11.5, 12.0, 12.5, 13.0]
+
+    def test_tolerance_stops_early(self, project, monkeypatch):
+        """A looser tolerance stops after fewer passes."""
+        passes = []
+        jacobi_pass = terrainTrackerGrading._jacobi_slope_pass
+        monkeypatch.setattr(
+            terrainTrackerGrading,
+            "_jacobi_slope_pass",
+            lambda *args: passes.append(1) or jacobi_pass(*args),
+        )
+
+        counts = []
+        for tolerance in (1e-2, 1e-6):
+            passes.clear()
+            tracker = self._kinked_tracker(3, piles=30)
+            slope_correction(tracker, project, mode="jacobi", tolerance=tolerance, max_passes=500)
+            counts.append(len(passes))
+
+        assert 1 < counts[0] < counts[1] < 500
+
+    def test_jacobi_converges(self, project):
+        """Simultaneous passes settle within the limit given enough passes."""
+        tracker = self._kinked_tracker(1, piles=30)
+        before = self._worst_excess(tracker, project)
+
+        slope_correction(tracker, project, mode="jacobi", max_passes=5)
+        after_five = self._worst_excess(tracker, project)
+        slope_correction(tracker, project, mode="jacobi", tolerance=1e-6, max_passes=500)
+
+        assert before > after_five > self._worst_excess(tracker, project)
+        assert self._worst_excess(tracker, project) < 1e-4
+        assert tracker.piles[0].height == self._kinked_tracker(1, piles=30).piles[0].height
+
+    def test_unknown_mode_raises(self, project, five_pile_tracker):
+        with pytest.raises(ValueError, match="Unknown slope correction mode"):
+            slope_correction(five_pile_tracker, project, mode="gauss")
+
 
 # =============================================================================
 # TEST SLIDE ALL PILES
@@ -749,6 +851,79 @@ class TestSlideAllPiles:
 
         assert final_slope == pytest.approx(initial_slope, abs=0.001)
 
+    @staticmethod
+    def _rough_tracker(seed):
+        """Tracker on rough ground whose straight line leaves several piles outside."""
+        rng = np.random.default_rng(seed)
+        tracker = TerrainFollowingTracker(tracker_id=seed)
+        ground = 10.0 + np.cumsum(rng.normal(0.0, 0.25, 15))
+        for i, z in enumerate(ground):
+            p = TerrainFollowingPile(float(i * 8), 0.0, float(z), i + 1, float(i + 1), 0.0)
+            p.height = float(ground[0] + 1.5 + (ground[-1] - ground[0]) * i / 14)
+            tracker.add_pile(p)
+        return tracker
+
+    @staticmethod
+    def _cost(project, tracker):
+        window = grading_window(project, tracker)
+        return _total_grading_cost(check_within_window(window, tracker))
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_exact_solver_never_worse_than_grid(self, project, seed):
+        """The exact shift costs no more than the grid's and no more than a dense scan."""
+        grid, exact = self._rough_tracker(seed), self._rough_tracker(seed)
+        before = [p.height for p in exact.piles]
+
+        slide_all_piles(project, grid)
+        slide_all_piles(project, exact, solver="exact")
+
+        shifts = [b - p.height for b, p in zip(before, exact.piles)]
+        assert max(shifts) - min(shifts) < 1e-9
+        assert self._cost(project, exact) <= self._cost(project, grid) + 1e-9
+
+        # brute force over the same endpoint-feasible interval
+        scan = self._rough_tracker(seed)
+        slide_all_piles(project, scan, coarse_steps=20001, fine_steps=2001)
+        assert self._cost(project, exact) <= self._cost(project, scan) + 1e-9
+
+    def test_exact_solver_falls_back_to_grid(self, project):
+        """Non-finite heights are handled by the grid search."""
+        grid, exact = self._rough_tracker(0), self._rough_tracker(0)
+        grid.piles[5].height = exact.piles[5].height = float("nan")
+
+        slide_all_piles(project, grid)
+        slide_all_piles(project, exact, solver="exact")
+
+        assert repr([p.height for p in exact.piles]) == repr([p.height for p in grid.piles])
+
+    def test_unknown_solver_raises(self, project, three_pile_tracker):
+        with pytest.raises(ValueError, match="Unknown shift solver"):
+            slide_all_piles(project, three_pile_tracker, solver="simplex")
+
+    def test_main_exact_solver(self, project):
+        """main(solver="exact") grades each tracker as grade_tracker does, cached per solver."""
+
+        def rough_project():
+            graded = Project(
+                name="exact", project_type="terrain_following", constraints=project.constraints
+            )
+            for seed in range(6):
+                graded.add_tracker(self._rough_tracker(seed))
+            return graded
+
+        cache = TrackerResultCache()
+        main(rough_project(), cache=cache)
+        graded, expected = rough_project(), rough_project()
+        main(graded, solver="exact", cache=cache)
+        expected.renumber_piles_by_northing()
+        for tracker in expected.trackers:
+            terrainTrackerGrading.grade_tracker(expected, tracker, solver="exact")
+
+        assert cache.hits == 0
+        assert [[p.final_elevation for p in t.piles] for t in graded.trackers] == [
+            [p.final_elevation for p in t.piles] for t in expected.trackers
+        ]
+
 class TestGrading:
     """Test final ground elevation adjustment."""
 
@@ -958,6 +1133,142 @@ class TestMain:
             for p in tracker.piles:
                 assert p.final_elevation is not None
 
+    @staticmethod
+    def _rolling_project(base_constraints):
+        project = Project(
+            name="Test", project_type="terrain_following", constraints=base_constraints
+        )
+        for tid in range(1, 6):
+            tracker = TerrainFollowingTracker(tracker_id=tid)
+            for i in range(8):
+                p = TerrainFollowingPile(
+                    northing=float(i * 10),
+                    easting=float(tid * 100),
+                    initial_elevation=10.0 + 0.4 * ((i * tid) % 3) - 0.05 * i,
+                    pile_in_tracker=i + 1,
+                    pile_id=float(tid * 100 + i + 1),
+                    flooding_allowance=0.0,
+                )
+                tracker.add_pile(p)
+            project.add_tracker(tracker)
+        return project
+
+    def test_main_returns_tracker_results(self, base_constraints):
+        """Test that main returns per-tracker results matching the piles."""
+        project = self._rolling_project(base_constraints)
+
+        results = main(project)
+
+        assert [r.tracker_id for r in results] == [t.tracker_id for t in project.trackers]
+        for result, tracker in zip(results, project.trackers):
+            assert result.height.tolist() == [p.height for p in tracker.piles]
+            assert result.final_degree_break.tolist() == [
+                p.final_degree_break for p in tracker.piles
+            ]
+            assert result.max_tracker_degree_break == tracker.max_tracker_degree_break
+
+    def test_main_parallel_matches_serial(self, base_constraints):
+        """Test that grading with a worker pool reproduces the serial run exactly."""
+        serial = self._rolling_project(base_constraints)
+        pooled = self._rolling_project(base_constraints)
+
+        main(serial)
+        results = main(pooled, workers=2)
+
+        assert len(results) == len(pooled.trackers)
+        for ts, tp in zip(serial.trackers, pooled.trackers):
+            assert (ts.north_wing_deflection, ts.south_wing_deflection) == (
+                tp.north_wing_deflection,
+                tp.south_wing_deflection,
+            )
+            for a, b in zip(ts.piles, tp.piles):
+                assert (a.height, a.final_elevation, a.pile_revealed, a.final_degree_break) == (
+                    b.height,
+                    b.final_elevation,
+                    b.pile_revealed,
+                    b.final_degree_break,
+                )
+            assert len(tp.segments) == len(tp.piles) - 1
+
+    def test_main_progress_phases(self, base_constraints):
+        """Test that serial runs report each phase and parallel runs a single grade phase."""
+        serial_events, pooled_events = [], []
+
+        main(self._rolling_project(base_constraints), progress=serial_events.append)
+        main(self._rolling_project(base_constraints), workers=2, progress=pooled_events.append)
+
+        assert list(dict.fromkeys(e.phase for e in serial_events)) == [
+            "target_line",
+            "sliding",
+            "final_grading",
+        ]
+        assert [e.phase for e in pooled_events] == ["grade"] * len(pooled_events)
+        assert pooled_events[-1].done == pooled_events[-1].total == serial_events[-1].total
+
+    def test_main_incremental_regrade(self, base_constraints):
+        """Test that a cached regrade only grades edited trackers and matches a full run."""
+        cache = TrackerResultCache()
+        main(self._rolling_project(base_constraints), cache=cache)
+
+        incremental = self._rolling_project(base_constraints)
+        fresh = self._rolling_project(base_constraints)
+        for project in (incremental, fresh):
+            project.trackers[1].piles[4].initial_elevation -= 0.6
+            project.trackers[1].piles[4].current_elevation -= 0.6
+        results = main(incremental, cache=cache)
+        main(fresh)
+
+        assert cache.hits == len(incremental.trackers) - 1
+        assert [r.height.tolist() for r in results] == [
+            [p.height for p in t.piles] for t in fresh.trackers
+        ]
+        for ti, tf in zip(incremental.trackers, fresh.trackers):
+            assert ti.max_tracker_degree_break == tf.max_tracker_degree_break
+            for a, b in zip(ti.piles, tf.piles):
+                assert (a.final_elevation, a.total_height, a.final_degree_break) == (
+                    b.final_elevation,
+                    b.total_height,
+                    b.final_degree_break,
+                )
+
+    def test_main_instrumentation(self, base_constraints):
+        """Test that an instrumented run counts sliding candidates and slope corrections."""
+        project = self._rolling_project(base_constraints)
+
+        with instrument() as metrics:
+            main(project)
+        snapshot = metrics.snapshot()
+
+        slides = snapshot["timers"]["terrain.slide_all_piles"]["calls"]
+        assert slides >= 1
+        assert snapshot["counters"]["terrain.slide_all_piles.candidates"] == slides * 242
+        assert "terrain.slope_correction" in snapshot["timers"]
+
+
+class TestSegmentLookup:
+    """Tests for segment lookup by id."""
+
+    def test_get_segment_by_id(self, five_pile_tracker):
+        """Test that segments are found by id after create_segments."""
+        five_pile_tracker.create_segments()
+
+        for sid in range(1, 5):
+            segment = five_pile_tracker.get_segment_by_id(sid)
+            assert segment.segment_id == sid
+            assert segment.start_pile.pile_in_tracker == sid
+
+        with pytest.raises(ValueError, match="not found"):
+            five_pile_tracker.get_segment_by_id(5)
+
+    def test_get_segment_by_id_reordered(self, five_pile_tracker):
+        """Test lookup when the segment list is not in id order."""
+        five_pile_tracker.create_segments()
+        five_pile_tracker.segments.reverse()
+
+        assert five_pile_tracker.get_segment_by_id(1).segment_id == 1
+        assert five_pile_tracker.get_segment_by_id(4).segment_id == 4
+
+
 class TestWarnings:
     """Tests for warning conditions."""
 